@@ -195,4 +195,14 @@ def_op('CALL_METHOD', 202)            # #args not including 'self'
 def_op('BUILD_LIST_FROM_ARG', 203)
 jrel_op('JUMP_IF_NOT_DEBUG', 204)     # jump over assert statements
 
+# pypy superinstructions: they run the instruction that follows them too
+def_op('LOAD_FAST_LOAD_ATTR', 205)    # Local variable number
+haslocal.append(205)
+def_op('LOAD_FAST_LOAD_FAST', 206)    # Local variable number
+haslocal.append(206)
+def_op('COMPARE_OP_POP_JUMP_IF_FALSE', 207)   # Comparison operator
+hascompare.append(207)
+def_op('LOAD_CONST_RETURN_VALUE', 208)        # Index in const list
+hasconst.append(208)
+
 del def_op, name_op, jrel_op, jabs_op
@@ -0,0 +1,140 @@
+"""Build a bundle with the compiled code of all the modules that an
+application imports, to make its startup faster:
+
+    pypy -m _pypy_bundle OUTPUT.zip MODULE...
+
+This imports the given modules and writes the compiled code of these
+modules, and of the pure Python modules that importing them added to
+sys.modules, to OUTPUT.zip.  The modules already imported at startup,
+like 'site' and 'os', are only bundled if they are given explicitly.
+The packages are stored whole, with all the modules that they contain,
+unless they contain any file that is not a Python source, e.g. an
+extension module or a data file: such packages are left out.
+
+Setting the environment variable PYPY_BUNDLE to OUTPUT.zip puts it at
+the start of sys.path, where zipimport finds the modules without
+looking for them in the other directories, and loads them without
+reading their source or .pyc file.  The bundle is an uncompressed zip
+file; its central directory serves as the index of the modules.
+
+The modules are compiled by the PyPy that runs this script, and the
+bundle can only be used by a PyPy with the same bytecode version.  It
+must be built again when the modules change.  Modules that read files
+next to their source, using __file__, cannot be bundled.
+"""
+
+import sys, os, imp, marshal, struct, zipfile
+
+PYTHON_SUFFIXES = ('.py', '.pyc', '.pyo')
+
+
+def source_file(module):
+    """Return the source file of 'module', or None if it was not
+    imported from a source or .pyc file with its source next to it."""
+    filename = getattr(module, '__file__', None)
+    if not isinstance(filename, str):
+        return None
+    if filename.endswith('.pyc') or filename.endswith('.pyo'):
+        filename = filename[:-1]
+    if not filename.endswith('.py') or not os.path.isfile(filename):
+        return None
+    return filename
+
+
+def package_sources(name, directory):
+    """Return a dict {path in the bundle: source file} for all the
+    modules in the package 'name' found in 'directory', or None if it
+    contains files that are not Python sources, like extension modules
+    or data files that the package may read next to its __file__."""
+    sources = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        for filename in filenames:
+            if not filename.endswith(PYTHON_SUFFIXES):
+                return None
+        if dirpath != directory and not os.path.isfile(
+                os.path.join(dirpath, '__init__.py')):
+            continue    # not a subpackage, but maybe still read as data
+        relpath = name + dirpath[len(directory):].replace(os.sep, '/')
+        for filename in filenames:
+            if filename.endswith('.py'):
+                path = '%s/%sc' % (relpath, filename)
+                sources[path] = os.path.join(dirpath, filename)
+    return sources
+
+
+def find_sources(modules):
+    """Return a dict {path in the bundle: source file} for the
+    top-level modules and packages in the dict 'modules'."""
+    sources = {}
+    for name, module in modules.items():
+        if module is None or '.' in name or name == '__main__':
+            continue
+        filename = source_file(module)
+        if filename is None:
+            continue
+        if os.path.basename(filename) == '__init__.py':
+            package = package_sources(name, os.path.dirname(filename))
+            if package is not None:
+                sources.update(package)
+        else:
+            sources[name + '.pyc'] = filename
+    return sources
+
+
+def import_modules(names):
+    """Import the modules 'names' and return a dict {name: module} of
+    the top-level modules and packages that they belong to, or that
+    they imported."""
+    before = set(sys.modules)
+    for name in names:
+        __import__(name)
+    modules = {}
+    for name in (set(sys.modules) - before) | set(names):
+        name = name.split('.')[0]
+        module = sys.modules.get(name)
+        if module is not None:
+            modules[name] = module
+    return modules
+
+
+def write_bundle(output, sources):
+    """Compile the source files in the dict 'sources' and write them
+    to the bundle 'output'.  Returns the list of the files that could
+    not be compiled, which are left out."""
+    magic = imp.get_magic()
+    failed = []
+    zf = zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED)
+    try:
+        for path in sorted(sources):
+            filename = sources[path]
+            f = open(filename, 'rU')
+            try:
+                source = f.read()
+            finally:
+                f.close()
+            try:
+                code = compile(source, filename, 'exec', 0, True)
+            except SyntaxError:
+                failed.append(filename)
+                continue
+            mtime = int(os.stat(filename).st_mtime) & 0xFFFFFFFF
+            data = magic + struct.pack('<I', mtime) + marshal.dumps(code)
+            zf.writestr(path, data)
+    finally:
+        zf.close()
+    return failed
+
+
+def main(argv):
+    if len(argv) < 1:
+        print >> sys.stderr, __doc__
+        return 2
+    output = argv[0]
+    sources = find_sources(import_modules(argv[1:]))
+    for filename in write_bundle(output, sources):
+        print >> sys.stderr, 'skipped %s: syntax error' % (filename,)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
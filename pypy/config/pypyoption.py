@@ -166,6 +166,14 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                default=False,
                requires=[("objspace.usepycfiles", True)]),
 
+    BoolOption("lazycodeloading",
+               "Unmarshal the code objects nested in pyc files on first use",
+               default=False),
+
+    BoolOption("superinstructions",
+               "Compile common pairs of opcodes to superinstructions",
+               default=False),
+
     StrOption("soabi",
               "Tag to differentiate extension modules built for different Python interpreters",
               cmdline="--soabi",
@@ -198,6 +206,15 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withstrbuf", "use strings optimized for addition (ver 2)",
                    default=False),
 
+        BoolOption("withstrslice", "use slices of strings that share the "
+                   "characters of the original string",
+                   default=False),
+
+        BoolOption("withutf8unicode",
+                   "store unicode strings decoded from ASCII or UTF-8 in a "
+                   "compact UTF-8 form",
+                   default=False),
+
         BoolOption("withprebuiltchar",
                    "use prebuilt single-character string objects",
                    default=False),
@@ -211,6 +228,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "use specialised tuples",
                    default=False),
 
+        BoolOption("withtypedtuple",
+                   "store tuples of only ints, floats or strings unboxed",
+                   default=False),
+
         BoolOption("withcelldict",
                    "use dictionaries that are optimized for being used as module dicts",
                    default=False,
@@ -222,6 +243,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    requires=[("objspace.std.getattributeshortcut", True),
                              ("objspace.std.withtypeversion", True),
                        ]),
+        BoolOption("withunboxedmapdict",
+                   "store the int and float attributes of instances unboxed",
+                   default=False,
+                   requires=[("objspace.std.withmapdict", True)]),
 
         BoolOption("withrangelist",
                    "enable special range list implementation that does not "
@@ -38,6 +38,8 @@ PYTHONIOENCODING: Encoding[:errors] used for stdin/stdout/stderr.
 PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
+PYPY_BUNDLE: bundle of compiled modules, built with "pypy -m _pypy_bundle",
+               put before all the other entries of sys.path.
 """
 
 import sys
@@ -250,8 +252,12 @@ def setup_and_fix_paths(ignore_environment=False, **extra):
     import os
     newpath = sys.path[:]
     del sys.path[:]
-    # first prepend PYTHONPATH
     readenv = not ignore_environment
+    # first the bundle of compiled modules, see lib_pypy/_pypy_bundle.py
+    bundle = readenv and os.getenv('PYPY_BUNDLE')
+    if bundle:
+        sys.path.append(bundle)
+    # then prepend PYTHONPATH
     path = readenv and os.getenv('PYTHONPATH')
     if path:
         sys.path.extend(path.split(os.pathsep))
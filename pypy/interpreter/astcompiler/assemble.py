@@ -130,6 +130,67 @@ class Block(object):
         return ''.join(code)
 
 
+def _thread_jump(op, target, limit):
+    """Return the block where a jump 'op' to 'target' really ends up,
+    following the unconditional jumps at the start of the blocks.  A
+    JUMP_IF_*_OR_POP going to the same kind of jump, which makes the
+    same decision with the same value, is followed too.  'limit' stops
+    it in loops of jumps.
+    """
+    for i in range(limit):
+        if not target.instructions:
+            break
+        first = target.instructions[0]
+        first_op = first.opcode
+        if not (first_op == ops.JUMP_ABSOLUTE or
+                first_op == ops.JUMP_FORWARD or
+                (first_op == op and (op == ops.JUMP_IF_FALSE_OR_POP or
+                                     op == ops.JUMP_IF_TRUE_OR_POP))):
+            break
+        target = first.jump[0]
+    return target
+
+
+def _superinstruction(first_op, second_op):
+    """Return the superinstruction for the pair of opcodes, or -1."""
+    if first_op == ops.LOAD_FAST:
+        if second_op == ops.LOAD_ATTR:
+            return ops.LOAD_FAST_LOAD_ATTR
+        if second_op == ops.LOAD_FAST:
+            return ops.LOAD_FAST_LOAD_FAST
+    elif first_op == ops.COMPARE_OP:
+        if second_op == ops.POP_JUMP_IF_FALSE:
+            return ops.COMPARE_OP_POP_JUMP_IF_FALSE
+    elif first_op == ops.LOAD_CONST:
+        if second_op == ops.RETURN_VALUE:
+            return ops.LOAD_CONST_RETURN_VALUE
+    return -1
+
+
+def _fuse_superinstructions(blocks):
+    """Replace the first instruction of the common pairs with the
+    superinstruction that runs both.  The second instruction stays in
+    the bytecode, where the superinstruction reads its argument, so
+    the offsets and the line numbers don't change.  The pairs are only
+    fused inside a block, where the second instruction is not a jump
+    target, and if it doesn't start a line, because the tracing doesn't
+    see it any more.
+    """
+    for block in blocks:
+        instructions = block.instructions
+        i = 0
+        while i < len(instructions) - 1:
+            instr = instructions[i]
+            second = instructions[i + 1]
+            fused = _superinstruction(instr.opcode, second.opcode)
+            if (fused != -1 and not second.lineno and
+                    instr.arg <= 0xFFFF and second.arg <= 0xFFFF):
+                instr.opcode = fused
+                i += 2
+            else:
+                i += 1
+
+
 def _make_index_dict_filter(syms, flag):
     i = 0
     result = {}
@@ -322,13 +383,15 @@ class PythonCodeMaker(ast.ASTVisitor):
                         # Optimize an unconditional jump going to another
                         # unconditional jump.
                         if op == ops.JUMP_ABSOLUTE or op == ops.JUMP_FORWARD:
+                            final_target = _thread_jump(op, target,
+                                                        len(blocks))
+                            if final_target is not target:
+                                target = final_target
+                                instr.opcode = ops.JUMP_ABSOLUTE
+                                absolute = True
                             if target.instructions:
                                 target_op = target.instructions[0].opcode
-                                if target_op == ops.JUMP_ABSOLUTE:
-                                    target = target.instructions[0].jump[0]
-                                    instr.opcode = ops.JUMP_ABSOLUTE
-                                    absolute = True
-                                elif target_op == ops.RETURN_VALUE:
+                                if target_op == ops.RETURN_VALUE:
                                     # Replace JUMP_* to a RETURN into
                                     # just a RETURN
                                     instr.opcode = ops.RETURN_VALUE
@@ -338,6 +401,17 @@ class PythonCodeMaker(ast.ASTVisitor):
                                     # we have to trigger another pass
                                     force_redo = True
                                     continue
+                        elif (op == ops.POP_JUMP_IF_FALSE or
+                              op == ops.POP_JUMP_IF_TRUE or
+                              op == ops.JUMP_IF_FALSE_OR_POP or
+                              op == ops.JUMP_IF_TRUE_OR_POP):
+                            # these are all absolute jumps.  Only thread
+                            # them forward: the JIT only sees the loops
+                            # closed by a JUMP_ABSOLUTE.
+                            final_target = _thread_jump(op, target,
+                                                        len(blocks))
+                            if final_target.offset > block.offset:
+                                target = final_target
                         if absolute:
                             jump_arg = target.offset
                         else:
@@ -481,6 +555,8 @@ class PythonCodeMaker(ast.ASTVisitor):
         self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
+        if self.space.config.objspace.superinstructions:
+            _fuse_superinstructions(blocks)
         consts_w = self._build_consts_array()
         names = _list_from_dict(self.names)
         var_names = _list_from_dict(self.var_names)
@@ -644,6 +720,12 @@ _static_opcode_stack_effects = {
     ops.JUMP_IF_NOT_DEBUG: 0,
 
     ops.BUILD_LIST_FROM_ARG: 1,
+
+    # only the effect of the first instruction of the pair
+    ops.LOAD_FAST_LOAD_ATTR: 1,
+    ops.LOAD_FAST_LOAD_FAST: 1,
+    ops.COMPARE_OP_POP_JUMP_IF_FALSE: -1,
+    ops.LOAD_CONST_RETURN_VALUE: 1,
 }
 
 
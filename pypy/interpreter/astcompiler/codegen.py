@@ -897,6 +897,13 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
 
     def visit_IfExp(self, ifexp):
         self.update_position(ifexp.lineno)
+        test_constant = ifexp.test.as_constant_truth(self.space)
+        if test_constant == optimize.CONST_FALSE:
+            ifexp.orelse.walkabout(self)
+            return
+        elif test_constant == optimize.CONST_TRUE:
+            ifexp.body.walkabout(self)
+            return
         end = self.new_block()
         otherwise = self.new_block()
         ifexp.test.accept_jump_if(self, False, otherwise)
@@ -265,15 +265,15 @@ class OptimizingVisitor(ast.ASTVisitor):
                                  name.col_offset)
         return name
 
-    def visit_Tuple(self, tup):
-        """Try to turn tuple building into a constant."""
-        if tup.elts:
-            consts_w = [None]*len(tup.elts)
-            for i in range(len(tup.elts)):
-                node = tup.elts[i]
+    def _tuple_of_constants(self, elts):
+        """Return the items of 'elts' as a constant tuple, or None."""
+        if elts:
+            consts_w = [None]*len(elts)
+            for i in range(len(elts)):
+                node = elts[i]
                 w_const = node.as_constant()
                 if w_const is None:
-                    return tup
+                    return None
                 consts_w[i] = w_const
             # intern the string constants packed into the tuple here,
             # because assemble.py will see the result as just a tuple constant
@@ -282,9 +282,32 @@ class OptimizingVisitor(ast.ASTVisitor):
                     self.space, consts_w[i])
         else:
             consts_w = []
-        w_consts = self.space.newtuple(consts_w)
+        return self.space.newtuple(consts_w)
+
+    def visit_Tuple(self, tup):
+        """Try to turn tuple building into a constant."""
+        w_consts = self._tuple_of_constants(tup.elts)
+        if w_consts is None:
+            return tup
         return ast.Const(w_consts, tup.lineno, tup.col_offset)
 
+    def _constant_iterable(self, node):
+        """Iterating over a list of constants can iterate over a
+        constant tuple instead: the list itself is never visible."""
+        if isinstance(node, ast.List):
+            w_consts = self._tuple_of_constants(node.elts)
+            if w_consts is not None:
+                return ast.Const(w_consts, node.lineno, node.col_offset)
+        return node
+
+    def visit_For(self, fr):
+        fr.iter = self._constant_iterable(fr.iter)
+        return fr
+
+    def visit_comprehension(self, comp):
+        comp.iter = self._constant_iterable(comp.iter)
+        return comp
+
     def visit_Subscript(self, subs):
         if subs.ctx == ast.Load:
             w_obj = subs.value.as_constant()
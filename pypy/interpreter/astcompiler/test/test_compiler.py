@@ -74,6 +74,22 @@ class TestCompiler:
     def error_test(self, source, exc_type):
         py.test.raises(exc_type, self.simple_test, source, None, None)
 
+    def test_constant_ifexp(self):
+        # the dead branch is still seen by the symtable
+        source = """if 1:
+        z = 'global'
+        def f():
+            a = 1 if 1 else [z for z in ()]
+            try:
+                return z
+            except UnboundLocalError:
+                return 'local'
+        def g(x):
+            x = x if 1 else (yield)
+        """
+        yield self.st, source, "f()", "local"
+        yield self.st, source, "type(g(1)).__name__", "generator"
+
     def test_issue_713(self):
         func = "def f(_=2): return (_ if _ else _) if False else _"
         yield self.st, func, "f()", 2
@@ -865,6 +881,63 @@ class TestCompiler:
             space.call_function(w_set_debug, space.w_True)
 
 
+class TestCompilerSuperinstructions(TestCompiler):
+    spaceconfig = {"objspace.superinstructions": True}
+
+    def get_opcodes(self, source, name):
+        code = compile_with_astcompiler(source, 'exec', self.space)
+        for w_const in code.getconsts_w():
+            if isinstance(w_const, PyCode) and w_const.co_name == name:
+                break
+        else:
+            assert False, "no code object %r" % (name,)
+        co_code = w_const.co_code
+        opcodes = []
+        i = 0
+        while i < len(co_code):
+            opcodes.append(ord(co_code[i]))
+            if ord(co_code[i]) >= ops.HAVE_ARGUMENT:
+                i += 3
+            else:
+                i += 1
+        return opcodes
+
+    def test_superinstructions(self):
+        source = """def f(self, a, b):
+            if a < b:
+                return self.x
+            return 42
+        """
+        assert self.get_opcodes(source, 'f') == [
+            ops.LOAD_FAST_LOAD_FAST, ops.LOAD_FAST,
+            ops.COMPARE_OP_POP_JUMP_IF_FALSE, ops.POP_JUMP_IF_FALSE,
+            ops.LOAD_FAST_LOAD_ATTR, ops.LOAD_ATTR, ops.RETURN_VALUE,
+            ops.LOAD_CONST_RETURN_VALUE, ops.RETURN_VALUE]
+        self.simple_test(source, "f(None, 2, 1)", 42)
+        self.simple_test("class A:\n    x = 5\n" + source,
+                         "f(A(), 1, 2)", 5)
+
+    def test_no_superinstruction_across_lines(self):
+        source = """def f(a, b):
+            a
+            b
+            return (a <
+                    b)
+        """
+        assert self.get_opcodes(source, 'f') == [
+            ops.LOAD_FAST, ops.POP_TOP, ops.LOAD_FAST, ops.POP_TOP,
+            ops.LOAD_FAST, ops.LOAD_FAST, ops.COMPARE_OP, ops.RETURN_VALUE]
+
+    def test_no_superinstruction_at_jump_target(self):
+        source = """def f(a, b):
+            x = a if b else None
+            return x
+        """
+        opcodes = self.get_opcodes(source, 'f')
+        assert ops.LOAD_CONST_RETURN_VALUE not in opcodes
+        assert ops.LOAD_FAST_LOAD_FAST not in opcodes
+
+
 class AppTestCompiler:
 
     def setup_class(cls):
@@ -1067,6 +1140,80 @@ class TestOptimizations:
             assert ops.BUILD_LIST not in counts
             assert ops.LOAD_CONST in counts
 
+    def test_folding_of_constant_iterables(self):
+        for source in (
+            'for x in [1, 2, 3]: pass',
+            'return list(x for x in ["a", "b"])',
+            'return {x: x for x in [None, (1, 2)]}',
+            ):
+            source = 'def f():\n    %s' % source
+            counts = self.count_instructions(source)
+            assert ops.BUILD_LIST not in counts
+        counts = self.count_instructions('def f(): return [x for x in [1, a]]')
+        assert counts[ops.BUILD_LIST] == 1
+
+    def test_fold_constant_ifexp(self):
+        source = """def f(x, y):
+            return x if 1 else y
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+        source = """def f(x, y):
+            return x if not 1 else y
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+        source = """def f(x):
+            x = x if 1 else (yield)
+        """
+        counts = self.count_instructions(source)
+        assert ops.YIELD_VALUE not in counts
+
+    def test_jump_threading(self):
+        source = """def f(a, b, c):
+            if a:
+                if b:
+                    c = 1
+            else:
+                c = 2
+            while a:
+                if b:
+                    a = 0
+            for x in a:
+                if b:
+                    continue
+                c = 3
+            return (a or b) or c
+        """
+        generator, blocks = generate_function_code(source, self.space)
+        instrs = {}
+        for block in blocks:
+            offset = block.offset
+            for instr in block.instructions:
+                instrs[offset] = instr
+                offset += instr.size()
+        absolute_jumps = (ops.JUMP_ABSOLUTE, ops.POP_JUMP_IF_FALSE,
+                          ops.POP_JUMP_IF_TRUE, ops.JUMP_IF_FALSE_OR_POP,
+                          ops.JUMP_IF_TRUE_OR_POP)
+        for offset, instr in instrs.items():
+            if instr.opcode == ops.JUMP_FORWARD:
+                target = offset + instr.size() + instr.arg
+            elif instr.opcode in absolute_jumps:
+                target = instr.arg
+            else:
+                continue
+            target_instr = instrs.get(target)
+            if target_instr is None:
+                continue
+            assert target_instr.opcode != ops.JUMP_FORWARD
+            assert target_instr.opcode != instr.opcode
+            if target_instr.opcode == ops.JUMP_ABSOLUTE:
+                # only conditional jumps to the end of a loop are left,
+                # which must reach the JUMP_ABSOLUTE going back
+                assert instr.opcode in (ops.POP_JUMP_IF_FALSE,
+                                        ops.POP_JUMP_IF_TRUE)
+                assert target_instr.arg < offset
+
     def test_folding_of_set_constants(self):
         for source in (
             # in/not in constants with BUILD_SET should be folded to a frozenset:
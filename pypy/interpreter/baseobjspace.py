@@ -306,6 +306,12 @@ class W_Root(object):
             return lst[:]
         return None
 
+    def exact_length_hint(self, space):
+        """Return the number of items left in this builtin iterator, if it
+        is known exactly without running any app-level code; otherwise -1.
+        """
+        return -1
+
 
 class W_InterpIterable(W_Root):
     def __init__(self, space, w_iterable):
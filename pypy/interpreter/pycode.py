@@ -7,6 +7,7 @@ The bytecode interpreter itself is implemented by the PyFrame class.
 import dis, imp, struct, types, new, sys
 
 from pypy.interpreter import eval
+from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.error import OperationError
 from pypy.interpreter.gateway import unwrap_spec
@@ -124,6 +125,10 @@ class PyCode(eval.Code):
             from pypy.objspace.std.mapdict import init_mapdict_cache
             init_mapdict_cache(self)
 
+        if self.space.config.objspace.usemodules.pypyjit:
+            from pypy.module.pypyjit.interp_warmup import code_created
+            code_created(self)
+
     def _cleanup_(self):
         if (self.magic == cpython_magic and
             '__pypy__' not in sys.builtin_module_names):
@@ -206,9 +211,26 @@ class PyCode(eval.Code):
     def getvarnames(self):
         return self.co_varnames
 
+    def getconst_w(self, index):
+        w_const = self.co_consts_w[index]
+        if (self.space.config.objspace.lazycodeloading and
+                isinstance(w_const, W_LazyCode)):
+            w_const = w_const.materialize()
+        return w_const
+
+    def getconsts_w(self):
+        """Return the constants, with the code objects that are not
+        unmarshalled yet (see W_LazyCode) loaded."""
+        if not self.space.config.objspace.lazycodeloading:
+            return self.co_consts_w
+        consts_w = [None] * len(self.co_consts_w)
+        for i in range(len(consts_w)):
+            consts_w[i] = self.getconst_w(i)
+        return consts_w
+
     def getdocstring(self, space):
         if self.co_consts_w:   # it is probably never empty
-            w_first = self.co_consts_w[0]
+            w_first = self.getconst_w(0)
             if space.isinstance_w(w_first, space.w_basestring):
                 return w_first
         return space.w_None
@@ -216,7 +238,7 @@ class PyCode(eval.Code):
     def remove_docstrings(self, space):
         if self.co_flags & CO_KILL_DOCSTRING:
             self.co_consts_w[0] = space.w_None
-        for w_co in self.co_consts_w:
+        for w_co in self.getconsts_w():
             if isinstance(w_co, PyCode):
                 w_co.remove_docstrings(space)
 
@@ -224,7 +246,7 @@ class PyCode(eval.Code):
         """For debugging only."""
         consts = [None] * len(self.co_consts_w)
         num = 0
-        for w in self.co_consts_w:
+        for w in self.getconsts_w():
             if isinstance(w, PyCode):
                 consts[num] = w._to_code()
             else:
@@ -258,7 +280,7 @@ class PyCode(eval.Code):
         dis.dis(co)
 
     def fget_co_consts(self, space):
-        return space.newtuple(self.co_consts_w)
+        return space.newtuple(self.getconsts_w())
 
     def fget_co_names(self, space):
         return space.newtuple(self.co_names_w)
@@ -295,7 +317,7 @@ class PyCode(eval.Code):
                 return space.w_False
 
         for i in range(len(self.co_consts_w)):
-            if not space.eq_w(self.co_consts_w[i], w_other.co_consts_w[i]):
+            if not space.eq_w(self.getconst_w(i), w_other.getconst_w(i)):
                 return space.w_False
 
         return space.w_True
@@ -314,7 +336,7 @@ class PyCode(eval.Code):
         w_result = space.wrap(intmask(result))
         for w_name in self.co_names_w:
             w_result = space.xor(w_result, space.hash(w_name))
-        for w_const in self.co_consts_w:
+        for w_const in self.getconsts_w():
             w_result = space.xor(w_result, space.hash(w_const))
         return w_result
 
@@ -365,7 +387,7 @@ class PyCode(eval.Code):
             w(self.co_stacksize),
             w(self.co_flags),
             w(self.co_code),
-            space.newtuple(self.co_consts_w),
+            space.newtuple(self.getconsts_w()),
             space.newtuple(self.co_names_w),
             space.newtuple([w(v) for v in self.co_varnames]),
             w(self.co_filename),
@@ -384,3 +406,33 @@ class PyCode(eval.Code):
 
     def repr(self, space):
         return space.wrap(self.get_repr())
+
+
+class W_LazyCode(W_Root):
+    """A code object in the constants of another one that is not
+    unmarshalled yet, with the 'lazycodeloading' option.  'data' is the
+    marshal data that contains it at position 'pos', and 'stringtable_w'
+    the strings interned in all of 'data'.  It never escapes from
+    co_consts_w: getconst_w() replaces it with the real code object,
+    which is unmarshalled the first time it is needed.
+    """
+    w_code = None
+
+    def __init__(self, space, data, pos, stringtable_w):
+        self.space = space
+        self.data = data
+        self.pos = pos
+        self.stringtable_w = stringtable_w
+
+    @jit.elidable
+    def materialize(self):
+        w_code = self.w_code
+        if w_code is None:
+            from pypy.objspace.std.marshal_impl import unmarshal_lazy_code
+            w_code = unmarshal_lazy_code(self.space, self.data, self.pos,
+                                         self.stringtable_w)
+            self.w_code = w_code
+            # don't keep the marshal data alive any longer
+            self.data = None
+            self.stringtable_w = None
+        return w_code
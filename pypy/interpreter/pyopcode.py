@@ -176,14 +176,11 @@ class __extend__(pyframe.PyFrame):
 
             if opcode == opcodedesc.RETURN_VALUE.index:
                 w_returnvalue = self.popvalue()
-                block = self.unrollstack(SReturnValue.kind)
-                if block is None:
-                    self.pushvalue(w_returnvalue)   # XXX ping pong
-                    raise Return
-                else:
-                    unroller = SReturnValue(w_returnvalue)
-                    next_instr = block.handle(self, unroller)
-                    return next_instr    # now inside a 'finally' block
+                return self.return_value(w_returnvalue)
+            elif opcode == opcodedesc.LOAD_CONST_RETURN_VALUE.index:
+                w_returnvalue = self.getconstant_w(oparg)
+                self.last_instr = intmask(next_instr)
+                return self.return_value(w_returnvalue)
             elif opcode == opcodedesc.END_FINALLY.index:
                 unroller = self.end_finally()
                 if isinstance(unroller, SuspendedUnroller):
@@ -216,6 +213,13 @@ class __extend__(pyframe.PyFrame):
                 next_instr = self.POP_JUMP_IF_FALSE(oparg, next_instr)
             elif opcode == opcodedesc.POP_JUMP_IF_TRUE.index:
                 next_instr = self.POP_JUMP_IF_TRUE(oparg, next_instr)
+            elif opcode == opcodedesc.COMPARE_OP_POP_JUMP_IF_FALSE.index:
+                next_instr = self.COMPARE_OP_POP_JUMP_IF_FALSE(oparg,
+                                                               next_instr)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_ATTR.index:
+                next_instr = self.LOAD_FAST_LOAD_ATTR(oparg, next_instr)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_FAST.index:
+                next_instr = self.LOAD_FAST_LOAD_FAST(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_ADD.index:
                 self.BINARY_ADD(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_AND.index:
@@ -442,6 +446,16 @@ class __extend__(pyframe.PyFrame):
             if jit.we_are_jitted():
                 return next_instr
 
+    def return_value(self, w_returnvalue):
+        block = self.unrollstack(SReturnValue.kind)
+        if block is None:
+            self.pushvalue(w_returnvalue)   # XXX ping pong
+            raise Return
+        else:
+            unroller = SReturnValue(w_returnvalue)
+            next_instr = block.handle(self, unroller)
+            return next_instr    # now inside a 'finally' block
+
     @jit.unroll_safe
     def unrollstack(self, unroller_kind):
         while self.blockstack_non_empty():
@@ -464,7 +478,7 @@ class __extend__(pyframe.PyFrame):
         return self.getcode().co_varnames[index]
 
     def getconstant_w(self, index):
-        return self.getcode().co_consts_w[index]
+        return self.getcode().getconst_w(index)
 
     def getname_u(self, index):
         return self.space.str_w(self.getcode().co_names_w[index])
@@ -1303,6 +1317,40 @@ class __extend__(pyframe.PyFrame):
         w_dict = self.peekvalue()
         self.space.setitem(w_dict, w_key, w_value)
 
+    ## superinstructions, emitted with the 'superinstructions' option.
+    ## They run the instruction that follows them too, and return the
+    ## position after it.  LOAD_CONST_RETURN_VALUE is in
+    ## dispatch_bytecode().
+
+    def _second_oparg(self, next_instr):
+        # the argument of the second instruction of the pair, which
+        # becomes the current one
+        co_code = self.getcode().co_code
+        self.last_instr = intmask(next_instr)
+        lo = ord(co_code[next_instr + 1])
+        hi = ord(co_code[next_instr + 2])
+        return (hi * 256) | lo
+
+    def LOAD_FAST_LOAD_ATTR(self, varindex, next_instr):
+        self.LOAD_FAST(varindex, next_instr)
+        nameindex = self._second_oparg(next_instr)
+        next_instr += 3
+        self.LOAD_ATTR(nameindex, next_instr)
+        return next_instr
+
+    def LOAD_FAST_LOAD_FAST(self, varindex, next_instr):
+        self.LOAD_FAST(varindex, next_instr)
+        varindex2 = self._second_oparg(next_instr)
+        next_instr += 3
+        self.LOAD_FAST(varindex2, next_instr)
+        return next_instr
+
+    def COMPARE_OP_POP_JUMP_IF_FALSE(self, testnum, next_instr):
+        self.COMPARE_OP(testnum, next_instr)
+        target = self._second_oparg(next_instr)
+        next_instr += 3
+        return self.POP_JUMP_IF_FALSE(target, next_instr)
+
 
 ### ____________________________________________________________ ###
 
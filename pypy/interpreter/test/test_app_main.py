@@ -899,6 +899,20 @@ class TestNonInteractive:
         assert status == 1
         assert data.startswith("15\xe2\x82\xac")
 
+    def test_pypy_bundle(self):
+        from lib_pypy import _pypy_bundle
+        source = udir.join('demo_test_app_main_bundled.py')
+        source.write('print "bundled"\n')
+        bundle = str(udir.join('demo_test_app_main_bundle.zip'))
+        _pypy_bundle.write_bundle(bundle, {'bundledmod.pyc': str(source)})
+        env = os.environ.copy()
+        env["PYPY_BUNDLE"] = bundle
+        cmd = '-c "import sys, bundledmod; print sys.path[1]"'
+        data = self.run(cmd, env=env)
+        assert data == 'bundled\n%s\n' % (bundle,)
+        data = self.run('-E ' + cmd, env=env)
+        assert 'ImportError' in data
+
 
 class TestAppMain:
     def test_print_info(self):
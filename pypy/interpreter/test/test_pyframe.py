@@ -534,3 +534,7 @@ class AppTestPyFrame:
         res = f(10).g()
         sys.settrace(None)
         assert res == 10
+
+
+class AppTestPyFrameSuperinstructions(AppTestPyFrame):
+    spaceconfig = {"objspace.superinstructions": True}
@@ -342,6 +342,15 @@ def _make_reversed(space, w_seq, w_remaining):
     return space.wrap(iterator)
 
 
+def _unpack_range(start, length, step):
+    result = [0] * length
+    item = start
+    for i in range(length):
+        result[i] = item
+        item += step
+    return result
+
+
 class W_XRange(W_Root):
     def __init__(self, space, start, len, step, promote_step=False):
         self.space = space
@@ -379,6 +388,11 @@ class W_XRange(W_Root):
     def descr_len(self):
         return self.space.wrap(self.len)
 
+    def unpackiterable_int(self, space):
+        if self.len <= 0:
+            return None
+        return _unpack_range(self.start, self.len, self.step)
+
     @unwrap_spec(i='index')
     def descr_getitem(self, i):
         # xrange does NOT support slicing
@@ -476,6 +490,19 @@ class W_XRangeIterator(W_Root):
     def get_remaining(self):
         return self.remaining
 
+    def exact_length_hint(self, space):
+        return self.get_remaining()
+
+    def unpackiterable_int(self, space):
+        # consumes the iterator, like iterating over it would do
+        remaining = self.get_remaining()
+        if remaining <= 0:
+            return None
+        result = _unpack_range(self.current, remaining, self.step)
+        self.current += remaining * self.step
+        self.remaining = 0
+        return result
+
 W_XRangeIterator.typedef = TypeDef("rangeiterator",
     __iter__        = interp2app(W_XRangeIterator.descr_iter),
     __length_hint__ = interp2app(W_XRangeIterator.descr_len),
@@ -148,6 +148,28 @@ class AppTestXRange:
         # test again, to make sure that xrange() is not its own iterator
         assert iter(x).next() == 2
 
+    def test_xrange_unpack_into_list(self):
+        from __pypy__ import strategy
+        l = list(xrange(2, 9, 3))
+        assert l == [2, 5, 8]
+        assert strategy(l) == "IntegerListStrategy"
+        it = iter(xrange(5))
+        assert it.next() == 0
+        l = [-1]
+        l.extend(it)
+        assert l == [-1, 1, 2, 3, 4]
+        assert strategy(l) == "IntegerListStrategy"
+        assert list(it) == []
+        raises(StopIteration, it.next)
+        it = reversed(xrange(3))
+        l = [1.5]
+        l.extend(it)
+        assert l == [1.5, 2, 1, 0]
+        assert list(it) == []
+        l = [7]
+        l.extend(xrange(0))
+        assert l == [7]
+
     def test_xrange_object_with___int__(self):
         class A(object):
             def __int__(self):
@@ -623,6 +623,12 @@ class ArrayBuffer(Buffer):
                 self.array._charbuf_stop()
         return Buffer.getslice(self, start, stop, step, size)
 
+    def setslice(self, start, string):
+        data = self.array._charbuf_start()
+        copy_string_to_raw(llstr(string), rffi.ptradd(data, start),
+                           0, len(string))
+        self.array._charbuf_stop()
+
     def get_raw_address(self):
         return self.array._charbuf_start()
 
@@ -433,6 +433,16 @@ class BaseArrayTests:
         exc = raises(TypeError, "buf[3] = 'L'")
         assert str(exc.value) == "buffer is read-only"
 
+    def test_readinto(self):
+        f = open(self.tempfile, 'w')
+        f.write('HELLO')
+        f.close()
+        a = self.array('c', 'hello world')
+        f = open(self.tempfile, 'r')
+        assert f.readinto(a) == 5
+        f.close()
+        assert a.tostring() == 'HELLO world'
+
     def test_buffer_keepalive(self):
         buf = buffer(self.array('c', 'text'))
         assert buf[2] == 'x'
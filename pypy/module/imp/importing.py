@@ -2,7 +2,7 @@
 Implementation of the interpreter-level default import logic.
 """
 
-import sys, os, stat
+import sys, os, stat, time
 
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -465,6 +465,59 @@ W_NullImporter.typedef = TypeDef(
     find_module=interp2app(W_NullImporter.find_module_w),
     )
 
+class DirectoryCache(object):
+    """Caches the listings of the directories of sys.path, so that
+    find_module() only has to stat() the candidate files in the
+    directories that contain a name starting with the module name.
+    A listing is read again when the mtime of its directory changes;
+    imp.invalidate_caches() forgets all of them.
+    """
+    # a listing is not kept if the directory was modified less than this
+    # many seconds before it was read: on filesystems with a coarse mtime
+    # resolution, a file created just afterwards would not change it
+    MTIME_MARGIN = 2.0
+
+    def __init__(self, space):
+        self.mtimes = {}
+        self.listings = {}
+
+    def clear(self):
+        self.mtimes.clear()
+        self.listings.clear()
+
+    def may_contain(self, path, partname):
+        """Return False if the directory 'path' contains no file or
+        subdirectory whose name is 'partname' followed by a suffix."""
+        if not path:
+            path = os.curdir
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return True
+        if self.mtimes.get(path, -1.0) == mtime:
+            listing = self.listings[path]
+        else:
+            try:
+                names = os.listdir(path)
+            except OSError:
+                return True
+            listing = {}
+            for name in names:
+                dot = name.find('.')
+                if dot >= 0:
+                    name = name[:dot]
+                listing[name] = None
+            if time.time() - mtime > self.MTIME_MARGIN:
+                self.mtimes[path] = mtime
+                self.listings[path] = listing
+            elif path in self.mtimes:
+                del self.mtimes[path]
+                del self.listings[path]
+        return partname in listing
+
+def getdircache(space):
+    return space.fromcache(DirectoryCache)
+
 class FindInfo:
     def __init__(self, modtype, filename, stream,
                  suffix="", filemode="", w_loader=None):
@@ -521,6 +574,8 @@ def find_module(space, modulename, w_modulename, partname, w_path,
                     return FindInfo.fromLoader(w_loader)
 
             path = space.str0_w(w_pathitem)
+            if not getdircache(space).may_contain(path, partname):
+                continue
             filepart = os.path.join(path, partname)
             if os.path.isdir(filepart) and case_ok(filepart):
                 initfile = os.path.join(filepart, '__init__')
@@ -826,6 +881,7 @@ def getimportlock(space):
 #     CPython + 0                  -- used by CPython without the -U option
 #     CPython + 1                  -- used by CPython with the -U option
 #     CPython + 7 = default_magic  -- used by PyPy (incompatible!)
+#     CPython + 8                  -- used by PyPy with superinstructions
 #
 from pypy.interpreter.pycode import default_magic
 MARSHAL_VERSION_FOR_PYC = 2
@@ -838,6 +894,8 @@ def get_pyc_magic(space):
             magic = __import__('imp').get_magic()
             return struct.unpack('<i', magic)[0]
 
+    if space.config.objspace.superinstructions:
+        return default_magic + 1
     return default_magic
 
 
@@ -907,11 +965,13 @@ def update_code_filenames(space, code_w, pathname, oldname=None):
     assert isinstance(code_w, PyCode)
     if oldname is None:
         oldname = code_w.co_filename
+        if oldname == pathname:
+            return
     elif code_w.co_filename != oldname:
         return
 
     code_w.co_filename = pathname
-    constants = code_w.co_consts_w
+    constants = code_w.getconsts_w()
     for const in constants:
         if const is not None and isinstance(const, PyCode):
             update_code_filenames(space, const, pathname, oldname)
@@ -973,8 +1033,8 @@ def check_compiled_module(space, pycfilename, expected_mtime):
 def read_compiled_module(space, cpathname, strbuf):
     """ Read a code object from a file and check it for validity """
 
-    w_marshal = space.getbuiltinmodule('marshal')
-    w_code = space.call_method(w_marshal, 'loads', space.wrap(strbuf))
+    from pypy.module.marshal.interp_marshal import loads_code
+    w_code = loads_code(space, space.wrap(strbuf))
     if not isinstance(w_code, Code):
         raise oefmt(space.w_ImportError, "Non-code object in %s", cpathname)
     return w_code
@@ -161,6 +161,12 @@ def is_builtin(space, w_name):
 def is_frozen(space, w_name):
     return space.w_False
 
+def invalidate_caches(space):
+    """Forget the cached listings of the directories searched by imports.
+    Only needed when a module is created in a directory of sys.path
+    without changing the directory's modification time."""
+    importing.getdircache(space).clear()
+
 #__________________________________________________________________
 
 def lock_held(space):
@@ -689,6 +689,45 @@ class TestAbi:
             assert importing.get_so_extension(space1) == '.TESTi.so'
             assert importing.get_so_extension(space2) == '.so'
 
+class TestDirectoryCache:
+    def test_may_contain(self):
+        cache = importing.DirectoryCache(self.space)
+        d = udir.ensure('dircache1', dir=True)
+        d.join('mod1.py').write('')
+        d.join('mod2.pyc').write('')
+        d.join('ext.pypy-26.so').write('')
+        d.ensure('pkg', dir=True)
+        path = str(d)
+        for name in ['mod1', 'mod2', 'ext', 'pkg']:
+            assert cache.may_contain(path, name)
+        assert not cache.may_contain(path, 'mod3')
+        assert not cache.may_contain(path, 'mod1.py')
+        # not a directory: don't know
+        assert cache.may_contain(str(d.join('mod1.py')), 'mod3')
+        assert cache.may_contain(str(d.join('nonexistent')), 'mod3')
+
+    def test_mtime(self):
+        cache = importing.DirectoryCache(self.space)
+        d = udir.ensure('dircache2', dir=True)
+        path = str(d)
+        mtime = os.stat(path).st_mtime - 10
+        os.utime(path, (mtime, mtime))
+        assert not cache.may_contain(path, 'mod1')
+        assert path in cache.listings
+        d.join('mod1.py').write('')
+        # the listing is read again when the mtime changes...
+        assert cache.may_contain(path, 'mod1')
+        # ...but not kept if the directory was just modified
+        assert path not in cache.listings
+        os.utime(path, (mtime, mtime))
+        assert cache.may_contain(path, 'mod1')
+        assert path in cache.listings
+        d.join('mod1.py').remove()
+        os.utime(path, (mtime, mtime))
+        assert cache.may_contain(path, 'mod1')     # from the cache
+        cache.clear()
+        assert not cache.may_contain(path, 'mod1')
+
 def _getlong(data):
     x = marshal.dumps(data)
     return x[-4:]
@@ -1022,6 +1061,74 @@ class TestPycStuff:
                     stream.close()
 
 
+class TestLazyCodeLoading:
+    spaceconfig = {"objspace.lazycodeloading": True}
+
+    def read_code(self, source):
+        space = self.space
+        pathname = _testfilesource(source)
+        code_w = importing.parse_source_module(space, pathname, source)
+        w_marshal = space.getbuiltinmodule('marshal')
+        w_str = space.call_method(w_marshal, 'dumps', code_w,
+                        space.wrap(importing.MARSHAL_VERSION_FOR_PYC))
+        return code_w, importing.read_compiled_module(space, 'test.pyc',
+                                                      space.str_w(w_str))
+
+    def test_nested_code_is_lazy(self):
+        from pypy.interpreter.pycode import PyCode, W_LazyCode
+        space = self.space
+        code_w, lazy_w = self.read_code(
+            "def f(x):\n"
+            "    def g(y):\n"
+            "        return x + y + len('interned')\n"
+            "    return g\n"
+            "if len('x') == 2:\n"
+            "    def unused(interned):\n"
+            "        return interned\n"
+            "class A(object):\n"
+            "    def m(self):\n"
+            "        return 'interned'\n"
+            "res = f(1)(2), A().m()\n")
+        lazy_consts = [w_const for w_const in lazy_w.co_consts_w
+                       if isinstance(w_const, W_LazyCode)]
+        assert len(lazy_consts) == 3
+        w_dic = space.newdict()
+        lazy_w.exec_code(space, w_dic, w_dic)
+        assert space.unwrap(space.getitem(w_dic, space.wrap('res'))) == (
+            11, 'interned')
+        w_f, w_unused, w_A = lazy_consts
+        assert w_f.w_code is not None and w_A.w_code is not None
+        assert w_unused.w_code is None
+        # the code objects nested in f are lazy again
+        assert isinstance(w_f.w_code.co_consts_w[1], W_LazyCode)
+        # lazy code objects never show up at app-level
+        assert space.eq_w(lazy_w, code_w)
+        w_consts = space.getattr(lazy_w, space.wrap('co_consts'))
+        for w_const in space.fixedview(w_consts):
+            assert not isinstance(w_const, W_LazyCode)
+        assert w_unused.w_code is not None
+        assert isinstance(w_unused.w_code, PyCode)
+        assert w_unused.w_code.co_varnames == ['interned']
+
+    def test_marshal_loads_is_not_lazy(self):
+        from pypy.interpreter.pycode import W_LazyCode
+        space = self.space
+        code_w, lazy_w = self.read_code("def f(): pass\n")
+        w_marshal = space.getbuiltinmodule('marshal')
+        w_str = space.call_method(w_marshal, 'dumps', lazy_w)
+        w_code = space.call_method(w_marshal, 'loads', w_str)
+        for w_const in w_code.co_consts_w:
+            assert not isinstance(w_const, W_LazyCode)
+        assert space.eq_w(w_code, code_w)
+
+
+class AppTestImportLazyCode(AppTestImport):
+    spaceconfig = {
+        "usemodules": ['_md5', 'time'],
+        "objspace.lazycodeloading": True,
+    }
+
+
 def test_PYTHONPATH_takes_precedence(space): 
     if sys.platform == "win32":
         py.test.skip("unresolved issues with win32 shell quoting rules")
@@ -1230,6 +1337,27 @@ class AppTestPyPyExtension(object):
         raises(IOError, imp._run_compiled_module,
                'foobar', 'this_file_does_not_exist', None, module)
 
+    def test_invalidate_caches(self):
+        import imp, os, sys
+        path = os.path.join(self.udir, 'test_invalidate_caches')
+        os.mkdir(path)
+        sys.path.insert(0, path)
+        try:
+            mtime = os.stat(path).st_mtime - 10
+            os.utime(path, (mtime, mtime))
+            raises(ImportError, "import invalidate_caches_mod")
+            f = open(os.path.join(path, 'invalidate_caches_mod.py'), 'w')
+            f.write('x = 42\n')
+            f.close()
+            os.utime(path, (mtime, mtime))
+            raises(ImportError, "import invalidate_caches_mod")
+            imp.invalidate_caches()
+            import invalidate_caches_mod
+            assert invalidate_caches_mod.x == 42
+        finally:
+            sys.path.remove(path)
+            sys.modules.pop('invalidate_caches_mod', None)
+
     def test_getimporter(self):
         import imp, os
         # an existing directory
@@ -105,6 +105,29 @@ class W_Repeat(W_Root):
             return self.space.w_NotImplemented
         return self.space.wrap(self.count)
 
+    def exact_length_hint(self, space):
+        if not self.counting or self.user_overridden_class:
+            return -1
+        return self.count
+
+    def _unpack(self):
+        # consumes the iterator, like iterating over it would do
+        count = self.count
+        self.count = 0
+        return count
+
+    def unpackiterable_int(self, space):
+        if (not self.counting or self.count <= 0 or self.user_overridden_class
+                or not space.is_w(space.type(self.w_obj), space.w_int)):
+            return None
+        return [space.int_w(self.w_obj)] * self._unpack()
+
+    def unpackiterable_float(self, space):
+        if (not self.counting or self.count <= 0 or self.user_overridden_class
+                or not space.is_w(space.type(self.w_obj), space.w_float)):
+            return None
+        return [space.float_w(self.w_obj)] * self._unpack()
+
     def repr_w(self):
         objrepr = self.space.str_w(self.space.repr(self.w_obj))
         if self.counting:
@@ -561,6 +584,33 @@ class W_IMap(W_Root):
         # the loop is out of the way of the JIT
         return [self.space.next(w_elem) for w_elem in self.iterators_w]
 
+    def length_w(self):
+        hint = self._length_hint()
+        if hint < 0:
+            return self.space.w_NotImplemented
+        return self.space.wrap(hint)
+
+    def _length_hint(self):
+        # stops with the shortest iterator, so this is the smallest of their
+        # length hints.  CPython has no hint here, so only the iterators
+        # whose hint runs no app-level code are asked.
+        space = self.space
+        if not self.iterators_w:
+            return 0
+        result = -1
+        for w_iterator in self.iterators_w:
+            hint = w_iterator.exact_length_hint(space)
+            if hint < 0:
+                return -1
+            if result < 0 or hint < result:
+                result = hint
+        return result
+
+    def exact_length_hint(self, space):
+        if self.user_overridden_class:
+            return -1
+        return self._length_hint()
+
 
 def W_IMap___new__(space, w_subtype, w_fun, args_w):
     if len(args_w) == 0:
@@ -574,6 +624,7 @@ W_IMap.typedef = TypeDef(
         'itertools.imap',
         __new__  = interp2app(W_IMap___new__),
         __iter__ = interp2app(W_IMap.iter_w),
+        __length_hint__ = interp2app(W_IMap.length_w),
         next     = interp2app(W_IMap.next_w),
         __doc__  = """Make an iterator that computes the function using arguments
     from each of the iterables. If function is set to None, then
@@ -618,6 +669,7 @@ W_IZip.typedef = TypeDef(
         'itertools.izip',
         __new__  = interp2app(W_IZip___new__),
         __iter__ = interp2app(W_IZip.iter_w),
+        __length_hint__ = interp2app(W_IZip.length_w),
         next     = interp2app(W_IZip.next_w),
         __doc__  = """Make an iterator that aggregates elements from each of the
     iterables.  Like zip() except that it returns an iterator instead
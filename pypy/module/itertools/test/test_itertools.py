@@ -66,6 +66,20 @@ class AppTestItertools:
         raises(StopIteration, it.next)
         raises(StopIteration, it.next)
 
+    def test_repeat_unpack_into_list(self):
+        import itertools
+        l = [0]
+        l.extend(itertools.repeat(5, 3))
+        assert l == [0, 5, 5, 5]
+        l = [0.5]
+        it = itertools.repeat(1.5, 2)
+        l.extend(it)
+        assert l == [0.5, 1.5, 1.5]
+        raises(StopIteration, it.next)
+        l = [0]
+        l.extend(itertools.repeat(1.5, 2))
+        assert l == [0, 1.5, 1.5]
+
     def test_repeat_overflow(self):
         import itertools
         import sys
@@ -384,6 +398,41 @@ class AppTestItertools:
         raises(TypeError, itertools.imap, bool)
         raises(TypeError, itertools.imap, 42)
 
+    def test_imap_izip_length_hint(self):
+        import itertools, operator
+        it = itertools.imap(operator.add, [1, 2, 3], xrange(5))
+        assert operator._length_hint(it, -1) == 3
+        it.next()
+        assert operator._length_hint(it, -1) == 2
+        it = itertools.imap(operator.add, [1, 2, 3], (x for x in []))
+        assert operator._length_hint(it, -1) == -1
+        it = itertools.izip(xrange(2), "abc")
+        assert operator._length_hint(it, -1) == 2
+        assert operator._length_hint(itertools.izip(), -1) == 0
+
+    def test_imap_izip_length_hint_no_len(self):
+        # CPython's imap() and izip() have no length hint: they must not
+        # call len() or __length_hint__ on the iterators they consume
+        import itertools, operator
+        class A(object):
+            def __iter__(self):
+                return self
+            def next(self):
+                raise StopIteration
+            def __len__(self):
+                raise ValueError
+            def __length_hint__(self):
+                raise ValueError
+        for it in [itertools.imap(None, A()), itertools.izip([1], A())]:
+            assert operator._length_hint(it, -1) == -1
+            assert list(it) == []
+        class B(list):
+            def __len__(self):
+                raise ValueError
+        assert list(itertools.izip(B([1, 2]), [3, 4])) == [(1, 3), (2, 4)]
+        it = itertools.imap(None, itertools.repeat(1, 5), iter((1, 2, 3)))
+        assert operator._length_hint(it, -1) == 3
+
     def test_izip(self):
         import itertools
 
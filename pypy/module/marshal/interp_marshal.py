@@ -53,6 +53,13 @@ ignored."""
     obj = u.load_w_obj()
     return obj
 
+def loads_code(space, w_str):
+    """Like loads(), but with the 'lazycodeloading' option the code
+    objects nested in the result are only unmarshalled when used."""
+    u = StringUnmarshaller(space, w_str)
+    u.lazy_code = space.config.objspace.lazycodeloading
+    return u.load_w_obj()
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -347,6 +354,13 @@ class Unmarshaller(_Base):
     for tc, func in get_unmarshallers():
         _dispatch[ord(tc)] = func
 
+    # unmarshal the code objects nested in code objects lazily
+    # (only for StringUnmarshaller, see pycode.W_LazyCode)
+    lazy_code = False
+    # if True, stringtable_w already contains the interned strings that
+    # are read, and they are not added to it again
+    stringtable_complete = False
+
     def __init__(self, space, reader):
         self.space = space
         self.reader = reader
@@ -477,6 +491,11 @@ class StringUnmarshaller(Unmarshaller):
         self.bufpos = newpos
         return self.bufstr[pos : newpos]
 
+    def skip(self, n):
+        if not 0 <= n <= self.limit - self.bufpos:
+            self.raise_eof()
+        self.bufpos += n
+
     def get1(self):
         pos = self.bufpos
         if pos >= self.limit:
@@ -4,7 +4,9 @@ from rpython.rlib.buffer import Buffer
 from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.rawstorage import alloc_raw_storage, free_raw_storage, \
     raw_storage_getitem, raw_storage_setitem, RAW_STORAGE
+from rpython.rtyper.annlowlevel import llstr
 from rpython.rtyper.lltypesystem import rffi, lltype
+from rpython.rtyper.lltypesystem.rstr import copy_string_to_raw
 from pypy.module.micronumpy import support, loop
 from pypy.module.micronumpy.base import convert_to_array, W_NDimArray, \
     ArrayArgumentException
@@ -495,5 +497,17 @@ class ArrayBuffer(Buffer):
     def getlength(self):
         return self.impl.size
 
+    def getslice(self, start, stop, step, size):
+        if size == 0:
+            return ''
+        if step == 1:
+            return rffi.charpsize2str(rffi.ptradd(self.impl.storage, start),
+                                      size)
+        return Buffer.getslice(self, start, stop, step, size)
+
+    def setslice(self, start, string):
+        copy_string_to_raw(llstr(string), rffi.ptradd(self.impl.storage, start),
+                           0, len(string))
+
     def get_raw_address(self):
         return self.impl.storage
@@ -351,6 +351,9 @@ class AppTestNumArray(BaseNumpyAppTest):
         assert 'read-only buffer' in repr(b)
         exc = raises(TypeError, "b[0] = '0'")
         assert str(exc.value) == 'buffer is read-only'
+        a = np.array([1, 2, 3, 4], dtype=np.int8)
+        assert buffer(a)[1:3] == '\x02\x03'
+        assert buffer(a, 1, 2)[1:] == '\x03'
 
     def test_type(self):
         from numpy import array
@@ -5,6 +5,8 @@ good assembler
 import py
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.metainterp.warmspot import reset_jit, get_stats
+from rpython.jit.metainterp.warmspot import set_enable_opts
+from rpython.jit.metainterp.optimizeopt import ALL_OPTS_NAMES
 from pypy.module.micronumpy import boxes
 from pypy.module.micronumpy.compile import FakeSpace, Parser, InterpreterState
 from pypy.module.micronumpy.base import W_NDimArray
@@ -68,9 +70,10 @@ class TestNumpyJit(LLJitMixin):
             self.__class__.interp = interp
             self.__class__.graph = graph
 
-    def run(self, name):
+    def run(self, name, enable_opts=ALL_OPTS_NAMES):
         self.compile_graph()
         reset_jit()
+        set_enable_opts(enable_opts)
         i = self.code_mapping[name]
         retval = self.interp.eval_graph(self.graph, [i])
         return retval
@@ -112,6 +115,29 @@ class TestNumpyJit(LLJitMixin):
             'raw_store': 1,
         })
 
+    def define_vectorize_add():
+        return """
+        a = |31|
+        b = |31|
+        c = a + b
+        c -> 30
+        """
+
+    def test_vectorize_add(self):
+        result = self.run("vectorize_add", enable_opts='all:vec')
+        assert result == 30 + 30
+        # two elements per iteration; the loop still loads the values of
+        # the second one, which are passed to the next iteration
+        self.check_simple_loop(vec_raw_float_add=1, float_add=0,
+                               raw_load=2, raw_store=0,
+                               guard_not_invalidated=1, guard_false=1)
+
+    def test_vectorize_add_not_enabled(self):
+        result = self.run("vectorize_add")
+        assert result == 30 + 30
+        self.check_simple_loop(vec_raw_float_add=0, float_add=1,
+                               raw_load=2, raw_store=1)
+
     def define_pow():
         return """
         a = |30| ** 2
@@ -14,6 +14,9 @@ class Module(MixedModule):
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'enable_debug': 'interp_resop.enable_debug',
         'disable_debug': 'interp_resop.disable_debug',
+        'compile_pending': 'interp_resop.compile_pending',
+        'enable_warmup_profile': 'interp_warmup.enable_warmup_profile',
+        'dump_warmup_profile': 'interp_warmup.dump_warmup_profile',
         'ResOperation': 'interp_resop.WrappedOp',
         'DebugMergePoint': 'interp_resop.DebugMergePoint',
         'JitLoopInfo': 'interp_resop.W_JitLoopInfo',
@@ -32,3 +35,7 @@ class Module(MixedModule):
         w_obj = space.wrap(PARAMETERS)
         space.setattr(space.wrap(self), space.wrap('defaults'), w_obj)
         pypy_hooks.space = space
+
+    def shutdown(self, space):
+        from pypy.module.pypyjit.interp_warmup import WarmupProfile
+        space.fromcache(WarmupProfile).shutdown()
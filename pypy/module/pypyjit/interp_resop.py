@@ -277,6 +277,10 @@ class W_JitLoopInfo(W_Root):
     bridge_no   = 0
     asmaddr     = 0
     asmlen      = 0
+    tracing_time = 0.0
+    optimizing_time = 0.0
+    backend_time = 0.0
+    num_guards  = 0
 
     def __init__(self, space, debug_info, is_bridge=False):
         logops = debug_info.logger._make_log_operations()
@@ -303,6 +307,10 @@ class W_JitLoopInfo(W_Root):
         if asminfo is not None:
             self.asmaddr = asminfo.asmaddr
             self.asmlen = asminfo.asmlen
+        self.tracing_time = debug_info.tracing_time
+        self.optimizing_time = debug_info.optimizing_time
+        self.backend_time = debug_info.backend_time
+        self.num_guards = debug_info.num_guards
 
     def descr_repr(self, space):
         lgt = space.int_w(space.len(self.w_ops))
@@ -318,6 +326,17 @@ class W_JitLoopInfo(W_Root):
             return space.wrap(self.bridge_no)
         raise OperationError(space.w_TypeError, space.wrap("not a bridge"))
 
+    def descr_get_entry_count(self, space):
+        if space.is_none(self.w_green_key):
+            tp, number = 'b', self.bridge_no
+        else:
+            tp, number = 'e', self.loop_no
+        ll_times = jit_hooks.stats_get_loop_run_times(None)
+        for i in range(len(ll_times)):
+            if ll_times[i].type == tp and ll_times[i].number == number:
+                return space.wrap(ll_times[i].counter)
+        return space.wrap(-1)
+
 
 @unwrap_spec(loopno=int, asmaddr=int, asmlen=int, loop_no=int,
              type=str, jd_name=str, bridge_no=int)
@@ -357,6 +376,20 @@ W_JitLoopInfo.typedef = TypeDef(
                                   doc="Address of machine code"),
     asmlen = interp_attrproperty('asmlen', cls=W_JitLoopInfo,
                                   doc="Length of machine code"),
+    tracing_time = interp_attrproperty('tracing_time', cls=W_JitLoopInfo,
+                                  doc="Seconds spent tracing"),
+    optimizing_time = interp_attrproperty('optimizing_time',
+                                  cls=W_JitLoopInfo,
+                                  doc="Seconds spent in the optimizer"),
+    backend_time = interp_attrproperty('backend_time', cls=W_JitLoopInfo,
+                                  doc="Seconds spent producing machine code "
+                                      "(0.0 before it is compiled)"),
+    num_guards = interp_attrproperty('num_guards', cls=W_JitLoopInfo,
+                                  doc="Number of guards"),
+    entry_count = GetSetProperty(W_JitLoopInfo.descr_get_entry_count,
+                                 doc="How many times the machine code was "
+                                     "entered so far, or -1 if unknown "
+                                     "(see enable_debug())"),
     __repr__ = interp2app(W_JitLoopInfo.descr_repr),
 )
 W_JitLoopInfo.acceptable_as_base_class = False
@@ -416,3 +449,13 @@ def disable_debug(space):
     marginally faster and the counters will stop working.
     """
     jit_hooks.stats_set_debug(None, False)
+
+@unwrap_spec(max_loops=int)
+def compile_pending(space, max_loops=-1):
+    """ Optimize and assemble the loops that were traced while the
+    'defer_compilation' parameter was set, at most 'max_loops' of them
+    (all of them by default), and return how many were handled.  Call
+    it when the program is idle, e.g. between two requests.  The pending
+    loops are also all compiled when one of them gets hot again.
+    """
+    return space.wrap(jit_hooks.stats_compile_pending(None, max_loops))
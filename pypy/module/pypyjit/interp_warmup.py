@@ -0,0 +1,184 @@
+"""Persisted warmup profiles.
+
+When enabled with pypyjit.enable_warmup_profile(filename), we remember
+the green keys of all the loops compiled by the JIT and save them to
+'filename' when the process exits.  At the next start, the same call
+reloads the profile: when a code object matching a saved entry is
+created, its green keys are marked as hot, and the JIT traces them
+after a few iterations instead of waiting for the full 'threshold'.
+
+Code objects are identified across processes by their filename, their
+first line number and a hash of their bytecode.  Each line of the file
+is one green key, as tab-separated fields:
+
+    firstlineno  bytecode-hash  next_instr  entry-count  filename
+"""
+
+import errno
+import weakref
+
+from rpython.rlib import jit_hooks, streamio
+from rpython.rlib.objectmodel import compute_hash
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.streamio import StreamErrors
+from rpython.rtyper.annlowlevel import cast_base_ptr_to_instance
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.streamutil import wrap_streamerror
+
+HEADER = '# pypyjit warmup profile\n'
+
+
+def code_key(pycode):
+    return make_code_key(pycode.co_firstlineno, compute_hash(pycode.co_code),
+                         pycode.co_filename)
+
+def make_code_key(firstlineno, codehash, filename):
+    return '%d\t%d\t%s' % (firstlineno, codehash, filename)
+
+
+class WarmupEntry(object):
+    def __init__(self, codekey, next_instr, count):
+        self.codekey = codekey
+        self.next_instr = next_instr
+        self.count = count
+        self.wref_looptoken = None
+
+    def get_count(self):
+        count = self.count
+        if self.wref_looptoken is not None:
+            looptoken = self.wref_looptoken()
+            if looptoken is not None:
+                count += looptoken.invocations
+        return count
+
+    def format(self):
+        # the filename goes last, as it could contain anything
+        i = self.codekey.rfind('\t')
+        assert i >= 0
+        return '%s\t%d\t%d\t%s\n' % (self.codekey[:i], self.next_instr,
+                                      self.get_count(), self.codekey[i + 1:])
+
+
+class WarmupProfile(object):
+    def __init__(self, space):
+        self.space = space
+        self.enabled = False
+        self.filename = None
+        # code_key -> list of next_instr, from the loaded profile
+        self.pending = {}
+        # (code_key, next_instr) -> WarmupEntry, to be saved
+        self.entries = {}
+
+    def load(self, filename):
+        stream = streamio.open_file_as_stream(filename, 'r')
+        try:
+            if stream.readline() != HEADER:
+                return
+            while True:
+                line = stream.readline()
+                if not line:
+                    break
+                self._load_line(line)
+        finally:
+            stream.close()
+
+    def _load_line(self, line):
+        fields = line.split('\t')
+        if len(fields) != 5 or not fields[4].endswith('\n'):
+            return    # ignore malformed lines
+        try:
+            firstlineno = int(fields[0])
+            codehash = int(fields[1])
+            next_instr = int(fields[2])
+            count = int(fields[3])
+        except ValueError:
+            return
+        filename = fields[4][:-1]
+        codekey = make_code_key(firstlineno, codehash, filename)
+        if codekey in self.pending:
+            self.pending[codekey].append(next_instr)
+        else:
+            self.pending[codekey] = [next_instr]
+        # keep the entries of the previous run, even if they are not
+        # compiled again this time
+        entry = WarmupEntry(codekey, next_instr, count)
+        self.entries[(codekey, next_instr)] = entry
+
+    def save(self, filename):
+        stream = streamio.open_file_as_stream(filename, 'w')
+        try:
+            stream.write(HEADER)
+            for entry in self.entries.values():
+                stream.write(entry.format())
+        finally:
+            stream.close()
+
+    def code_created(self, pycode):
+        next_instrs = self.pending.get(code_key(pycode), None)
+        if next_instrs is not None:
+            for next_instr in next_instrs:
+                jit_hooks.trace_next_iteration('pypyjit', r_uint(next_instr),
+                                               False, pycode)
+
+    def loop_compiled(self, debug_info):
+        if not self.enabled or debug_info.get_jitdriver().name != 'pypyjit':
+            return
+        greenkey = debug_info.greenkey
+        next_instr = greenkey[0].getint()
+        is_being_profiled = greenkey[1].getint()
+        if is_being_profiled:
+            return
+        ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                         greenkey[2].getref_base())
+        pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+        codekey = code_key(pycode)
+        entry = self.entries.get((codekey, next_instr), None)
+        if entry is None:
+            entry = WarmupEntry(codekey, next_instr, 0)
+            self.entries[(codekey, next_instr)] = entry
+        else:
+            entry.count = entry.get_count()
+        entry.wref_looptoken = weakref.ref(debug_info.looptoken)
+
+    def shutdown(self):
+        if self.filename is not None:
+            try:
+                self.save(self.filename)
+            except StreamErrors:
+                pass    # too late to report anything
+
+
+def code_created(pycode):
+    profile = pycode.space.fromcache(WarmupProfile)
+    if profile.pending:
+        profile.code_created(pycode)
+
+
+@unwrap_spec(filename='str0')
+def enable_warmup_profile(space, filename):
+    """Record the green keys of the loops compiled by the JIT, and save
+    them to 'filename' at exit.  If the file already exists, load it
+    first: the code objects created from now on that were hot in the
+    previous run will be traced again as soon as possible."""
+    profile = space.fromcache(WarmupProfile)
+    try:
+        profile.load(filename)
+    except OSError, e:
+        if e.errno != errno.ENOENT:
+            raise wrap_streamerror(space, e, space.wrap(filename))
+    except StreamErrors, e:
+        raise wrap_streamerror(space, e, space.wrap(filename))
+    profile.enabled = True
+    profile.filename = filename
+
+@unwrap_spec(filename='str0')
+def dump_warmup_profile(space, filename):
+    """Save the current warmup profile to 'filename'."""
+    profile = space.fromcache(WarmupProfile)
+    try:
+        profile.save(filename)
+    except StreamErrors, e:
+        raise wrap_streamerror(space, e, space.wrap(filename))
@@ -18,7 +18,8 @@ class PyPyJitPolicy(JitPolicy):
                 return False
         else:
             rest = ''
-        if modname == 'pypyjit' and 'interp_resop' in rest:
+        if modname == 'pypyjit' and ('interp_resop' in rest or
+                                     'interp_warmup' in rest):
             return False
         return True
 
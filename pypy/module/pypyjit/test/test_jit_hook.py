@@ -68,7 +68,8 @@ class AppTestJitHook(object):
         token = JitCellToken()
         token.number = 0
         di_loop = JitDebugInfo(MockJitDriverSD, logger, token, oplist, 'loop',
-                   greenkey)
+                   greenkey, tracing_time=0.5, optimizing_time=0.25)
+        di_loop.backend_time = 0.125
         di_loop_optimize = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
                                         oplist, 'loop', greenkey)
         di_loop.asminfo = AsmInfo(offset, 0x42, 12)
@@ -147,6 +148,25 @@ class AppTestJitHook(object):
         self.on_compile()
         assert len(all) == 2
 
+    def test_on_compile_times(self):
+        import pypyjit
+        all = []
+
+        def hook(info):
+            all.append(info)
+
+        pypyjit.set_compile_hook(hook)
+        self.on_compile()
+        self.on_compile_bridge()
+        info, bridge_info = all
+        assert info.tracing_time == 0.5
+        assert info.optimizing_time == 0.25
+        assert info.backend_time == 0.125
+        assert info.num_guards == 2
+        assert info.asmlen == 12
+        assert bridge_info.tracing_time == 0.0
+        assert bridge_info.num_guards == 2
+
     def test_on_compile_exception(self):
         import pypyjit, sys, cStringIO
 
@@ -275,3 +295,42 @@ class AppTestJitHook(object):
         assert isinstance(stats.w_counters, dict)
         assert sorted(stats.w_counters.keys()) == self.sorted_keys
 
+
+
+class AppTestCompilePending(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+
+    def setup_method(self, meth):
+        from pypy.module.pypyjit import interp_resop
+        pending = self.__class__.pending = [3]
+        calls = self.__class__.calls = []
+        def stats_compile_pending(warmrunnerdesc, max_loops):
+            calls.append(max_loops)
+            if max_loops < 0 or max_loops > pending[0]:
+                max_loops = pending[0]
+            pending[0] -= max_loops
+            return max_loops
+        self.orig_jit_hooks = interp_resop.jit_hooks
+        class jit_hooks:
+            pass
+        jit_hooks.stats_compile_pending = staticmethod(stats_compile_pending)
+        interp_resop.jit_hooks = jit_hooks
+        self.w_calls = self.space.wrap(interp2app(lambda space:
+                                                  space.wrap(calls)))
+
+    def teardown_method(self, meth):
+        from pypy.module.pypyjit import interp_resop
+        interp_resop.jit_hooks = self.orig_jit_hooks
+
+    def test_compile_pending(self):
+        import pypyjit
+        assert pypyjit.compile_pending(2) == 2
+        assert pypyjit.compile_pending() == 1
+        assert pypyjit.compile_pending() == 0
+        assert pypyjit.compile_pending(max_loops=5) == 0
+        assert self.calls() == [2, -1, -1, 5]
+        raises(TypeError, pypyjit.compile_pending, 'x')
@@ -0,0 +1,116 @@
+import py
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.module.pypyjit import interp_warmup
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rlib.jit import JitDebugInfo
+
+
+class MockJitDriverSD(object):
+    jitdriver = pypyjitdriver
+
+
+class AppTestWarmupProfile(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        cls.tokens = []
+
+        @unwrap_spec(next_instr=int, invocations=int)
+        def interp_on_compile(space, w_code, next_instr, invocations):
+            ll_code = cast_instance_to_base_ptr(space.interp_w(
+                interp_warmup.PyCode, w_code))
+            code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+            greenkey = [ConstInt(next_instr), ConstInt(0),
+                        ConstPtr(code_gcref)]
+            token = JitCellToken()
+            token.invocations = invocations
+            cls.tokens.append(token)     # keep it alive
+            di_loop = JitDebugInfo(MockJitDriverSD, None, token, [], 'loop',
+                                   greenkey)
+            # don't go through pypy_hooks: it would also run whatever
+            # app-level hook other tests left installed
+            space.fromcache(interp_warmup.WarmupProfile).loop_compiled(
+                di_loop)
+
+        def interp_get_boosted():
+            return space.newlist([space.newtuple([w_code, space.wrap(i)])
+                                  for w_code, i in cls.boosted])
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_get_boosted = space.wrap(interp2app(interp_get_boosted))
+        cls.w_tmpdir = space.wrap(str(py.test.ensuretemp('warmup')))
+
+    def setup_method(self, meth):
+        profile = self.space.fromcache(interp_warmup.WarmupProfile)
+        profile.__init__(self.space)
+        boosted = self.__class__.boosted = []
+        def trace_next_iteration(name, next_instr, is_being_profiled, pycode):
+            assert name == 'pypyjit'
+            assert not is_being_profiled
+            boosted.append((pycode, int(next_instr)))
+        self.orig_jit_hooks = interp_warmup.jit_hooks
+        class jit_hooks:
+            pass
+        jit_hooks.trace_next_iteration = staticmethod(trace_next_iteration)
+        interp_warmup.jit_hooks = jit_hooks
+
+    def teardown_method(self, meth):
+        interp_warmup.jit_hooks = self.orig_jit_hooks
+
+    def test_dump(self):
+        import pypyjit
+        filename = self.tmpdir + '/dump'
+        def f():
+            pass
+        self.on_compile(f.__code__, 10, 5)     # not recorded yet
+        pypyjit.enable_warmup_profile(filename)
+        self.on_compile(f.__code__, 12, 7)
+        pypyjit.dump_warmup_profile(filename)
+        lines = open(filename).read().splitlines()
+        assert lines[0] == '# pypyjit warmup profile'
+        assert len(lines) == 2
+        fields = lines[1].split('\t')
+        assert fields[0] == str(f.__code__.co_firstlineno)
+        assert fields[2:] == ['12', '7', f.__code__.co_filename]
+
+    def test_reload(self):
+        import pypyjit
+        filename = self.tmpdir + '/reload'
+        src = "def f():\n    pass\n"
+        d = {}
+        exec compile(src, 'warmup.py', 'exec') in d
+        pypyjit.enable_warmup_profile(filename)
+        self.on_compile(d['f'].__code__, 12, 7)
+        pypyjit.dump_warmup_profile(filename)
+        assert self.get_boosted() == []
+        #
+        # now pretend we restart: the same code is hot again
+        pypyjit.enable_warmup_profile(filename)
+        d = {}
+        exec compile(src, 'warmup.py', 'exec') in d
+        exec compile("def g():\n    return 42\n", 'warmup.py', 'exec') in d
+        assert self.get_boosted() == [(d['f'].__code__, 12)]
+        #
+        # the entries are kept even if not compiled again
+        pypyjit.dump_warmup_profile(filename)
+        lines = open(filename).read().splitlines()
+        assert len(lines) == 2
+        assert lines[1].split('\t')[2:] == ['12', '7', 'warmup.py']
+
+    def test_missing_or_invalid_file(self):
+        import pypyjit
+        filename = self.tmpdir + '/invalid'
+        pypyjit.enable_warmup_profile(filename)    # does not exist yet
+        with open(filename, 'w') as f:
+            f.write('# pypyjit warmup profile\n'
+                    'garbage\n'
+                    '1\t2\tx\t4\twarmup.py\n')
+        pypyjit.enable_warmup_profile(filename)
+        assert self.get_boosted() == []
+        raises(IOError, pypyjit.enable_warmup_profile, self.tmpdir)
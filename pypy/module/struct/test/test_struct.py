@@ -441,3 +441,13 @@ class AppTestStructBuffer(object):
         assert self.struct.unpack_from("ii", b, 2) == (17, 42)
         b[:sz] = self.struct.pack("ii", 18, 43)
         assert self.struct.unpack_from("ii", b) == (18, 43)
+
+    def test_unpack_from_memoryview_slice(self):
+        data = bytearray(self.struct.pack("iii", 1, 2, 3))
+        sz = self.struct.calcsize("i")
+        v = memoryview(data)[sz:][:2 * sz]
+        assert self.struct.unpack_from("i", v) == (2,)
+        assert self.struct.unpack_from("i", v, sz) == (3,)
+        raises(self.struct.error, self.struct.unpack_from, "i", v, 2 * sz)
+        self.struct.pack_into("i", data, sz, 42)
+        assert self.struct.unpack_from("i", v) == (42,)
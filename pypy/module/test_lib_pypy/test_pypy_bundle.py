@@ -0,0 +1,99 @@
+import sys, zipfile, zipimport
+from rpython.tool.udir import udir
+from lib_pypy import _pypy_bundle
+
+
+def make_modules():
+    tmpdir = udir.ensure('test_pypy_bundle', dir=1)
+    tmpdir.join('bundlemod.py').write("x = 42\n")
+    pkg = tmpdir.ensure('bundlepkg', dir=1)
+    pkg.join('__init__.py').write("from bundlepkg.sub import mod\n")
+    pkg.ensure('sub', dir=1).join('__init__.py').write("")
+    pkg.join('sub', 'mod.py').write("def f():\n    return 'f'\n")
+    pkg.join('sub', 'broken.py').write("def f(:\n")
+    pkg.ensure('data', dir=1).join('notamodule.py').write("")
+    extpkg = tmpdir.ensure('bundleextpkg', dir=1)
+    extpkg.join('__init__.py').write("")
+    extpkg.join('ext.so').write("")
+    datapkg = tmpdir.ensure('bundledatapkg', dir=1)
+    datapkg.join('__init__.py').write("")
+    datapkg.ensure('templates', dir=1).join('page.html').write("")
+    return tmpdir
+
+
+class FakeModule(object):
+    def __init__(self, filename):
+        self.__file__ = filename
+
+
+def test_find_sources():
+    tmpdir = make_modules()
+    modules = {
+        'bundlemod': FakeModule(str(tmpdir.join('bundlemod.pyc'))),
+        'bundlepkg': FakeModule(str(tmpdir.join('bundlepkg',
+                                                '__init__.py'))),
+        'bundlepkg.sub': FakeModule(str(tmpdir.join('bundlepkg', 'sub',
+                                                    '__init__.py'))),
+        'bundlepkg.os': None,
+        'bundleextpkg': FakeModule(str(tmpdir.join('bundleextpkg',
+                                                   '__init__.py'))),
+        'bundledatapkg': FakeModule(str(tmpdir.join('bundledatapkg',
+                                                    '__init__.py'))),
+        'sys': sys,
+        'nosource': FakeModule(str(tmpdir.join('nosource.pyc'))),
+    }
+    sources = _pypy_bundle.find_sources(modules)
+    assert sorted(sources) == [
+        'bundlemod.pyc',
+        'bundlepkg/__init__.pyc',
+        'bundlepkg/sub/__init__.pyc',
+        'bundlepkg/sub/broken.pyc',
+        'bundlepkg/sub/mod.pyc',
+    ]
+    assert sources['bundlepkg/sub/mod.pyc'] == str(
+        tmpdir.join('bundlepkg', 'sub', 'mod.py'))
+
+
+def test_import_modules():
+    tmpdir = udir.ensure('test_pypy_bundle_import', dir=1)
+    tmpdir.join('bundleimp_a.py').write("import bundleimp_b\n")
+    tmpdir.join('bundleimp_b.py').write("import os\n")
+    tmpdir.join('bundleimp_c.py').write("")
+    sys.path.insert(0, str(tmpdir))
+    try:
+        modules = _pypy_bundle.import_modules(['bundleimp_a', 'os'])
+    finally:
+        sys.path.remove(str(tmpdir))
+        for name in ['bundleimp_a', 'bundleimp_b']:
+            del sys.modules[name]
+    # the given modules and what they imported, not what was already
+    # imported before, like 'sys'
+    assert sorted(modules) == ['bundleimp_a', 'bundleimp_b', 'os']
+    assert modules['os'] is sys.modules['os']
+
+
+def test_write_bundle():
+    tmpdir = make_modules()
+    sources = _pypy_bundle.package_sources(
+        'bundlepkg', str(tmpdir.join('bundlepkg')))
+    sources['bundlemod.pyc'] = str(tmpdir.join('bundlemod.py'))
+    bundle = str(tmpdir.join('bundle.zip'))
+    failed = _pypy_bundle.write_bundle(bundle, sources)
+    assert failed == [str(tmpdir.join('bundlepkg', 'sub', 'broken.py'))]
+    zf = zipfile.ZipFile(bundle)
+    for info in zf.infolist():
+        assert info.compress_type == zipfile.ZIP_STORED
+    assert sorted(zf.namelist()) == [
+        'bundlemod.pyc',
+        'bundlepkg/__init__.pyc',
+        'bundlepkg/sub/__init__.pyc',
+        'bundlepkg/sub/mod.pyc',
+    ]
+    zf.close()
+    importer = zipimport.zipimporter(bundle)
+    code = importer.get_code('bundlemod')
+    assert code.co_filename == str(tmpdir.join('bundlemod.py'))
+    assert importer.is_package('bundlepkg')
+    d = {}
+    exec code in d
+    assert d['x'] == 42
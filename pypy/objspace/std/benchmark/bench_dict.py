@@ -45,7 +45,45 @@ def bench_simple_dict(SIZE = 10000):
     count_operation("Existing key access", lambda : rand_keys(lookup_keys))
     return test_d
 
+def rss_kb():
+    import gc, os
+    gc.collect()
+    try:
+        # current resident size, on Linux
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (IOError, OSError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def bench_small_dicts(NUM = 200000, SIZE = 5):
+    # many small dicts, one batch per kind of key; reports the growth of
+    # the resident size, which is mostly the dicts themselves
+    kinds = [("str", lambda i: "key%d" % i),
+             ("int", lambda i: i * 7),
+             ("float", lambda i: i + 0.5),
+             ("object", lambda i: (i, "x"))]
+    for kind, makekey in kinds:
+        keys = [makekey(i) for i in xrange(SIZE)]
+        items = [(key, None) for key in keys]
+        rss0 = rss_kb()
+        dicts = count_operation("Creation of %d %s dicts" % (NUM, kind),
+                                lambda : [dict(items) for i in xrange(NUM)])
+        rss1 = rss_kb()
+        print "%s dicts: about %d bytes per dict" % (
+            kind, (rss1 - rss0) * 1024 // NUM)
+
+        def iterate():
+            for d in dicts:
+                for key in d:
+                    pass
+        count_operation("Iteration", iterate)
+        count_operation("Copy", lambda : [d.copy() for d in dicts])
+        dicts = None
+
 if __name__ == '__main__':
+    bench_small_dicts()
     test_d = bench_simple_dict()
     import __pypy__
     print __pypy__.internal_repr(test_d)
@@ -373,16 +373,11 @@ class W_BytearrayObject(W_Root):
             return self
 
         if isinstance(w_other, W_BytesObject):
-            self._inplace_add(self._op_val(space, w_other))
+            self.data.extend(self._op_val(space, w_other))
         else:
-            self._inplace_add(_get_buffer(space, w_other))
+            self.data.extend(_get_buffer(space, w_other).as_str())
         return self
 
-    @specialize.argtype(1)
-    def _inplace_add(self, other):
-        for i in range(len(other)):
-            self.data.append(other[i])
-
     def descr_inplace_mul(self, space, w_times):
         try:
             times = space.getindex_w(w_times, space.w_OverflowError)
@@ -428,6 +423,8 @@ class W_BytearrayObject(W_Root):
     def descr_extend(self, space, w_other):
         if isinstance(w_other, W_BytearrayObject):
             self.data += w_other.data
+        elif isinstance(w_other, W_BytesObject):
+            self.data.extend(self._op_val(space, w_other))
         else:
             self.data += makebytearraydata_w(space, w_other)
         return self
@@ -1220,6 +1217,9 @@ def _setitem_slice_helper(space, items, start, step, slicelength, sequence2,
 
 
 class BytearrayBuffer(Buffer):
+    # The data is a resizable GC list of chars, which can move and be
+    # reallocated: there is no get_raw_address(), so consumers that need
+    # a pointer still get a copy through as_str() or getslice().
     _immutable_ = True
 
     def __init__(self, data, readonly):
@@ -1229,12 +1229,28 @@ class BytearrayBuffer(Buffer):
     def getlength(self):
         return len(self.data)
 
+    def as_str(self):
+        return ''.join(self.data)
+
     def getitem(self, index):
         return self.data[index]
 
+    def getslice(self, start, stop, step, size):
+        if size == 0:
+            return ""
+        if step == 1:
+            assert 0 <= start <= stop
+            return ''.join(self.data[start:stop])
+        return Buffer.getslice(self, start, stop, step, size)
+
     def setitem(self, index, char):
         self.data[index] = char
 
+    def setslice(self, start, string):
+        data = self.data
+        for i in range(len(string)):
+            data[start + i] = string[i]
+
 
 @specialize.argtype(1)
 def _memcmp(selfvalue, buffer, length):
@@ -589,55 +589,43 @@ class W_BytesObject(W_AbstractBytesObject):
         return mod_format(space, self, w_values, do_unicode=False)
 
     def descr_eq(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value == w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value == space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value == w_other._value)
 
     def descr_ne(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value != w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value != space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value != w_other._value)
 
     def descr_lt(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value < w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value < space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value < w_other._value)
 
     def descr_le(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value <= w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value <= space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value <= w_other._value)
 
     def descr_gt(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value > w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value > space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value > w_other._value)
 
     def descr_ge(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value >= w_other.force())
+        if _is_lazy_bytes(space, w_other):
+            return space.newbool(self._value >= space.str_w(w_other))
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value >= w_other._value)
@@ -669,13 +657,24 @@ class W_BytesObject(W_AbstractBytesObject):
             return W_StringBufferObject(builder)
         return self._StringMethods_descr_add(space, w_other)
 
+    _StringMethods__sliced = _sliced
+    def _sliced(self, space, s, start, stop, orig_obj):
+        if space.config.objspace.std.withstrslice:
+            from pypy.objspace.std.strsliceobject import (W_StringSliceObject,
+                slice_is_worth_sharing)
+            assert start >= 0
+            assert stop >= 0
+            if slice_is_worth_sharing(s, start, stop):
+                return W_StringSliceObject(s, start, stop)
+        return self._StringMethods__sliced(space, s, start, stop, orig_obj)
+
     _StringMethods__startswith = _startswith
     def _startswith(self, space, value, w_prefix, start, end):
         if space.isinstance_w(w_prefix, space.w_unicode):
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
-            return self_as_unicode._startswith(space, self_as_unicode._value,
-                                               w_prefix, start, end)
+            return self_as_unicode._startswith(
+                space, self_as_unicode._val(space), w_prefix, start, end)
         return self._StringMethods__startswith(space, value, w_prefix, start,
                                                end)
 
@@ -684,8 +683,8 @@ class W_BytesObject(W_AbstractBytesObject):
         if space.isinstance_w(w_suffix, space.w_unicode):
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
-            return self_as_unicode._endswith(space, self_as_unicode._value,
-                                             w_suffix, start, end)
+            return self_as_unicode._endswith(
+                space, self_as_unicode._val(space), w_suffix, start, end)
         return self._StringMethods__endswith(space, value, w_suffix, start,
                                              end)
 
@@ -697,7 +696,7 @@ class W_BytesObject(W_AbstractBytesObject):
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
             return space.newbool(
-                self_as_unicode._value.find(w_sub._value) >= 0)
+                self_as_unicode._val(space).find(w_sub._val(space)) >= 0)
         return self._StringMethods_descr_contains(space, w_sub)
 
     _StringMethods_descr_replace = descr_replace
@@ -850,6 +849,15 @@ W_BytesObject.PREBUILT = [W_BytesObject(chr(i)) for i in range(256)]
 del i
 
 
+def _is_lazy_bytes(space, w_obj):
+    # the str objects that are not W_BytesObjects: string buffers and slices
+    if not (space.config.objspace.std.withstrbuf or
+            space.config.objspace.std.withstrslice):
+        return False
+    return (isinstance(w_obj, W_AbstractBytesObject) and
+            not isinstance(w_obj, W_BytesObject))
+
+
 def wrapstr(space, s):
     if space.config.objspace.std.sharesmallstr:
         if space.config.objspace.std.withprebuiltchar:
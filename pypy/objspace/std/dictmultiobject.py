@@ -3,6 +3,7 @@
 from rpython.rlib import jit, rerased, objectmodel
 from rpython.rlib.debug import mark_dict_non_null
 from rpython.rlib.objectmodel import newlist_hint, r_dict, specialize
+from rpython.rlib.rfloat import isnan
 from rpython.tool.sourcetools import func_renamer, func_with_new_name
 
 from pypy.interpreter.baseobjspace import W_Root
@@ -12,6 +13,8 @@ from pypy.interpreter.gateway import (
 from pypy.interpreter.mixedmodule import MixedModule
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
+from pypy.objspace.std.specialisedtupleobject import Cls_ii, Cls_oo
+from pypy.objspace.std.unicodeobject import is_unicode_exact
 from pypy.objspace.std.util import negate
 
 
@@ -230,9 +233,7 @@ class W_DictMultiObject(W_Root):
 
     def descr_copy(self, space):
         """D.copy() -> a shallow copy of D"""
-        w_new = W_DictMultiObject.allocate_and_init_instance(space)
-        update1_dict_dict(space, w_new, self)
-        return w_new
+        return self.copy()
 
     def descr_items(self, space):
         """D.items() -> list of D's (key, value) pairs, as 2-tuples"""
@@ -339,7 +340,7 @@ class W_DictMultiObject(W_Root):
 
 def _add_indirections():
     dict_methods = "getitem getitem_str setitem setdefault \
-                    popitem delitem clear \
+                    popitem delitem clear copy \
                     length w_keys values items \
                     iterkeys itervalues iteritems \
                     listview_bytes listview_unicode listview_int \
@@ -493,6 +494,11 @@ class DictStrategy(object):
         w_dict.strategy = strategy
         w_dict.dstorage = storage
 
+    def copy(self, w_dict):
+        w_new = W_DictMultiObject.allocate_and_init_instance(self.space)
+        update1_dict_dict(self.space, w_new, w_dict)
+        return w_new
+
     def listview_bytes(self, w_dict):
         return None
 
@@ -542,12 +548,21 @@ class EmptyDictStrategy(DictStrategy):
         if type(w_key) is self.space.StringObjectCls:
             self.switch_to_bytes_strategy(w_dict)
             return
-        elif type(w_key) is self.space.UnicodeObjectCls:
+        elif is_unicode_exact(w_key):
             self.switch_to_unicode_strategy(w_dict)
             return
+        elif type(w_key) is Cls_ii:
+            self.switch_to_strategy(w_dict, IntPairDictStrategy)
+            return
+        elif type(w_key) is Cls_oo and _is_bytes_pair(self.space, w_key):
+            self.switch_to_strategy(w_dict, BytesPairDictStrategy)
+            return
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
             self.switch_to_int_strategy(w_dict)
+        elif (self.space.is_w(w_type, self.space.w_float) and
+              not isnan(self.space.float_w(w_key))):
+            self.switch_to_strategy(w_dict, FloatDictStrategy)
         elif withidentitydict and w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
@@ -571,6 +586,12 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.strategy = strategy
         w_dict.dstorage = storage
 
+    def switch_to_strategy(self, w_dict, strategycls):
+        strategy = self.space.fromcache(strategycls)
+        storage = strategy.get_empty_storage()
+        w_dict.strategy = strategy
+        w_dict.dstorage = storage
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -946,6 +967,13 @@ class AbstractTypedStrategy(object):
     def clear(self, w_dict):
         self.unerase(w_dict.dstorage).clear()
 
+    def copy(self, w_dict):
+        # the RPython dict is stored as an index table plus a dense array
+        # of entries: copying it copies the entries array in one go and
+        # rebuilds the index, without unwrapping or comparing any key
+        d = self.unerase(w_dict.dstorage)
+        return W_DictMultiObject(self.space, self, self.erase(d.copy()))
+
     def switch_to_object_strategy(self, w_dict):
         d = self.unerase(w_dict.dstorage)
         strategy = self.space.fromcache(ObjectDictStrategy)
@@ -1179,6 +1207,134 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
 create_iterator_classes(IntDictStrategy)
 
 
+# all ints with a smaller absolute value are exactly representable as floats
+_FLOAT_EXACT_INT = float(2 ** 53)
+
+class FloatDictStrategy(AbstractTypedStrategy, DictStrategy):
+    """ Keys are floats, but never NaNs: a NaN is not equal to itself,
+    so it can only be found again by identity, which the unwrapped keys
+    do not preserve.
+    """
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.float_w(wrapped)
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return (space.is_w(space.type(w_obj), space.w_float) and
+                not isnan(space.float_w(w_obj)))
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_str) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        w_type = space.type(w_key)
+        if space.is_w(w_type, space.w_int) or space.is_w(w_type, space.w_bool):
+            # an int is equal to, and hashes like, the float with the
+            # same value; if there is no such float, fall back to the
+            # generic comparison
+            floatval = float(space.int_w(w_key))
+            if -_FLOAT_EXACT_INT < floatval < _FLOAT_EXACT_INT:
+                return self.unerase(w_dict.dstorage).get(floatval, None)
+        return AbstractTypedStrategy.getitem(self, w_dict, w_key)
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+create_iterator_classes(FloatDictStrategy)
+
+
+def _is_bytes_pair(space, w_tuple):
+    assert isinstance(w_tuple, Cls_oo)
+    return (type(w_tuple.value0) is space.StringObjectCls and
+            type(w_tuple.value1) is space.StringObjectCls)
+
+def _never_equal_to_pair(space, w_lookup_type):
+    return (_never_equal_to_string(space, w_lookup_type) or
+            space.is_w(w_lookup_type, space.w_str) or
+            space.is_w(w_lookup_type, space.w_unicode))
+
+
+class IntPairDictStrategy(AbstractTypedStrategy, DictStrategy):
+    """ Keys are specialised tuples of two ints, stored as RPython
+    tuples.  Only used with withspecialisedtuple.
+    """
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        return space.newtuple([space.wrap(unwrapped[0]),
+                               space.wrap(unwrapped[1])])
+
+    def unwrap(self, wrapped):
+        assert isinstance(wrapped, Cls_ii)
+        return (wrapped.value0, wrapped.value1)
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is Cls_ii
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_pair(self.space, w_lookup_type)
+
+    def wrapkey(space, key):
+        return space.newtuple([space.wrap(key[0]), space.wrap(key[1])])
+
+create_iterator_classes(IntPairDictStrategy)
+
+
+class BytesPairDictStrategy(AbstractTypedStrategy, DictStrategy):
+    """ Keys are tuples of two exact strings, stored as RPython tuples.
+    Strings are not specialised by withspecialisedtuple, so these are
+    the generic two-items specialised tuples whose items are strings.
+    """
+    erase, unerase = rerased.new_erasing_pair("bytespair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        return space.newtuple([space.wrap(unwrapped[0]),
+                               space.wrap(unwrapped[1])])
+
+    def unwrap(self, wrapped):
+        assert isinstance(wrapped, Cls_oo)
+        space = self.space
+        return (space.str_w(wrapped.value0), space.str_w(wrapped.value1))
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is Cls_oo and _is_bytes_pair(self.space, w_obj)
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_pair(self.space, w_lookup_type)
+
+    def wrapkey(space, key):
+        return space.newtuple([space.wrap(key[0]), space.wrap(key[1])])
+
+create_iterator_classes(BytesPairDictStrategy)
+
+
 def update1(space, w_dict, w_data):
     if isinstance(w_data, W_DictMultiObject):    # optimization case only
         update1_dict_dict(space, w_dict, w_data)
@@ -23,6 +23,18 @@ class W_AbstractSeqIterObject(W_Root):
             w_len = space.wrap(0)
         return w_len
 
+    def exact_length_hint(self, space):
+        w_seq = self.w_seq
+        if w_seq is None:
+            return 0
+        w_type = space.type(w_seq)
+        if not (space.is_w(w_type, space.w_list) or
+                space.is_w(w_type, space.w_tuple) or
+                space.is_w(w_type, space.w_str) or
+                space.is_w(w_type, space.w_unicode)):
+            return -1
+        return max(space.len_w(w_seq) - self.index, 0)
+
     def descr_iter(self, space):
         return self
 
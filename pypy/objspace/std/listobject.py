@@ -31,7 +31,7 @@ from pypy.objspace.std.iterobject import (
 from pypy.objspace.std.sliceobject import (
     W_SliceObject, normalize_simple_slice, unwrap_start_stop)
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import is_unicode_exact
 from pypy.objspace.std.util import get_positive_index, negate
 
 __all__ = ['W_ListObject', 'make_range_list', 'make_empty_list_with_size']
@@ -89,7 +89,7 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
 
     # check for unicode
     for w_obj in list_w:
-        if not type(w_obj) is W_UnicodeObject:
+        if not is_unicode_exact(w_obj):
             break
     else:
         return space.fromcache(UnicodeListStrategy)
@@ -116,7 +116,9 @@ _do_extend_jitdriver = jit.JitDriver(
     get_printable_location=_get_printable_location)
 
 def _do_extend_from_iterable(space, w_list, w_iterable):
-    w_iterator = space.iter(w_iterable)
+    return _do_extend_from_iterator(space, w_list, space.iter(w_iterable))
+
+def _do_extend_from_iterator(space, w_list, w_iterator):
     w_type = space.type(w_iterator)
     i = 0
     while True:
@@ -134,6 +136,56 @@ def _do_extend_from_iterable(space, w_list, w_iterable):
     return i
 
 
+def _make_extend_from_iterable(name):
+    """Make the _extend_from_iterable() of an unwrapped list strategy.  It
+    stores the items unwrapped straight into the storage for as long as
+    they have the right type, and goes on with the generic loop after the
+    first item that switches the strategy."""
+    def get_printable_location(w_type):
+        return ('list__extend_from_iterable_%s [w_type=%s]' %
+                (name, w_type.getname(w_type.space)))
+
+    jitdriver = jit.JitDriver(
+        name='list__extend_from_iterable_' + name,
+        greens=['w_type'],
+        reds=['i', 'w_iterator', 'w_list', 'strategy'],
+        get_printable_location=get_printable_location)
+
+    def extend_unwrapped(strategy, w_list, w_iterator):
+        space = strategy.space
+        w_type = space.type(w_iterator)
+        i = 0
+        while True:
+            jitdriver.jit_merge_point(w_type=w_type, i=i,
+                                      w_iterator=w_iterator, w_list=w_list,
+                                      strategy=strategy)
+            try:
+                w_item = space.next(w_iterator)
+            except OperationError, e:
+                if not e.match(space, space.w_StopIteration):
+                    raise
+                return i
+            i += 1
+            # next() may run app-level code that changes the list too
+            if (w_list.strategy is not strategy or
+                    not strategy.is_correct_type(w_item)):
+                w_list.append(w_item)
+                return i + _do_extend_from_iterator(space, w_list, w_iterator)
+            strategy.unerase(w_list.lstorage).append(strategy.unwrap(w_item))
+
+    def _extend_from_iterable(self, w_list, w_iterable):
+        length_hint = self.space.length_hint(w_iterable, 0)
+        if length_hint:
+            w_list._resize_hint(w_list.length() + length_hint)
+
+        extended = extend_unwrapped(self, w_list, self.space.iter(w_iterable))
+
+        # cut back if the length hint was too large
+        if extended < length_hint:
+            w_list._resize_hint(w_list.length())
+    return _extend_from_iterable
+
+
 def list_unroll_condition(w_list1, space, w_list2):
     return (jit.loop_unrolling_heuristic(w_list1, w_list1.length(),
                                          UNROLL_CUTOFF) or
@@ -677,24 +729,35 @@ class W_ListObject(W_Root):
             # core-dump factory, since the storage may change).
             self.__init__(space, [])
 
-            # wrap each item in a KeyContainer if needed
+            # compute the keys, and wrap each item in a KeyContainer if
+            # the keys cannot be compared unboxed
+            keysorter = None
             if has_key:
+                keys_w = [None] * sorter.listlength
                 for i in range(sorter.listlength):
-                    w_item = sorter.list[i]
-                    w_keyitem = space.call_function(w_key, w_item)
-                    sorter.list[i] = KeyContainer(w_keyitem, w_item)
-
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
+                    keys_w[i] = space.call_function(w_key, sorter.list[i])
+                if not has_cmp:
+                    keysorter = make_key_sorter(space, keys_w)
+                if keysorter is None:
+                    for i in range(sorter.listlength):
+                        sorter.list[i] = KeyContainer(keys_w[i],
+                                                      sorter.list[i])
+
+            if keysorter is not None:
+                keysorter.sort_items(sorter.list, reverse)
+            else:
+                # Reverse sort stability achieved by initially reversing the
+                # list, applying a stable forward sort, then reversing the
+                # final result.
+                if reverse:
+                    sorter.list.reverse()
 
-            # perform the sort
-            sorter.sort()
+                # perform the sort
+                sorter.sort()
 
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -906,7 +969,7 @@ class EmptyListStrategy(ListStrategy):
             strategy = self.space.fromcache(IntegerListStrategy)
         elif type(w_item) is W_BytesObject:
             strategy = self.space.fromcache(BytesListStrategy)
-        elif type(w_item) is W_UnicodeObject:
+        elif is_unicode_exact(w_item):
             strategy = self.space.fromcache(UnicodeListStrategy)
         elif type(w_item) is W_FloatObject:
             strategy = self.space.fromcache(FloatListStrategy)
@@ -1617,6 +1680,15 @@ class IntegerListStrategy(ListStrategy):
     def getitems_int(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def _extend_from_iterable(self, w_list, w_iterable):
+        intlist = self.space.unpackiterable_int(w_iterable)
+        if intlist is not None:
+            self.unerase(w_list.lstorage).extend(intlist)
+            return
+        self._extend_unwrapped(w_list, w_iterable)
+
+    _extend_unwrapped = _make_extend_from_iterable('int')
+
 
     _base_extend_from_list = _extend_from_list
 
@@ -1670,6 +1742,15 @@ class FloatListStrategy(ListStrategy):
     def getitems_float(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def _extend_from_iterable(self, w_list, w_iterable):
+        floatlist = self.space.unpackiterable_float(w_iterable)
+        if floatlist is not None:
+            self.unerase(w_list.lstorage).extend(floatlist)
+            return
+        self._extend_unwrapped(w_list, w_iterable)
+
+    _extend_unwrapped = _make_extend_from_iterable('float')
+
 
 class BytesListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
@@ -1702,6 +1783,8 @@ class BytesListStrategy(ListStrategy):
     def getitems_bytes(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    _extend_from_iterable = _make_extend_from_iterable('bytes')
+
 
 class UnicodeListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
@@ -1719,7 +1802,7 @@ class UnicodeListStrategy(ListStrategy):
     unerase = staticmethod(unerase)
 
     def is_correct_type(self, w_obj):
-        return type(w_obj) is W_UnicodeObject
+        return is_unicode_exact(w_obj)
 
     def list_is_correct_type(self, w_list):
         return w_list.strategy is self.space.fromcache(UnicodeListStrategy)
@@ -1734,6 +1817,8 @@ class UnicodeListStrategy(ListStrategy):
     def getitems_unicode(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    _extend_from_iterable = _make_extend_from_iterable('unicode')
+
 # _______________________________________________________
 
 init_signature = Signature(['sequence'], None, None)
@@ -1768,6 +1853,7 @@ IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 StringBaseTimSort = make_timsort_class()
 UnicodeBaseTimSort = make_timsort_class()
+KeyIndexBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -1836,6 +1922,79 @@ class CustomKeyCompareSort(CustomCompareSort):
         return CustomCompareSort.lt(self, a.w_key, b.w_key)
 
 
+# Sorting with key= when all the keys are exactly ints, floats or strings:
+# the keys are unwrapped once, and the list sorted is the list of indices
+# of the items, compared by their unboxed keys.  The items are permuted
+# accordingly afterwards.
+
+class KeyIndexSort(KeyIndexBaseTimSort):
+    def sort_items(self, items, reverse):
+        """Sort 'items' in place by the keys, like list.sort()."""
+        indices = self.list
+        if reverse:
+            indices.reverse()
+        self.sort()
+        if reverse:
+            indices.reverse()
+        sorted_items = [items[i] for i in indices]
+        for i in range(len(sorted_items)):
+            items[i] = sorted_items[i]
+
+
+class IntKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.intkeys[a] < self.intkeys[b]
+
+
+class FloatKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.floatkeys[a] < self.floatkeys[b]
+
+
+class StringKeyIndexSort(KeyIndexSort):
+    def lt(self, a, b):
+        return self.strkeys[a] < self.strkeys[b]
+
+
+def make_key_sorter(space, keys_w):
+    """Return a KeyIndexSort for the keys 'keys_w', or None if they are
+    not all exactly ints, all exactly floats or all exactly strings."""
+    length = len(keys_w)
+    if length == 0:
+        return None
+    w_type = type(keys_w[0])
+    if w_type is W_IntObject:
+        intkeys = [0] * length
+        for i in range(length):
+            w_keyitem = keys_w[i]
+            if type(w_keyitem) is not W_IntObject:
+                return None
+            intkeys[i] = space.int_w(w_keyitem)
+        sorter = IntKeyIndexSort(range(length), length)
+        sorter.intkeys = intkeys
+    elif w_type is W_FloatObject:
+        floatkeys = [0.0] * length
+        for i in range(length):
+            w_keyitem = keys_w[i]
+            if type(w_keyitem) is not W_FloatObject:
+                return None
+            floatkeys[i] = space.float_w(w_keyitem)
+        sorter = FloatKeyIndexSort(range(length), length)
+        sorter.floatkeys = floatkeys
+    elif w_type is W_BytesObject:
+        strkeys = [None] * length
+        for i in range(length):
+            w_keyitem = keys_w[i]
+            if type(w_keyitem) is not W_BytesObject:
+                return None
+            strkeys[i] = space.str_w(w_keyitem)
+        sorter = StringKeyIndexSort(range(length), length)
+        sorter.strkeys = strkeys
+    else:
+        return None
+    return sorter
+
+
 W_ListObject.typedef = TypeDef("list",
     __doc__ = """list() -> new empty list
 list(iterable) -> new list initialized from iterable's items""",
@@ -2,6 +2,8 @@ import weakref
 
 from rpython.rlib import jit, objectmodel, debug, rerased
 from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.longlong2float import longlong2float, float2longlong
+from rpython.rtyper.lltypesystem import lltype, rffi
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.objspace.std.dictmultiobject import (
@@ -9,6 +11,8 @@ from pypy.objspace.std.dictmultiobject import (
     BaseValueIterator, BaseItemIterator, _never_equal_to_string
 )
 from pypy.objspace.std.typeobject import MutableCell
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.floatobject import W_FloatObject
 
 
 # ____________________________________________________________
@@ -36,11 +40,12 @@ class AbstractAttribute(object):
         if (
             jit.isconstant(attr.storageindex) and
             jit.isconstant(obj) and
-            not attr.ever_mutated
+            not attr.ever_mutated and
+            not isinstance(attr, UnboxedPlainAttribute)
         ):
             return self._pure_mapdict_read_storage(obj, attr.storageindex)
         else:
-            return obj._mapdict_read_storage(attr.storageindex)
+            return attr._direct_read(obj)
 
     @jit.elidable
     def _pure_mapdict_read_storage(self, obj, storageindex):
@@ -52,7 +57,7 @@ class AbstractAttribute(object):
             return self.terminator._write_terminator(obj, selector, w_value)
         if not attr.ever_mutated:
             attr.ever_mutated = True
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        attr._direct_write(obj, w_value)
         return True
 
     def delete(self, obj, selector):
@@ -134,25 +139,63 @@ class AbstractAttribute(object):
     def search(self, attrtype):
         return None
 
+    def _find_unboxed_attr(self):
+        return None
+
     @jit.elidable
-    def _get_new_attr(self, name, index):
-        selector = name, index
+    def _get_new_attr(self, name, index, unboxed_type):
+        key = name, index, unboxed_type
         cache = self.cache_attrs
         if cache is None:
             cache = self.cache_attrs = {}
-        attr = cache.get(selector, None)
+        attr = cache.get(key, None)
         if attr is None:
-            attr = PlainAttribute(selector, self)
-            cache[selector] = attr
+            selector = name, index
+            if unboxed_type == BOXED:
+                attr = PlainAttribute(selector, self)
+            else:
+                attr = UnboxedPlainAttribute(selector, self, unboxed_type)
+                other_type = UNBOXED_FLOAT
+                if unboxed_type == UNBOXED_FLOAT:
+                    other_type = UNBOXED_INT
+                if (name, index, other_type) in cache:
+                    # this attribute was seen with values of different
+                    # types: from now on, new objects store it boxed
+                    self._generalize(name, index)
+                    attr.generalized = True
+            cache[key] = attr
         return attr
 
+    def _generalize(self, name, index):
+        self._generalize_attr(name, index, UNBOXED_INT)
+        self._generalize_attr(name, index, UNBOXED_FLOAT)
+
+    def _generalize_attr(self, name, index, unboxed_type):
+        attr = self.cache_attrs.get((name, index, unboxed_type), None)
+        if attr is not None:
+            assert isinstance(attr, UnboxedPlainAttribute)
+            attr.generalized = True
+
+    def _get_unboxed_type(self, selector, w_value):
+        if (not self.space.config.objspace.std.withunboxedmapdict or
+                selector[1] == SPECIAL):
+            return BOXED
+        if type(w_value) is W_IntObject:
+            return UNBOXED_INT
+        if type(w_value) is W_FloatObject:
+            return UNBOXED_FLOAT
+        return BOXED
+
     @jit.look_inside_iff(lambda self, obj, selector, w_value:
             jit.isconstant(self) and
             jit.isconstant(selector[0]) and
             jit.isconstant(selector[1]))
     def add_attr(self, obj, selector, w_value):
         # grumble, jit needs this
-        attr = self._get_new_attr(selector[0], selector[1])
+        attr = self._get_new_attr(selector[0], selector[1],
+                                  self._get_unboxed_type(selector, w_value))
+        if isinstance(attr, UnboxedPlainAttribute) and attr.generalized:
+            attr = self._get_new_attr(selector[0], selector[1], BOXED)
         oldattr = obj._get_mapdict_map()
         if not jit.we_are_jitted():
             size_est = (oldattr._size_estimate + attr.size_estimate()
@@ -169,7 +212,7 @@ class AbstractAttribute(object):
         # the order is important here: first change the map, then the storage,
         # for the benefit of the special subclasses
         obj._set_mapdict_map(attr)
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        attr._init_storage(obj, w_value)
 
     def materialize_r_dict(self, space, obj, dict_w):
         raise NotImplementedError("abstract base class")
@@ -308,6 +351,18 @@ class PlainAttribute(AbstractAttribute):
     def length(self):
         return self.storageindex + 1
 
+    def _direct_read(self, obj):
+        return obj._mapdict_read_storage(self.storageindex)
+
+    def _direct_write(self, obj, w_value):
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
+    def _init_storage(self, obj, w_value):
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
+    def _find_unboxed_attr(self):
+        return self.back._find_unboxed_attr()
+
     def set_terminator(self, obj, terminator):
         new_obj = self.back.set_terminator(obj, terminator)
         self._copy_attr(obj, new_obj)
@@ -322,7 +377,7 @@ class PlainAttribute(AbstractAttribute):
         new_obj = self.back.materialize_r_dict(space, obj, dict_w)
         if self.selector[1] == DICT:
             w_attr = space.wrap(self.selector[0])
-            dict_w[w_attr] = obj._mapdict_read_storage(self.storageindex)
+            dict_w[w_attr] = self._direct_read(obj)
         else:
             self._copy_attr(obj, new_obj)
         return new_obj
@@ -336,6 +391,114 @@ class PlainAttribute(AbstractAttribute):
     def __repr__(self):
         return "<PlainAttribute %s %s %r>" % (self.selector, self.storageindex, self.back)
 
+# kinds of values an attribute can store
+BOXED = 0
+UNBOXED_INT = 1
+UNBOXED_FLOAT = 2
+
+class UnboxedValues(W_Root):
+    """ The storage slot shared by all the unboxed attributes of an object.
+    Ints are stored as the bits of a float.  Never visible at app-level.
+    """
+    def __init__(self, values):
+        self.values = values
+
+class UnboxedPlainAttribute(PlainAttribute):
+    """ An attribute whose values are exact ints or floats, stored
+    without their box.  Writing a value of another type switches the object
+    to a map in which this attribute is a PlainAttribute, the way lists
+    switch from the int strategy to the object strategy.
+    """
+    _immutable_fields_ = ['unboxed_type', 'listindex', '_length',
+                          'generalized?']
+
+    def __init__(self, selector, back, unboxed_type):
+        AbstractAttribute.__init__(self, back.space, back.terminator)
+        self.selector = selector
+        self.back = back
+        self.unboxed_type = unboxed_type
+        prev = back._find_unboxed_attr()
+        if prev is None:
+            self.storageindex = back.length()
+            self.listindex = 0
+            self._length = self.storageindex + 1
+        else:
+            assert isinstance(prev, UnboxedPlainAttribute)
+            self.storageindex = prev.storageindex
+            self.listindex = prev.listindex + 1
+            self._length = back.length()
+        self._size_estimate = self._length * NUM_DIGITS_POW2
+        self.ever_mutated = False
+        # set when new objects must store this attribute boxed; the
+        # attribute stays in the cache of 'back', to keep
+        # _get_new_attr() elidable
+        self.generalized = False
+
+    def length(self):
+        return self._length
+
+    def _find_unboxed_attr(self):
+        return self
+
+    def _get_values(self, obj):
+        w_values = obj._mapdict_read_storage(self.storageindex)
+        assert isinstance(w_values, UnboxedValues)
+        return w_values.values
+
+    def _box(self, value):
+        if self.unboxed_type == UNBOXED_INT:
+            return self.space.newint(intmask(float2longlong(value)))
+        return self.space.newfloat(value)
+
+    def _can_unbox(self, w_value):
+        if self.unboxed_type == UNBOXED_INT:
+            return type(w_value) is W_IntObject
+        return type(w_value) is W_FloatObject
+
+    def _unbox(self, w_value):
+        if self.unboxed_type == UNBOXED_INT:
+            assert isinstance(w_value, W_IntObject)
+            intval = rffi.cast(lltype.SignedLongLong, w_value.intval)
+            return longlong2float(intval)
+        assert isinstance(w_value, W_FloatObject)
+        return w_value.floatval
+
+    def _direct_read(self, obj):
+        return self._box(self._get_values(obj)[self.listindex])
+
+    def _direct_write(self, obj, w_value):
+        if self._can_unbox(w_value):
+            self._get_values(obj)[self.listindex] = self._unbox(w_value)
+        else:
+            self._switch_to_boxed(obj, w_value)
+
+    def _init_storage(self, obj, w_value):
+        value = self._unbox(w_value)    # the type was checked by add_attr
+        if self.listindex == 0:
+            values = [value]
+        else:
+            old_values = self._get_values(obj)
+            values = [0.0] * (self.listindex + 1)
+            for i in range(self.listindex):
+                values[i] = old_values[i]
+            values[self.listindex] = value
+        obj._mapdict_write_storage(self.storageindex, UnboxedValues(values))
+
+    @jit.dont_look_inside
+    def _switch_to_boxed(self, obj, w_value):
+        # new objects get a PlainAttribute from now on
+        self.back._generalize(self.selector[0], self.selector[1])
+        # rebuild 'obj' through the same path
+        new_obj = obj._get_mapdict_map().copy(obj)
+        flag = new_obj._get_mapdict_map().write(new_obj, self.selector,
+                                                w_value)
+        assert flag
+        _become(obj, new_obj)
+
+    def __repr__(self):
+        return "<UnboxedPlainAttribute %s %s:%s %r>" % (
+            self.selector, self.storageindex, self.listindex, self.back)
+
 def _become(w_obj, new_obj):
     # this is like the _become method, really, but we cannot use that due to
     # RPython reasons
@@ -807,7 +970,9 @@ class MapDictIteratorItems(BaseItemIterator):
 class CacheEntry(object):
     version_tag = None
     storageindex = 0
+    unboxed_attr = None
     w_method = None # for callmethod
+    w_descr = None  # for objects without a map, see lookup_type_cache()
     success_counter = 0
     failure_counter = 0
 
@@ -839,7 +1004,8 @@ def init_mapdict_cache(pycode):
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
 @jit.dont_look_inside
-def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None):
+def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None,
+                unboxed_attr=None, w_descr=None):
     entry = pycode._mapdict_caches[nameindex]
     if entry is INVALID_CACHE_ENTRY:
         entry = CacheEntry()
@@ -847,7 +1013,9 @@ def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None
     entry.map_wref = weakref.ref(map)
     entry.version_tag = version_tag
     entry.storageindex = storageindex
+    entry.unboxed_attr = unboxed_attr
     entry.w_method = w_method
+    entry.w_descr = w_descr
     if pycode.space.config.objspace.std.withmethodcachecounter:
         entry.failure_counter += 1
 
@@ -858,6 +1026,8 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
     map = w_obj._get_mapdict_map()
     if entry.is_valid_for_map(map) and entry.w_method is None:
         # everything matches, it's incredibly fast
+        if entry.unboxed_attr is not None:
+            return entry.unboxed_attr._direct_read(w_obj)
         return w_obj._mapdict_read_storage(entry.storageindex)
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 LOAD_ATTR_caching._always_inline_ = True
@@ -865,7 +1035,11 @@ LOAD_ATTR_caching._always_inline_ = True
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
     w_name = pycode.co_names_w[nameindex]
-    if map is not None:
+    if map is None:
+        w_descr = lookup_type_cache(pycode, w_obj, nameindex)
+        if w_descr is not None:
+            return space.get(w_descr, w_obj)
+    else:
         w_type = map.terminator.w_cls
         w_descr = w_type.getattribute_if_not_from_object()
         if w_descr is not None:
@@ -902,8 +1076,12 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
                 if attr is not None:
                     # Note that if map.terminator is a DevolvedDictTerminator,
                     # map.find_map_attr will always return None if selector[1]==DICT.
-                    _fill_cache(pycode, nameindex, map, version_tag, attr.storageindex)
-                    return w_obj._mapdict_read_storage(attr.storageindex)
+                    unboxed_attr = None
+                    if isinstance(attr, UnboxedPlainAttribute):
+                        unboxed_attr = attr
+                    _fill_cache(pycode, nameindex, map, version_tag,
+                                attr.storageindex, unboxed_attr=unboxed_attr)
+                    return attr._direct_read(w_obj)
     if space.config.objspace.std.withmethodcachecounter:
         INVALID_CACHE_ENTRY.failure_counter += 1
     return space.getattr(w_obj, w_name)
@@ -911,8 +1089,11 @@ LOAD_ATTR_slowpath._dont_inline_ = True
 
 def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
     pycode = f.getcode()
+    map = w_obj._get_mapdict_map()
+    if map is None:
+        return LOOKUP_METHOD_type_cache(f, pycode, nameindex, w_obj)
     entry = pycode._mapdict_caches[nameindex]
-    if entry.is_valid_for_obj(w_obj):
+    if entry.is_valid_for_map(map):
         w_method = entry.w_method
         if w_method is not None:
             f.pushvalue(w_method)
@@ -920,6 +1101,57 @@ def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
             return True
     return False
 
+def LOOKUP_METHOD_type_cache(f, pycode, nameindex, w_obj):
+    from pypy.interpreter.function import Function, FunctionWithFixedCode
+    w_descr = lookup_type_cache(pycode, w_obj, nameindex)
+    if w_descr is None:
+        return False
+    typ = type(w_descr)
+    if typ is Function or typ is FunctionWithFixedCode:
+        f.pushvalue(w_descr)
+        f.pushvalue(w_obj)
+    else:
+        f.pushvalue(f.space.get(w_descr, w_obj))
+        f.pushvalue(None)
+    return True
+LOOKUP_METHOD_type_cache._dont_inline_ = True
+
+def lookup_type_cache(pycode, w_obj, nameindex):
+    """For an object without a map, return the descriptor that the
+    attribute lookup of co_names[nameindex] finds in its class.  This is
+    for the instances of the builtin types that have no __dict__, like
+    str, list or dict: there, the lookup only depends on the class, so
+    the result is cached on 'pycode', keyed by the version_tag of the
+    class.  Return None if the lookup does not find a descriptor or
+    cannot be cached that way.
+    """
+    space = pycode.space
+    if space.config.objspace.std.withtproxy:
+        # transparent proxies look up their attributes in the controller
+        from pypy.objspace.std.proxyobject import W_Transparent
+        if isinstance(w_obj, W_Transparent):
+            return None
+    w_type = space.type(w_obj)
+    version_tag = w_type.version_tag()
+    entry = pycode._mapdict_caches[nameindex]
+    if entry.w_descr is not None and entry.version_tag is version_tag:
+        if space.config.objspace.std.withmethodcachecounter:
+            entry.success_counter += 1
+        return entry.w_descr
+    if (version_tag is None or w_type.hasdict or w_type.is_heaptype() or
+            not w_type.has_object_getattribute()):
+        return None
+    name = space.str_w(pycode.co_names_w[nameindex])
+    _, w_descr = w_type._pure_lookup_where_possibly_with_method_cache(
+        name, version_tag)
+    if w_descr is None or isinstance(w_descr, MutableCell):
+        return None
+    if w_type.lookup('__getattr__') is not None:
+        return None
+    _fill_cache(pycode, nameindex, _invalid_cache_entry_map, version_tag, -1,
+                w_descr=w_descr)
+    return w_descr
+
 def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
                                             w_obj, w_type):
     version_tag = w_type.version_tag()
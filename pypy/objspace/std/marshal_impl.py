@@ -5,7 +5,7 @@ from rpython.rlib.unroll import unrolling_iterable
 
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.special import Ellipsis
-from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.pycode import PyCode, W_LazyCode
 from pypy.interpreter import unicodehelper
 from pypy.objspace.std.boolobject import W_BoolObject
 from pypy.objspace.std.bytesobject import W_BytesObject
@@ -267,7 +267,8 @@ def unmarshal_bytes(space, u, tc):
 @unmarshaller(TYPE_INTERNED)
 def unmarshal_interned(space, u, tc):
     w_ret = space.new_interned_str(u.get_str())
-    u.stringtable_w.append(w_ret)
+    if not u.stringtable_complete:
+        u.stringtable_w.append(w_ret)
     return w_ret
 
 @unmarshaller(TYPE_STRINGREF)
@@ -345,7 +346,7 @@ def marshal_pycode(space, w_pycode, m):
     m.put_int(x.co_stacksize)
     m.put_int(x.co_flags)
     m.atom_str(TYPE_STRING, x.co_code)
-    m.put_tuple_w(TYPE_TUPLE, x.co_consts_w)
+    m.put_tuple_w(TYPE_TUPLE, x.getconsts_w())
     m.put_tuple_w(TYPE_TUPLE, x.co_names_w)
     _put_interned_str_list(space, m, x.co_varnames)
     _put_interned_str_list(space, m, x.co_freevars)
@@ -379,7 +380,10 @@ def unmarshal_pycode(space, u, tc):
     flags       = u.get_int()
     code        = unmarshal_str(u)
     u.start(TYPE_TUPLE)
-    consts_w    = u.get_tuple_w()
+    if u.lazy_code:
+        consts_w = unmarshal_consts_lazily(space, u)
+    else:
+        consts_w = u.get_tuple_w()
     # copy in order not to merge it with anything else
     names       = unmarshal_strlist(u, TYPE_TUPLE)
     varnames    = unmarshal_strlist(u, TYPE_TUPLE)
@@ -393,6 +397,90 @@ def unmarshal_pycode(space, u, tc):
                   code, consts_w[:], names, varnames, filename,
                   name, firstlineno, lnotab, freevars, cellvars)
 
+# lazy loading of the code objects in the constants of another one, with
+# the 'lazycodeloading' option: they are skipped in the marshal data and
+# replaced with a W_LazyCode, which unmarshals them when they are needed.
+# The strings interned while skipping them are still added to the string
+# table, so that the TYPE_STRINGREFs after them refer to the right strings.
+
+def unmarshal_consts_lazily(space, u):
+    from pypy.module.marshal.interp_marshal import StringUnmarshaller
+    assert isinstance(u, StringUnmarshaller)
+    lng = u.get_lng()
+    consts_w = [None] * lng
+    for i in range(lng):
+        pos = u.bufpos
+        if pos < u.limit and u.bufstr[pos] == TYPE_CODE:
+            u.bufpos = pos + 1
+            skip_w_obj(space, u, TYPE_CODE)
+            consts_w[i] = W_LazyCode(space, u.bufstr, pos, u.stringtable_w)
+        else:
+            consts_w[i] = u.get_w_obj()
+    return consts_w
+
+def skip_w_obj(space, u, tc):
+    """Skip over the object of type 'tc' at the position of 'u' in the
+    marshal data.  The data is not checked any further than needed to
+    find where the object ends."""
+    if tc == TYPE_INT or tc == TYPE_STRINGREF:
+        u.skip(4)
+    elif tc == TYPE_INT64 or tc == TYPE_BINARY_FLOAT:
+        u.skip(8)
+    elif tc == TYPE_BINARY_COMPLEX:
+        u.skip(16)
+    elif tc == TYPE_FLOAT:
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_COMPLEX:
+        u.skip(ord(u.get1()))
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_LONG:
+        lng = u.get_int()
+        if lng < 0:
+            lng = -lng
+        u.skip(lng)
+        u.skip(lng)
+    elif tc == TYPE_STRING or tc == TYPE_UNICODE:
+        u.skip(u.get_lng())
+    elif tc == TYPE_INTERNED:
+        if u.stringtable_complete:
+            u.skip(u.get_lng())
+        else:
+            unmarshal_interned(space, u, tc)
+    elif (tc == TYPE_TUPLE or tc == TYPE_LIST or tc == TYPE_SET or
+          tc == TYPE_FROZENSET):
+        for i in range(u.get_lng()):
+            skip_w_obj(space, u, u.get1())
+    elif tc == TYPE_DICT:
+        while True:
+            tc = u.get1()
+            if tc == TYPE_NULL:
+                break
+            skip_w_obj(space, u, tc)
+            skip_w_obj(space, u, u.get1())
+    elif tc == TYPE_CODE:
+        u.skip(16)    # argcount, nlocals, stacksize, flags
+        for i in range(8):    # code up to name
+            skip_w_obj(space, u, u.get1())
+        u.skip(4)     # firstlineno
+        skip_w_obj(space, u, u.get1())    # lnotab
+    elif not (tc == TYPE_NONE or tc == TYPE_TRUE or tc == TYPE_FALSE or
+              tc == TYPE_STOPITER or tc == TYPE_ELLIPSIS or tc == TYPE_NULL):
+        u.raise_exc("bad marshal data (unknown type code)")
+
+def unmarshal_lazy_code(space, data, pos, stringtable_w):
+    """Unmarshal the code object at position 'pos' in 'data', for
+    W_LazyCode.  The code objects in its constants are loaded lazily
+    in turn."""
+    from pypy.module.marshal.interp_marshal import StringUnmarshaller
+    u = StringUnmarshaller(space, space.wrap(data))
+    u.bufpos = pos
+    u.stringtable_w = stringtable_w
+    u.stringtable_complete = True
+    u.lazy_code = True
+    w_code = u.load_w_obj()
+    assert isinstance(w_code, PyCode)
+    return w_code
+
 
 @marshaller(W_UnicodeObject)
 def marshal_unicode(space, w_unicode, m):
@@ -0,0 +1,196 @@
+import inspect
+
+import py
+
+from pypy.objspace.std.bytesobject import (W_AbstractBytesObject,
+    W_BytesObject, StringBuffer, wrapchar)
+from pypy.objspace.std.sliceobject import (W_SliceObject,
+    normalize_simple_slice, unwrap_start_stop)
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.error import oefmt
+from rpython.rlib.rstring import endswith, startswith
+
+# slices shorter than this are always copied
+SLICE_MIN_LENGTH = 40
+# slices smaller than 1/SLICE_MAX_RATIO of the string they are taken
+# from are copied, to avoid keeping a big string alive for a small part
+SLICE_MAX_RATIO = 5
+
+
+def slice_is_worth_sharing(s, start, stop):
+    length = stop - start
+    return (length >= SLICE_MIN_LENGTH and
+            length * SLICE_MAX_RATIO >= len(s))
+
+
+class W_StringSliceObject(W_AbstractBytesObject):
+    """ A string that is a slice of another RPython string 'str', sharing
+    its characters.  It is turned into a real string when its value is
+    needed as an RPython string, e.g. to be passed to C, and when it is
+    used with a method without a special case below.
+    """
+    w_str = None
+
+    def __init__(self, str, start, stop):
+        assert 0 <= start <= stop <= len(str)
+        self.str = str
+        self.start = start
+        self.stop = stop
+
+    def force(self):
+        if self.w_str is None:
+            start = self.start
+            stop = self.stop
+            assert start >= 0 and stop >= 0
+            if start == 0 and stop == len(self.str):
+                s = self.str
+            else:
+                s = self.str[start:stop]
+            self.w_str = W_BytesObject(s)
+            # don't keep the original string alive any longer
+            self.str = s
+            self.start = 0
+            self.stop = len(s)
+            return s
+        else:
+            return self.w_str._value
+
+    def __repr__(w_self):
+        """ representation for debugging purposes """
+        return "%s(%r[%d:%d])" % (
+            w_self.__class__.__name__, w_self.str, w_self.start, w_self.stop)
+
+    def unwrap(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        return self.force()
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return StringBuffer(self.force())
+
+    def readbuf_w(self, space):
+        return StringBuffer(self.force())
+
+    def _length(self):
+        return self.stop - self.start
+
+    def _slice(self, space, start, stop):
+        assert 0 <= start <= stop
+        start += self.start
+        stop += self.start
+        assert start >= 0 and stop >= 0
+        if slice_is_worth_sharing(self.str, start, stop):
+            return W_StringSliceObject(self.str, start, stop)
+        return space.wrap(self.str[start:stop])
+
+    def descr_len(self, space):
+        return space.wrap(self._length())
+
+    def descr_str(self, space):
+        # you cannot get subclasses of W_StringSliceObject here
+        assert type(self) is W_StringSliceObject
+        return self
+
+    def descr_getitem(self, space, w_index):
+        length = self._length()
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, length)
+            if sl == 0:
+                return W_BytesObject.EMPTY
+            elif step == 1:
+                return self._slice(space, start, stop)
+            self.force()
+            return self.w_str.descr_getitem(space, w_index)
+        index = space.getindex_w(w_index, space.w_IndexError, "string index")
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return wrapchar(space, self.str[self.start + index])
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._length(), w_start,
+                                             w_stop)
+        if start == stop:
+            return W_BytesObject.EMPTY
+        return self._slice(space, start, stop)
+
+    def _absolute_bounds(self, space, w_start, w_end, upper_bound=False):
+        length = self._length()
+        start, end = unwrap_start_stop(space, length, w_start, w_end,
+                                       upper_bound=upper_bound)
+        if end > length:
+            end = length
+        return self.start + start, self.start + end
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        if not space.isinstance_w(w_sub, space.w_str):
+            self.force()
+            return self.w_str.descr_find(space, w_sub, w_start, w_end)
+        start, end = self._absolute_bounds(space, w_start, w_end)
+        res = self.str.find(space.str_w(w_sub), start, end)
+        if res >= 0:
+            res -= self.start
+        return space.wrap(res)
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        if not space.isinstance_w(w_sub, space.w_str):
+            self.force()
+            return self.w_str.descr_rfind(space, w_sub, w_start, w_end)
+        start, end = self._absolute_bounds(space, w_start, w_end)
+        res = self.str.rfind(space.str_w(w_sub), start, end)
+        if res >= 0:
+            res -= self.start
+        return space.wrap(res)
+
+    def descr_startswith(self, space, w_prefix, w_start=None, w_end=None):
+        if not space.isinstance_w(w_prefix, space.w_str):
+            self.force()
+            return self.w_str.descr_startswith(space, w_prefix, w_start,
+                                               w_end)
+        start, end = self._absolute_bounds(space, w_start, w_end, True)
+        return space.newbool(startswith(self.str, space.str_w(w_prefix),
+                                        start, end))
+
+    def descr_endswith(self, space, w_suffix, w_start=None, w_end=None):
+        if not space.isinstance_w(w_suffix, space.w_str):
+            self.force()
+            return self.w_str.descr_endswith(space, w_suffix, w_start, w_end)
+        start, end = self._absolute_bounds(space, w_start, w_end, True)
+        return space.newbool(endswith(self.str, space.str_w(w_suffix),
+                                      start, end))
+
+
+delegation_dict = {}
+for key, value in W_BytesObject.typedef.rawdict.iteritems():
+    if not isinstance(value, interp2app):
+        continue
+    if key in ('__len__', '__str__', '__getitem__', '__getslice__', 'find',
+               'rfind', 'startswith', 'endswith'):
+        continue
+
+    func = value._code._bltin
+    args = inspect.getargs(func.func_code)
+    if args.varargs or args.keywords:
+        raise TypeError("Varargs and keywords not supported in unwrap_spec")
+    argspec = ', '.join([arg for arg in args.args[1:]])
+    func_code = py.code.Source("""
+    def f(self, %(args)s):
+        self.force()
+        return self.w_str.%(func_name)s(%(args)s)
+    """ % {'args': argspec, 'func_name': func.func_name})
+    d = {}
+    exec func_code.compile() in d
+    f = d['f']
+    f.func_defaults = func.func_defaults
+    f.__module__ = func.__module__
+    # necessary for unique identifiers for pickling
+    f.func_name = func.func_name
+    unwrap_spec_ = getattr(func, 'unwrap_spec', None)
+    if unwrap_spec_ is not None:
+        f = unwrap_spec(**unwrap_spec_)(f)
+    setattr(W_StringSliceObject, func.func_name, f)
+
+W_StringSliceObject.typedef = W_BytesObject.typedef
@@ -339,6 +339,13 @@ class AppTestBytesArray:
         assert b == 'abcdef'
         assert isinstance(b, bytearray)
         raises(TypeError, b.__iadd__, u"")
+        b += buffer('ghi')
+        b += memoryview('jkl')
+        b += bytearray('mno')
+        assert b == 'abcdefghijklmno'
+        b.extend('pq')
+        b.extend(buffer('rs'))
+        assert b == 'abcdefghijklmnopqrs'
 
     def test_add(self):
         b1 = bytearray("abc")
@@ -451,6 +458,16 @@ class AppTestBytesArray:
         exc = raises(TypeError, "buf[4:6] = 'EF'")
         assert str(exc.value) == "buffer is read-only"
 
+    def test_buffer_slices(self):
+        b = bytearray('abcdefghi')
+        m = memoryview(b)
+        assert m.tobytes() == 'abcdefghi'
+        assert m[2:5].tobytes() == 'cde'
+        m[2:5] = 'CDE'
+        assert b == 'abCDEfghi'
+        assert str(buffer(b, 3, 4)) == 'DEfg'
+        assert bytearray('-').join([b, b]) == 'abCDEfghi-abCDEfghi'
+
     def test_decode(self):
         b = bytearray('abcdefghi')
         u = b.decode('utf-8')
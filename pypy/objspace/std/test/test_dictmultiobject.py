@@ -969,6 +969,23 @@ class AppTestStrategies(object):
         o.a = 1
         assert "BytesDictStrategy" in self.get_strategy(d)
 
+    def test_copy_keeps_strategy(self):
+        for d in [{"a": 1, "b": 2}, {1: "a", 2: "b"}, {1.5: 1, 2.5: 2},
+                  {(1, "a"): 1, None: 2}]:
+            d2 = d.copy()
+            assert self.get_strategy(d2) == self.get_strategy(d)
+            assert d2 == d
+            assert d2.keys() == d.keys()
+            key = d.keys()[0]
+            del d2[key]
+            assert key in d and key not in d2
+            assert len(d) == 2 and len(d2) == 1
+        class D(dict):
+            pass
+        d = D({1: 2})
+        assert type(d.copy()) is dict
+        assert d.copy() == {1: 2}
+
     def test_empty_to_unicode(self):
         d = {}
         assert "EmptyDictStrategy" in self.get_strategy(d)
@@ -986,6 +1003,43 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_empty_to_float(self):
+        d = {}
+        d[1.5] = "hi"
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        d[-0.0] = "zero"
+        assert d[0.0] == "zero"
+        assert d.keys()[d.values().index("zero")] == 0.0
+        assert d[0] == "zero"
+        assert None not in d
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        assert sorted(d.iterkeys()) == [-0.0, 1.5]
+        assert type(d.keys()[0]) is float
+        assert 0L in d
+
+    def test_float_lookup_with_int(self):
+        d = {1.0: 1, 2.5: 2}
+        assert d[1] == 1
+        assert 2 not in d
+        assert d.get(True) == 1
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        # ints that are not exactly representable are compared generically
+        import sys
+        assert sys.maxint not in d
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+
+    def test_float_nan(self):
+        nan = float('nan')
+        d = {}
+        d[nan] = 1
+        assert "FloatDictStrategy" not in self.get_strategy(d)
+        assert d[nan] == 1
+        d = {1.5: 2}
+        d[nan] = 1
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[nan] == 1
+        assert d[1.5] == 2
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -1014,6 +1068,52 @@ class AppTestStrategies(object):
         raises(RuntimeError, list, it)
 
 
+class AppTestPairStrategies(AppTestStrategies):
+    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+    def test_empty_to_int_pair(self):
+        d = {}
+        d[(1, 2)] = "a"
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        d[(3, 4)] = "b"
+        assert d[(1, 2)] == "a"
+        assert (2, 1) not in d
+        assert 1 not in d
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        assert sorted(d) == [(1, 2), (3, 4)]
+        assert sorted(d.items()) == [((1, 2), "a"), ((3, 4), "b")]
+        del d[(3, 4)]
+        assert d.keys() == [(1, 2)]
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        # other tuples are compared generically
+        assert d[1, 2.0] == "a"
+        assert d.popitem() == ((1, 2), "a")
+
+    def test_int_pair_to_object(self):
+        d = {(1, 2): "a"}
+        d[("x", 2)] = "b"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {(1, 2): "a", ("x", 2): "b"}
+        d = {(1, 2): "a"}
+        d[1] = "b"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[(1, 2)] == "a"
+
+    def test_empty_to_bytes_pair(self):
+        d = {}
+        d[("a", "b")] = 1
+        assert "BytesPairDictStrategy" in self.get_strategy(d)
+        d["c", "d"] = 2
+        assert d[("a", "b")] == 1
+        assert "a" not in d
+        assert "BytesPairDictStrategy" in self.get_strategy(d)
+        assert sorted(d.iteritems()) == [(("a", "b"), 1), (("c", "d"), 2)]
+        assert ("a", u"b") in d
+        d[("a", 1)] = 3
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[("c", "d")] == 2
+
+
 class FakeWrapper(object):
     hash_count = 0
     def unwrap(self, space):
@@ -1118,6 +1218,7 @@ class Config:
             withmethodcache = False
             withidentitydict = False
             withmapdict = False
+            withunboxedmapdict = False
 
 FakeSpace.config = Config()
 
@@ -589,6 +589,22 @@ class AppTestListObject(object):
         assert l == [1.2, 2.3, 3.4, 4.5]
         assert l is l0
 
+        class It(object):
+            def __init__(self, l):
+                self.l = l
+                self.i = 0
+            def __iter__(self):
+                return self
+            def next(self):
+                self.i += 1
+                if self.i > 3:
+                    raise StopIteration
+                self.l.append('x')    # changes the list strategy
+                return self.i
+        l = [0]
+        l.extend(It(l))
+        assert l == [0, 'x', 1, 'x', 2, 'x', 3]
+
     def test_sort(self):
         l = l0 = [1, 5, 3, 0]
         l.sort()
@@ -639,6 +655,46 @@ class AppTestListObject(object):
         r.sort(key=lambda x: -x)
         assert r == range(9, -1, -1)
 
+    def test_sort_key_unboxed(self):
+        l = ['c', 'aaa', 'bb', 'd', 'ee']
+        l.sort(key=len)
+        assert l == ['c', 'd', 'bb', 'ee', 'aaa']
+        l.sort(key=len, reverse=True)
+        assert l == ['aaa', 'bb', 'ee', 'c', 'd']
+        l = [(3, 'x'), (1.5, 'y'), (-2, 'z'), (1.5, 'w')]
+        l.sort(key=lambda t: float(t[0]))
+        assert l == [(-2, 'z'), (1.5, 'y'), (1.5, 'w'), (3, 'x')]
+        l.sort(key=lambda t: t[1])
+        assert l == [(1.5, 'w'), (3, 'x'), (1.5, 'y'), (-2, 'z')]
+        l.sort(key=lambda t: t[1], reverse=True)
+        assert l == [(-2, 'z'), (1.5, 'y'), (3, 'x'), (1.5, 'w')]
+        # mixed keys are compared as objects
+        l = [3, 1, 2]
+        l.sort(key=lambda x: [1, 2.5, 2L][x - 1])
+        assert l == [1, 3, 2]
+        l = [True, False, 5]
+        l.sort(key=lambda x: x)
+        assert l == [False, True, 5]
+        class I(int):
+            pass
+        l = [I(5), I(2), I(3)]
+        l.sort(key=lambda x: x)
+        assert l == [2, 3, 5]
+
+    def test_sort_key_mutation(self):
+        l = [3, 2, 1]
+        def key(x):
+            l.append(x)
+            return x
+        raises(ValueError, l.sort, key=key)
+        l = [3, 2, 1]
+        def key(x):
+            if x == 1:
+                raise ZeroDivisionError
+            return x
+        raises(ZeroDivisionError, l.sort, key=key)
+        assert sorted(l) == [1, 2, 3]
+
     def test_sort_reversed(self):
         l = range(10)
         l.sort(reverse=True)
@@ -369,6 +369,26 @@ class TestW_ListStrategies(TestW_ListObject):
         empty.extend(W_ListObject(space, []))
         assert isinstance(empty.strategy, EmptyListStrategy)
 
+    def test_extend_from_iterator(self):
+        space = self.space
+        w = space.wrap
+
+        l = W_ListObject(space, [w(1), w(2)])
+        l.extend(space.iter(W_ListObject(space, [w(3), w(4)])))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.listview_int(l) == [1, 2, 3, 4]
+
+        l = W_ListObject(space, [w('a')])
+        l.extend(space.iter(space.newtuple([w('b'), w('c')])))
+        assert isinstance(l.strategy, BytesListStrategy)
+        assert space.listview_bytes(l) == ['a', 'b', 'c']
+
+        l = W_ListObject(space, [w(1.5)])
+        l.extend(space.iter(space.newtuple([w(2.5), w('x'), w(3.5)])))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.eq_w(l, W_ListObject(space, [w(1.5), w(2.5), w('x'),
+                                                  w(3.5)]))
+
     def test_extend_other_with_empty(self):
         space = self.space
         w = space.wrap
@@ -9,6 +9,7 @@ class Config:
             withmethodcache = False
             withidentitydict = False
             withmapdict = True
+            withunboxedmapdict = False
 
 space = FakeSpace()
 space.config = Config
@@ -946,6 +947,43 @@ class AppTestWithMapDictAndCounters(object):
         res = self.check(h, 'cm')
         assert res == (0, 0, 0)
 
+    def test_builtin_types(self):
+        l = []
+        x = 42.5
+        def f():
+            l.append(x)
+            return int(x.real)
+        #
+        res = self.check(f, 'append')
+        assert res == (1, 0, 0)
+        res = self.check(f, 'append')
+        assert res == (0, 1, 0)
+        res = self.check(f, 'real')
+        assert res == (0, 1, 0)
+        assert l == [42.5] * 3
+        #
+        def g(x=x):
+            s = repr(x.real)
+            return len(s.join([s, s])) + 30
+        res = self.check(g, 'real')
+        assert res == (1, 0, 0)
+        res = self.check(g, 'real')
+        assert res == (0, 1, 0)
+        res = self.check(g, 'join')
+        assert res == (0, 1, 0)
+
+    def test_builtin_types_mix(self):
+        objs = [[], {}, [], set()]
+        def f():
+            for obj in objs:
+                obj.__len__()
+            return 42
+        #
+        res = self.check(f, '__len__')
+        assert res == (4, 0, 0)
+        res = self.check(f, '__len__')
+        assert res == (4, 0, 0)
+
     def test_mix_cache_bug(self):
         # bit sucky
         global C
@@ -1132,3 +1170,179 @@ def test_newdict_instance():
 class TestMapDictImplementationUsingnewdict(BaseTestRDictImplementation):
     StrategyClass = MapDictStrategy
     # NB: the get_impl method is not overwritten here, as opposed to above
+
+
+class AppTestWithUnboxedMapDict(AppTestWithMapDict):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedmapdict": True}
+
+    def test_unboxed_values(self):
+        import sys
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.y = 2.5
+        a.z = -sys.maxint - 1
+        a.t = float("inf")
+        assert (a.x, a.y, a.z, a.t) == (1, 2.5, -sys.maxint - 1, float("inf"))
+        assert type(a.x) is int
+        assert type(a.y) is float
+        a.x += 41
+        a.y *= 2
+        assert (a.x, a.y) == (42, 5.0)
+        assert a.__dict__ == {"x": 42, "y": 5.0, "z": -sys.maxint - 1,
+                              "t": float("inf")}
+        a.t = float("nan")
+        assert a.t != a.t
+
+    def test_type_change(self):
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.y = 2.5
+        a.z = 3
+        a.x = "foo"
+        assert (a.x, a.y, a.z) == ("foo", 2.5, 3)
+        a.y = 7
+        assert type(a.y) is int
+        assert (a.x, a.y, a.z) == ("foo", 7, 3)
+        b = A()
+        b.x = 5
+        b.y = 6.5
+        b.z = 7
+        assert (b.x, b.y, b.z) == (5, 6.5, 7)
+        b.x = None
+        assert (b.x, b.y, b.z) == (None, 6.5, 7)
+        assert a.__dict__ == {"x": "foo", "y": 7, "z": 3}
+
+    def test_subclasses_are_not_unboxed(self):
+        class MyInt(int):
+            pass
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.x = True
+        assert a.x is True
+        a.x = MyInt(5)
+        assert type(a.x) is MyInt
+        a.y = 1.5
+        a.y = 2L
+        assert type(a.y) is long
+
+    def test_slots(self):
+        class A(object):
+            __slots__ = ('x', 'y')
+        a = A()
+        a.x = 1.5
+        a.y = 2
+        assert (a.x, a.y) == (1.5, 2)
+        a.x = "x"
+        assert (a.x, a.y) == ("x", 2)
+        del a.y
+        raises(AttributeError, "a.y")
+
+
+class AppTestWithUnboxedMapDictAndCounters(AppTestWithMapDictAndCounters):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withmethodcachecounter": True,
+                   "objspace.std.withunboxedmapdict": True}
+
+
+class TestUnboxedStorage(object):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedmapdict": True}
+
+    def test_storage(self):
+        w_a = self.space.appexec([], """():
+            class A(object):
+                pass
+            a = A()
+            a.x = 1
+            a.s = "s"
+            a.y = 2.5
+            return a
+        """)
+        map = w_a._get_mapdict_map()
+        assert isinstance(map, UnboxedPlainAttribute)
+        assert map.unboxed_type == UNBOXED_FLOAT
+        assert map.listindex == 1
+        assert map.length() == 2
+        assert type(map.back) is PlainAttribute
+        x_attr = map.back.back
+        assert x_attr.unboxed_type == UNBOXED_INT
+        assert map.storageindex == x_attr.storageindex == 0
+        w_values = w_a._mapdict_read_storage(0)
+        assert isinstance(w_values, UnboxedValues)
+        assert len(w_values.values) == 2
+        #
+        # writing a str switches 'x' to a PlainAttribute, in this object
+        # and in the objects created later
+        w_b = self.space.appexec([w_a], """(a):
+            a.x = "x"
+            b = type(a)()
+            b.x = 2
+            return b
+        """)
+        map = w_a._get_mapdict_map()
+        assert map.unboxed_type == UNBOXED_FLOAT
+        assert map.listindex == 0
+        assert type(map.back.back) is PlainAttribute
+        assert type(w_b._get_mapdict_map()) is PlainAttribute
+
+    def test_get_new_attr_is_elidable(self):
+        # _get_new_attr() is elidable: it must keep returning the same
+        # attribute for the same arguments, even after a type switch
+        w_a = self.space.appexec([], """():
+            class A(object):
+                pass
+            a = A()
+            a.x = 1
+            return a
+        """)
+        x_attr = w_a._get_mapdict_map()
+        terminator = x_attr.back
+        assert terminator._get_new_attr("x", DICT, UNBOXED_INT) is x_attr
+        assert not x_attr.generalized
+        w_b = self.space.appexec([w_a], """(a):
+            a.x = 1.5
+            b = type(a)()
+            b.x = 2
+            return b
+        """)
+        assert terminator._get_new_attr("x", DICT, UNBOXED_INT) is x_attr
+        assert x_attr.generalized
+        assert type(w_a._get_mapdict_map()) is PlainAttribute
+        assert w_b._get_mapdict_map() is w_a._get_mapdict_map()
+        #
+        # a float after an int in new objects generalizes too
+        w_c = self.space.appexec([], """():
+            class C(object):
+                pass
+            C().y = 1
+            c = C()
+            c.y = 2.5
+            return c
+        """)
+        assert type(w_c._get_mapdict_map()) is PlainAttribute
+
+
+class AppTestWithMapDictAndTProxy(object):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withtproxy": True}
+
+    def test_proxy_attributes_not_cached(self):
+        from __pypy__ import tproxy
+        def controller(name, *args):
+            if name == '__getattribute__' and args == ('__reduce__',):
+                return lambda: 42
+            raise AttributeError(name)
+        p = tproxy(object, controller)
+        def f():
+            return p.__reduce__(), p.__reduce__
+        for i in range(3):
+            res, meth = f()
+            assert res == 42
+            assert meth() == 42
@@ -31,6 +31,21 @@ class AppTestMemoryView:
         exc = raises(NotImplementedError, "v[0:2:2] = 'spam'")
         assert str(exc.value) == ""
 
+    def test_slices_of_slices(self):
+        data = bytearray('abcdefghij')
+        v = memoryview(data)[2:9]
+        w = v[1:6][1:4]
+        assert w.tobytes() == 'efg'
+        assert w[1:][1] == 'g'
+        w[:] = 'EFG'
+        assert data == 'abcdEFGhij'
+        assert v.tobytes() == 'cdEFGhi'
+        assert len(v[5:100]) == 2
+        assert len(w[3:]) == 0
+        del data[5:]
+        assert w.tobytes() == 'E'
+        assert v[1:4].tobytes() == 'dE'
+
     def test_memoryview_attrs(self):
         v = memoryview("a"*100)
         assert v.format == "B"
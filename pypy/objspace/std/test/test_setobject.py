@@ -80,8 +80,7 @@ class TestW_SetObject:
 
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
-        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, UnicodeSetStrategy
-        from pypy.objspace.std.floatobject import W_FloatObject
+        from pypy.objspace.std.setobject import BytesSetStrategy, FloatSetStrategy, ObjectSetStrategy, UnicodeSetStrategy
 
         w = self.space.wrap
         intstr = self.space.fromcache(IntegerSetStrategy)
@@ -117,9 +116,15 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
+
+        w_list = W_ListObject(self.space, [w(1.0), w(2), w(3.0)])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
-            assert isinstance(item, W_FloatObject)
+            assert isinstance(item, W_Root)
 
         # changed cached object, need to change it back for other tests to pass
         intstr.get_storage_from_list = tmp_func
@@ -996,3 +1001,28 @@ class AppTestAppSetTest:
         s = set([1, 2, 3])
         s.intersection_update(set())
         assert strategy(s) == "EmptySetStrategy"
+
+    def test_float_strategy(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, 3.5])
+        assert strategy(s) == "FloatSetStrategy"
+        assert strategy(set([1.5]) | set([2.5])) == "FloatSetStrategy"
+        assert 1.5 in s and 2.0 not in s
+        assert set([1.0, 2.5]) == set([1, 2.5])
+        assert set([1.0, 2.0]) == set([1, 2])
+        assert set([1, 2]) - set([1.0, 2.5]) == set([2])
+        assert set([1.0, 2.5]) & set([1, 2]) == set([1])
+        assert 2 in set([2.0]) and 2 not in set([2.5])
+        assert strategy(set([0.0, -0.0])) == "FloatSetStrategy"
+        assert len(set([0.0, -0.0])) == 1
+        nan = float('nan')
+        s = set([1.5, nan])
+        assert strategy(s) == "ObjectSetStrategy"
+        assert nan in s
+        s = set()
+        s.add(nan)
+        assert nan in s
+        s = set([1.5])
+        s.add(nan)
+        assert nan in s and 1.5 in s
+        assert sorted(list(set([2.5, 1.5]))) == [1.5, 2.5]
@@ -1,6 +1,7 @@
 from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
+    FloatIteratorImplementation, FloatSetStrategy,
     IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
     UnicodeIteratorImplementation, UnicodeSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
@@ -29,6 +30,12 @@ class TestW_SetStrategies:
         s = W_SetObject(self.space, self.wrapped([u"a", u"b"]))
         assert s.strategy is self.space.fromcache(UnicodeSetStrategy)
 
+        s = W_SetObject(self.space, self.wrapped([1.5, 2.0]))
+        assert s.strategy is self.space.fromcache(FloatSetStrategy)
+
+        s = W_SetObject(self.space, self.wrapped([1.5, float('nan')]))
+        assert s.strategy is self.space.fromcache(ObjectSetStrategy)
+
     def test_switch_to_object(self):
         s = W_SetObject(self.space, self.wrapped([1,2,3,4,5]))
         s.add(self.space.wrap("six"))
@@ -114,6 +121,33 @@ class TestW_SetStrategies:
         assert s1.has_key(self.space.wrap(FakeInt(2)))
         assert s1.strategy is self.space.fromcache(ObjectSetStrategy)
 
+    def test_has_key_int_float(self):
+        space = self.space
+        s1 = W_SetObject(space, self.wrapped([1, 2, 3]))
+        assert s1.has_key(space.wrap(2.0))
+        assert not s1.has_key(space.wrap(2.5))
+        assert not s1.has_key(space.wrap(float('nan')))
+        assert s1.strategy is space.fromcache(IntegerSetStrategy)
+        s2 = W_SetObject(space, self.wrapped([1.0, 2.5]))
+        assert s2.has_key(space.wrap(1))
+        assert s2.has_key(space.w_True)
+        assert not s2.has_key(space.wrap(2))
+        assert not s2.has_key(space.wrap(float('nan')))
+        assert s2.strategy is space.fromcache(FloatSetStrategy)
+
+    def test_float_algebra(self):
+        space = self.space
+        s1 = W_SetObject(space, self.wrapped([1.5, 2.5, 3.5]))
+        s2 = W_SetObject(space, self.wrapped([2.5, 4.5]))
+        strategy = space.fromcache(FloatSetStrategy)
+        for s3 in [s1.difference(s2), s1.intersect(s2),
+                   s1.symmetric_difference(s2)]:
+            assert s3.strategy is strategy
+        assert strategy.unerase(s1.intersect(s2).sstorage) == {2.5: None}
+        s1.update(s2)
+        assert s1.strategy is strategy
+        assert sorted(space.listview_float(s1)) == [1.5, 2.5, 3.5, 4.5]
+
     def test_iter(self):
         space = self.space
         s = W_SetObject(space, self.wrapped([1,2]))
@@ -133,6 +167,11 @@ class TestW_SetStrategies:
         assert isinstance(it, UnicodeIteratorImplementation)
         assert space.unwrap(it.next()) == u"a"
         assert space.unwrap(it.next()) == u"b"
+        #
+        s = W_SetObject(space, self.wrapped([1.5]))
+        it = s.iter()
+        assert isinstance(it, FloatIteratorImplementation)
+        assert space.unwrap(it.next()) == 1.5
 
     def test_listview(self):
         space = self.space
@@ -0,0 +1,73 @@
+from pypy.objspace.std.test import test_bytesobject
+
+class AppTestStringSliceObject(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withstrslice": True}
+
+    def w_is_slice(self, s):
+        import __pypy__
+        return 'W_StringSliceObject' in __pypy__.internal_repr(s)
+
+    def test_basic(self):
+        s = "0123456789" * 10
+        t = s[10:]
+        assert type(t) is str
+        assert self.is_slice(t)
+        assert t == "0123456789" * 9
+        assert len(t) == 90
+        assert t[0] == "0"
+        assert t[-1] == "9"
+        raises(IndexError, "t[90]")
+        assert t[5:15] == "5678901234"
+        assert t[::-10] == "9" * 9
+        assert not self.is_slice(s[:10])
+
+    def test_small_slice_is_copied(self):
+        s = "x" * 1000
+        assert not self.is_slice(s[:100])
+        assert self.is_slice(s[:200])
+
+    def test_slice_of_slice(self):
+        s = "".join([chr(65 + i % 26) for i in range(200)])
+        t = s[20:]
+        u = t[20:]
+        assert self.is_slice(u)
+        assert u == s[40:]
+        assert t[20:180] == s[40:200]
+        assert t.__getslice__(20, 180) == s[40:200]
+
+    def test_find_and_startswith(self):
+        s = "abc" * 50
+        t = s[3:]
+        assert self.is_slice(t)
+        assert t.find("c") == 2
+        assert t.find("c", 3) == 5
+        assert t.find("c", -1) == len(t) - 1
+        assert t.find("x") == -1
+        assert t.find("", 1000) == -1
+        assert t.rfind("a") == len(t) - 3
+        assert t.rfind("a", 0, 4) == 3
+        assert t.startswith("abc")
+        assert t.startswith("bc", 1)
+        assert not t.startswith("a", 1)
+        assert t.endswith("bc")
+        assert t.endswith("ab", 0, 2)
+        assert t.startswith(("x", "abc"))
+        assert t.find(u"c") == 2
+        assert self.is_slice(t)
+
+    def test_forced(self):
+        s = "abc" * 50
+        t = s[3:]
+        assert t.upper() == "ABC" * 49
+        assert t == "abc" * 49
+        assert hash(t) == hash("abc" * 49)
+        assert t + "d" == "abc" * 49 + "d"
+        assert buffer(t)[:3] == "abc"
+
+    def test_strip_and_partition(self):
+        s = " " * 5 + "a" * 100 + " " * 5
+        assert self.is_slice(s.strip())
+        assert s.strip() == "a" * 100
+        head, sep, tail = ("a" * 100 + ":" + "b" * 100).partition(":")
+        assert self.is_slice(head) and self.is_slice(tail)
+        assert (head, sep, tail) == ("a" * 100, ":", "b" * 100)
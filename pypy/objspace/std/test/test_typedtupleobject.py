@@ -0,0 +1,123 @@
+from pypy.objspace.std.test import test_tupleobject
+from pypy.objspace.std.tupleobject import W_TupleObject
+from pypy.objspace.std.typedtupleobject import (W_IntTupleObject,
+    W_FloatTupleObject, W_StrTupleObject)
+
+
+class TestW_TypedTupleObject:
+    spaceconfig = {"objspace.std.withtypedtuple": True}
+
+    def test_create(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(i) for i in range(5)])
+        assert isinstance(w_tuple, W_IntTupleObject)
+        assert w_tuple.items == [0, 1, 2, 3, 4]
+        w_tuple = space.newtuple([space.wrap(1.5), space.wrap(2.5)])
+        assert isinstance(w_tuple, W_FloatTupleObject)
+        w_tuple = space.newtuple([space.wrap('a'), space.wrap('b')])
+        assert isinstance(w_tuple, W_StrTupleObject)
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(1.5)])
+        assert isinstance(w_tuple, W_TupleObject)
+        w_tuple = space.newtuple([space.wrap(1), space.w_True])
+        assert isinstance(w_tuple, W_TupleObject)
+        w_tuple = space.newtuple([])
+        assert isinstance(w_tuple, W_TupleObject)
+
+    def test_hash_against_normal_tuple(self):
+        space = self.space
+        for values in [[1, 2, 3, -1, 2**62], [1.5, 2.0, -0.0, 1e300],
+                       ['abc', '', 'abc\x00']]:
+            N_w_tuple = W_TupleObject([space.wrap(x) for x in values])
+            T_w_tuple = space.newtuple([space.wrap(x) for x in values])
+            assert not isinstance(T_w_tuple, W_TupleObject)
+            assert space.eq_w(N_w_tuple, T_w_tuple)
+            assert space.eq_w(T_w_tuple, N_w_tuple)
+            assert space.int_w(space.hash(N_w_tuple)) == (
+                space.int_w(space.hash(T_w_tuple)))
+
+    def test_unpack(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(i) for i in range(3)])
+        items_w = space.fixedview_unroll(w_tuple, 3)
+        assert [space.int_w(w_item) for w_item in items_w] == [0, 1, 2]
+
+
+class AppTestW_TypedTupleObject:
+    spaceconfig = {"usemodules": ["struct"],
+                   "objspace.std.withtypedtuple": True}
+
+    def w_istyped(self, obj, expected=''):
+        import __pypy__
+        return ("TypedTupleObject" + expected) in __pypy__.internal_repr(obj)
+
+    def test_createtypedtuple(self):
+        import struct
+        assert self.istyped((1, 2, 3, 4, 5), '_int')
+        assert self.istyped(struct.unpack('5i', struct.pack('5i', *range(5))),
+                            '_int')
+        assert self.istyped((1.5, 2.5, 3.5), '_float')
+        assert self.istyped(('a', 'b', 'c'), '_str')
+        assert self.istyped(tuple([1, 2, 3]), '_int')
+        assert not self.istyped((1, 2.5, 3))
+        assert not self.istyped((1, 'a'))
+        assert not self.istyped((u'a', u'b'))
+        assert not self.istyped(())
+
+    def test_subclasses(self):
+        class I(int): pass
+        class S(str): pass
+        t = (I(42), I(43), I(44))
+        assert not self.istyped(t)
+        assert type(t[0]) is I
+        t = (S('a'), 'b')
+        assert not self.istyped(t)
+        assert type(t[0]) is S
+        t = (True, False, True)
+        assert not self.istyped(t)
+        assert t[0] is True
+
+    def test_operations(self):
+        t = (1, 2, 3, 4, 5)
+        assert len(t) == 5
+        assert t[0] == 1 and t[-1] == 5
+        raises(IndexError, "t[5]")
+        raises(IndexError, "t[-6]")
+        assert t[1:3] == (2, 3)
+        assert self.istyped(t[1:3] + (4, 5, 6), '_int')
+        assert t == (1, 2, 3, 4, 5)
+        assert t != (1, 2, 3, 4, 6)
+        assert t != (1, 2, 3, 4)
+        assert t == (1.0, 2, 3, 4, 5)
+        assert t != (1.5, 2, 3, 4, 5)
+        assert t < (1, 2, 3, 4, 6)
+        assert 3 in t and 6 not in t
+        assert hash(t) == hash((1.0, 2, 3, 4, 5))
+        a, b, c, d, e = t
+        assert (a, b, c, d, e) == (1, 2, 3, 4, 5)
+        assert list(t) == [1, 2, 3, 4, 5]
+        assert {t: 42}[(1, 2, 3, 4, 5)] == 42
+        f = (1.5, 2.5, float('inf'))
+        assert f == (1.5, 2.5, float('inf'))
+        assert hash(f) == hash((1.5, 2.5, float('inf')))
+        s = ('a', 'bc', '')
+        assert s == ('a', 'bc', '')
+        assert s == ('a', 'bc', u'')
+        assert s != ('a', 'bc', None)
+        x, y, z = s
+        assert (x, y, z) == s
+        assert repr(s) == "('a', 'bc', '')"
+
+    def test_nan(self):
+        nan = float('nan')
+        t = (nan, 1.0)
+        assert self.istyped(t, '_float')
+        assert t == t
+        assert (nan,) == (nan,)
+        assert t == (nan, 1)
+        assert not t != t
+        assert nan in t
+        assert (nan, 1.0) != (1.0, nan)
+
+
+class AppTestAll(test_tupleobject.AppTestW_TupleObject):
+    spaceconfig = {"objspace.std.withtypedtuple": True}
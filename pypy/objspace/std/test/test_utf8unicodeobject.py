@@ -0,0 +1,198 @@
+# -*- encoding: utf-8 -*-
+from pypy.objspace.std.test import test_unicodeobject
+from pypy.objspace.std.utf8unicodeobject import (
+    INDEX_STEP, W_UTF8UnicodeObject, check_utf8)
+
+
+def test_check_utf8():
+    assert check_utf8('') == 0
+    assert check_utf8('abc') == 3
+    assert check_utf8(u'\xe9t\xe9 €'.encode('utf-8')) == 5
+    assert check_utf8('\xf0\x90\x80\x80') in (1, -1)  # depends on MAXUNICODE
+    assert check_utf8('\xe9') == -1          # truncated
+    assert check_utf8('\xc0\x80') == -1      # overlong
+    assert check_utf8('\xe0\x80\x80') == -1  # overlong
+    assert check_utf8('\xed\xa0\x80') == -1  # surrogate
+    assert check_utf8('\xf4\x90\x80\x80') == -1  # above U+10FFFF
+    assert check_utf8('\xc3(') == -1
+    assert check_utf8('\x80') == -1
+
+
+class TestW_UTF8UnicodeObject:
+    spaceconfig = {"objspace.std.withutf8unicode": True}
+
+    def test_from_utf8(self):
+        w_u = W_UTF8UnicodeObject.from_utf8('abc')
+        assert w_u._length == 3
+        assert w_u.is_ascii()
+        assert W_UTF8UnicodeObject.from_utf8('\xc3\xa9', ascii_only=True) is None
+        w_u = W_UTF8UnicodeObject.from_utf8('\xc3\xa9')
+        assert w_u._length == 1
+        assert not w_u.is_ascii()
+        assert w_u.unicode_w(self.space) == u'\xe9'
+
+    def test_decode_does_not_copy(self):
+        space = self.space
+        s = 'hello world'
+        w_u = space.call_method(space.wrap(s), 'decode', space.wrap('ascii'))
+        assert isinstance(w_u, W_UTF8UnicodeObject)
+        assert w_u._utf8 is s
+        w_s = space.call_method(w_u, 'encode', space.wrap('utf-8'))
+        assert space.str_w(w_s) is s
+
+    def test_index(self):
+        u = u''.join([unichr(0x100 + i) for i in range(3 * INDEX_STEP + 5)])
+        w_u = W_UTF8UnicodeObject.from_utf8(u.encode('utf-8'))
+        for i in range(len(u)):
+            assert w_u._slice(i, i + 1).unicode_w(self.space) == u[i]
+        assert len(w_u._index) == 4
+
+    def test_char_index(self):
+        u = u''.join([unichr(0x100 + i) for i in range(3 * INDEX_STEP + 5)])
+        w_u = W_UTF8UnicodeObject.from_utf8(u.encode('utf-8'))
+        for i in range(len(u) + 1):
+            assert w_u._char_index(w_u._byte_offset(i)) == i
+
+    def test_identity(self):
+        space = self.space
+        s = '\xc3\xa9t\xc3\xa9'
+        w_u = W_UTF8UnicodeObject.from_utf8(s)
+        w_v = W_UTF8UnicodeObject.from_utf8(s)
+        assert space.is_w(w_u, w_v)
+        assert space.eq_w(space.id(w_u), space.id(w_v))
+        # not the same object as the str it shares its bytes with
+        assert not space.is_w(w_u, space.wrap(s))
+        assert not space.eq_w(space.id(w_u), space.id(space.wrap(s)))
+        w_other = W_UTF8UnicodeObject.from_utf8(s + 'x')
+        assert not space.is_w(w_u, w_other)
+        assert not space.eq_w(space.id(w_u), space.id(w_other))
+
+    def test_hash_is_cached(self):
+        space = self.space
+        w_u = W_UTF8UnicodeObject.from_utf8('\xc3\xa9t\xc3\xa9')
+        h = space.int_w(space.hash(w_u))
+        assert h == space.int_w(space.hash(space.wrap(u'\xe9t\xe9')))
+        assert w_u._hash == h
+        w_u.force = None      # not decoded again
+        assert space.int_w(space.hash(w_u)) == h
+
+
+class AppTestUTF8UnicodeString(test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = {"usemodules": ('unicodedata',),
+                   "objspace.std.withutf8unicode": True}
+
+    def w_is_compact(self, u):
+        import __pypy__
+        return 'W_UTF8UnicodeObject' in __pypy__.internal_repr(u)
+
+    def test_decode_compact(self):
+        u = 'abc'.decode('ascii')
+        assert self.is_compact(u)
+        assert type(u) is unicode
+        assert u == u'abc'
+        u = '\xc3\xa9t\xc3\xa9'.decode('utf-8')
+        assert self.is_compact(u)
+        assert u == u'\xe9t\xe9'
+        assert len(u) == 3
+        assert not self.is_compact('\xed\xa0\x80'.decode('utf-8'))
+        raises(UnicodeDecodeError, '\xc3\xa9'.decode, 'ascii')
+        raises(UnicodeDecodeError, '\xc3('.decode, 'utf-8')
+
+    def test_compact_indexing(self):
+        s = u'a\xe9€b' * 50
+        u = s.encode('utf-8').decode('utf-8')
+        assert self.is_compact(u)
+        for i in range(-len(s), len(s)):
+            assert u[i] == s[i]
+        raises(IndexError, "u[len(s)]")
+        raises(IndexError, "u[-len(s) - 1]")
+        assert u[3:70] == s[3:70]
+        assert self.is_compact(u[3:70])
+        assert u[-10:] == s[-10:]
+        assert u[5:2] == u''
+        assert u[1:100:3] == s[1:100:3]
+        assert u[::-1] == s[::-1]
+
+    def test_compact_operations(self):
+        a = 'abc'.decode('ascii')
+        b = '\xc3\xa9'.decode('utf-8')
+        assert hash(a) == hash(u'abc')
+        assert hash(b) == hash(u'\xe9')
+        assert a == 'abc'.decode('utf-8')
+        assert a != b
+        assert a == u'abc' and u'abc' == a
+        assert a + b == u'abc\xe9'
+        assert self.is_compact(a + b)
+        assert a + u'd' == u'abcd'
+        assert str(a) == 'abc'
+        raises(UnicodeEncodeError, str, b)
+        assert b.encode('utf-8') == '\xc3\xa9'
+        assert b.encode('latin-1') == '\xe9'
+        assert a.upper() == u'ABC'
+        assert b * 2 == u'\xe9\xe9'
+        assert u'%s!' % b == u'\xe9!'
+        assert {a: 1}[u'abc'] == 1
+        assert list(b + a) == [u'\xe9', u'a', u'b', u'c']
+        assert unicode(a) is a
+
+    def test_compact_find(self):
+        s = u'a\xe9\u20acb' * 40
+        u = s.encode('utf-8').decode('utf-8')
+        assert self.is_compact(u)
+        subs = [u'', u'a', u'\xe9', u'\u20acb', u'b' + u'a\xe9',
+                u'x', u'\ud800', 'b'.decode('ascii'), s, s + u'a']
+        bounds = [None, 0, 1, 3, 70, len(s) - 1, len(s), len(s) + 2, -1, -5,
+                  -len(s) - 3]
+        for sub in subs:
+            assert (sub in u) == (sub in s)
+            assert u.count(sub) == s.count(sub)
+            for start in bounds:
+                for end in bounds:
+                    args = (sub, start, end)
+                    assert u.find(*args) == s.find(*args)
+                    assert u.rfind(*args) == s.rfind(*args)
+                    assert u.count(*args) == s.count(*args)
+        assert u.index(u'\u20ac', 5) == 6
+        assert u.rindex(u'a\xe9') == len(s) - 4
+        raises(ValueError, u.index, u'x')
+        raises(ValueError, u.rindex, u'a', 1, 3)
+        assert u.find('\xe9'.decode('latin-1')) == 1
+        assert u.find('a') == 0
+
+    def test_compact_compare(self):
+        words = [u'', u'a', u'ab', u'b', u'\xe9', u'\xe9a', u'\u20ac',
+                 u'\uffff']
+        compact = [w.encode('utf-8').decode('utf-8') for w in words]
+        for a, ca in zip(words, compact):
+            for b, cb in zip(words, compact):
+                assert (ca < cb) == (a < b)
+                assert (ca <= cb) == (a <= b)
+                assert (ca > cb) == (a > b)
+                assert (ca >= cb) == (a >= b)
+                assert (ca < b) == (a < b)
+
+    def test_compact_identity(self):
+        s = '\xc3\xa9t\xc3\xa9'
+        u = s.decode('utf-8')
+        assert u is u
+        assert u[:] is u
+        assert id(u) == id(u)
+        assert id(u) != id(s)
+
+    def test_compact_strategies(self):
+        from __pypy__ import strategy
+        a = 'abc'.decode('ascii')
+        b = '\xc3\xa9'.decode('utf-8')
+        assert self.is_compact(a) and self.is_compact(b)
+        l = [a, b]
+        assert strategy(l) == "UnicodeListStrategy"
+        l.append('d'.decode('ascii'))
+        assert strategy(l) == "UnicodeListStrategy"
+        assert l == [u'abc', u'\xe9', u'd']
+        s = set([a, b])
+        assert strategy(s) == "UnicodeSetStrategy"
+        assert u'\xe9' in s
+        d = {}
+        d[a] = 1
+        assert strategy(d) == "UnicodeDictStrategy"
+        assert d[u'abc'] == 1
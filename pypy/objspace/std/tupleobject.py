@@ -73,6 +73,8 @@ class W_AbstractTupleObject(W_Root):
             return w_sequence
         else:
             tuple_w = space.fixedview(w_sequence)
+            if space.is_w(w_tupletype, space.w_tuple):
+                return space.newtuple(tuple_w)
         w_obj = space.allocate_instance(W_TupleObject, w_tupletype)
         W_TupleObject.__init__(w_obj, tuple_w)
         return w_obj
@@ -312,4 +314,9 @@ def wraptuple(space, list_w):
             return makespecialisedtuple(space, list_w)
         except NotSpecialised:
             pass
+    if space.config.objspace.std.withtypedtuple:
+        from pypy.objspace.std.typedtupleobject import maketypedtuple
+        w_tuple = maketypedtuple(space, list_w)
+        if w_tuple is not None:
+            return w_tuple
     return W_TupleObject(list_w)
@@ -0,0 +1,161 @@
+"""Tuples whose items are all ints, all floats or all strings.
+
+Enabled by the 'withtypedtuple' option.  Unlike the specialised tuples,
+these work for any length: the items are stored unboxed in a single
+fixed-size RPython list, and boxed again only when they are read.
+Hashing and comparing two tuples of the same kind work directly on the
+unboxed values.
+"""
+
+from pypy.interpreter.error import OperationError
+from pypy.objspace.std.tupleobject import (W_AbstractTupleObject,
+    UNROLL_CUTOFF, _unroll_condition, _unroll_condition_cmp)
+from pypy.objspace.std.util import negate
+from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
+from rpython.rlib.longlong2float import float2longlong
+from rpython.rlib.objectmodel import compute_hash
+from rpython.rlib.rarithmetic import intmask
+
+
+def make_typed_class(itemtype):
+    assert itemtype in (int, float, str)
+
+    def hash_item(space, value):
+        if itemtype == float:
+            # get the correct hash for float which is an
+            # integer & other less frequent cases
+            from pypy.objspace.std.floatobject import _hash_float
+            return _hash_float(space, value)
+        return compute_hash(value)
+
+    def eq_item(value1, value2):
+        if itemtype == float:
+            # like space.eq_w() on the boxed floats, which checks is_w()
+            # first: a NaN is equal to a NaN with the same bits
+            return (value1 == value2 or
+                    float2longlong(value1) == float2longlong(value2))
+        return value1 == value2
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['items[*]']
+
+        def __init__(self, space, items):
+            make_sure_not_resized(items)
+            self.space = space
+            self.items = items
+
+        def length(self):
+            return len(self.items)
+
+        @jit.look_inside_iff(_unroll_condition)
+        def tolist(self):
+            space = self.space
+            items = self.items
+            list_w = [None] * len(items)
+            for i in range(len(items)):
+                list_w[i] = space.wrap(items[i])
+            return list_w
+
+        def getitems_copy(self):
+            space = self.space
+            return [space.wrap(item) for item in self.items]
+
+        def getitem(self, space, index):
+            try:
+                value = self.items[index]
+            except IndexError:
+                raise OperationError(space.w_IndexError,
+                                     space.wrap("tuple index out of range"))
+            return space.wrap(value)
+
+        @jit.look_inside_iff(lambda self, _1: _unroll_condition(self))
+        def descr_hash(self, space):
+            mult = 1000003
+            x = 0x345678
+            z = len(self.items)
+            for value in self.items:
+                y = hash_item(space, value)
+                x = (x ^ y) * mult
+                z -= 1
+                mult += 82520 + z + z
+            x += 97531
+            return space.wrap(intmask(x))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            if isinstance(w_other, cls):
+                return space.newbool(self._eq_unboxed(w_other))
+            return self._descr_eq(space, w_other)
+
+        @jit.look_inside_iff(lambda self, w_other:
+                             _unroll_condition_cmp(self, None, w_other))
+        def _eq_unboxed(self, w_other):
+            items1 = self.items
+            items2 = w_other.items
+            if len(items1) != len(items2):
+                return False
+            for i in range(len(items1)):
+                if not eq_item(items1[i], items2[i]):
+                    return False
+            return True
+
+        @jit.look_inside_iff(_unroll_condition_cmp)
+        def _descr_eq(self, space, w_other):
+            items = self.items
+            if len(items) != w_other.length():
+                return space.w_False
+            for i in range(len(items)):
+                w_item = w_other.getitem(space, i)
+                if not space.eq_w(space.wrap(items[i]), w_item):
+                    return space.w_False
+            return space.w_True
+
+        descr_ne = negate(descr_eq)
+
+    cls.__name__ = 'W_TypedTupleObject_' + itemtype.__name__
+    return cls
+
+W_IntTupleObject = make_typed_class(int)
+W_FloatTupleObject = make_typed_class(float)
+W_StrTupleObject = make_typed_class(str)
+
+
+@jit.look_inside_iff(lambda space, list_w:
+        jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
+def maketypedtuple(space, list_w):
+    """Return a typed tuple with the items 'list_w', or None if they are
+    not all exactly ints, all exactly floats or all exactly strings."""
+    from pypy.objspace.std.bytesobject import W_BytesObject
+    from pypy.objspace.std.floatobject import W_FloatObject
+    from pypy.objspace.std.intobject import W_IntObject
+    length = len(list_w)
+    if length == 0:
+        return None
+    w_type = type(list_w[0])
+    if w_type is W_IntObject:
+        intitems = [0] * length
+        for i in range(length):
+            w_item = list_w[i]
+            if type(w_item) is not W_IntObject:
+                return None
+            intitems[i] = w_item.int_w(space)
+        return W_IntTupleObject(space, intitems)
+    elif w_type is W_FloatObject:
+        floatitems = [0.0] * length
+        for i in range(length):
+            w_item = list_w[i]
+            if type(w_item) is not W_FloatObject:
+                return None
+            floatitems[i] = w_item.float_w(space)
+        return W_FloatTupleObject(space, floatitems)
+    elif w_type is W_BytesObject:
+        stritems = [None] * length
+        for i in range(length):
+            w_item = list_w[i]
+            if type(w_item) is not W_BytesObject:
+                return None
+            stritems[i] = w_item.str_w(space)
+        return W_StrTupleObject(space, stritems)
+    return None
@@ -11,7 +11,8 @@ from rpython.rlib.runicode import (
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata import unicodedb
 from pypy.objspace.std import newformat
@@ -67,8 +68,9 @@ class W_UnicodeObject(W_Root):
 
     def readbuf_w(self, space):
         from rpython.rlib.rstruct.unichar import pack_unichar, UNICODE_SIZE
-        builder = StringBuilder(len(self._value) * UNICODE_SIZE)
-        for unich in self._value:
+        value = self._val(space)
+        builder = StringBuilder(len(value) * UNICODE_SIZE)
+        for unich in value:
             pack_unichar(unich, builder)
         return StringBuffer(builder.build())
 
@@ -82,11 +84,12 @@ class W_UnicodeObject(W_Root):
         return _create_list_from_unicode(w_self._value)
 
     def ord(self, space):
-        if len(self._value) != 1:
+        value = self._val(space)
+        if len(value) != 1:
             raise oefmt(space.w_TypeError,
                          "ord() expected a character, but string of length %d "
-                         "found", len(self._value))
-        return space.wrap(ord(self._value[0]))
+                         "found", len(value))
+        return space.wrap(ord(value[0]))
 
     def _new(self, value):
         return W_UnicodeObject(value)
@@ -111,11 +114,11 @@ class W_UnicodeObject(W_Root):
     @staticmethod
     def _op_val(space, w_other):
         if isinstance(w_other, W_UnicodeObject):
-            return w_other._value
+            return w_other._val(space)
         if space.isinstance_w(w_other, space.w_str):
-            return unicode_from_string(space, w_other)._value
+            return unicode_from_string(space, w_other)._val(space)
         return unicode_from_encoded_object(
-            space, w_other, None, "strict")._value
+            space, w_other, None, "strict")._val(space)
 
     def _chr(self, char):
         assert len(char) == 1
@@ -202,11 +205,11 @@ class W_UnicodeObject(W_Root):
 
         assert isinstance(w_value, W_UnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
-        W_UnicodeObject.__init__(w_newobj, w_value._value)
+        W_UnicodeObject.__init__(w_newobj, w_value._val(space))
         return w_newobj
 
     def descr_repr(self, space):
-        chars = self._value
+        chars = self._val(space)
         size = len(chars)
         s = _repr_function(chars, size, "strict")
         return space.wrap(s)
@@ -215,7 +218,7 @@ class W_UnicodeObject(W_Root):
         return encode_object(space, self, None, None)
 
     def descr_hash(self, space):
-        x = compute_hash(self._value)
+        x = compute_hash(self._val(space))
         return space.wrap(x)
 
     def descr_eq(self, space, w_other):
@@ -296,13 +299,13 @@ class W_UnicodeObject(W_Root):
         formatter = newformat.unicode_formatter(space, spec)
         self2 = unicode_from_object(space, self)
         assert isinstance(self2, W_UnicodeObject)
-        return formatter.format_string(self2._value)
+        return formatter.format_string(self2._val(space))
 
     def descr_mod(self, space, w_values):
         return mod_format(space, self, w_values, do_unicode=True)
 
     def descr_translate(self, space, w_table):
-        selfvalue = self._value
+        selfvalue = self._val(space)
         w_sys = space.getbuiltinmodule('sys')
         maxunicode = space.int_w(space.getattr(w_sys,
                                                space.wrap("maxunicode")))
@@ -374,7 +377,7 @@ class W_UnicodeObject(W_Root):
 
     def descr_islower(self, space):
         cased = False
-        for uchar in self._value:
+        for uchar in self._val(space):
             if (unicodedb.isupper(ord(uchar)) or
                 unicodedb.istitle(ord(uchar))):
                 return space.w_False
@@ -384,7 +387,7 @@ class W_UnicodeObject(W_Root):
 
     def descr_isupper(self, space):
         cased = False
-        for uchar in self._value:
+        for uchar in self._val(space):
             if (unicodedb.islower(ord(uchar)) or
                 unicodedb.istitle(ord(uchar))):
                 return space.w_False
@@ -397,6 +400,13 @@ def wrapunicode(space, uni):
     return W_UnicodeObject(uni)
 
 
+def is_unicode_exact(w_obj):
+    """Tell if w_obj is a unicode object and not an instance of a subclass.
+    With 'withutf8unicode' it may be a W_UTF8UnicodeObject as well."""
+    return (isinstance(w_obj, W_UnicodeObject) and
+            not w_obj.user_overridden_class)
+
+
 def plain_str2unicode(space, s):
     try:
         return unicode(s)
@@ -430,6 +440,16 @@ def _get_encoding_and_errors(space, w_encoding, w_errors):
 
 
 def encode_object(space, w_object, encoding, errors):
+    if space.config.objspace.std.withutf8unicode:
+        from pypy.objspace.std.utf8unicodeobject import W_UTF8UnicodeObject
+        if isinstance(w_object, W_UTF8UnicodeObject):
+            if encoding is None:
+                w_result = w_object.encode_fast(space,
+                                                getdefaultencoding(space))
+            else:
+                w_result = w_object.encode_fast(space, encoding)
+            if w_result is not None:
+                return w_result
     if encoding is None:
         # Get the encoder functions as a wrapped object.
         # This lookup is cached.
@@ -469,11 +489,19 @@ def decode_object(space, w_obj, encoding, errors):
         if encoding == 'ascii':
             # XXX error handling
             s = space.charbuf_w(w_obj)
+            if space.config.objspace.std.withutf8unicode:
+                w_result = _decode_utf8_object(s, ascii_only=True)
+                if w_result is not None:
+                    return w_result
             eh = unicodehelper.decode_error_handler(space)
             return space.wrap(str_decode_ascii(
                     s, len(s), None, final=True, errorhandler=eh)[0])
         if encoding == 'utf-8':
             s = space.charbuf_w(w_obj)
+            if space.config.objspace.std.withutf8unicode:
+                w_result = _decode_utf8_object(s)
+                if w_result is not None:
+                    return w_result
             eh = unicodehelper.decode_error_handler(space)
             return space.wrap(str_decode_utf_8(
                     s, len(s), None, final=True, errorhandler=eh,
@@ -488,6 +516,11 @@ def decode_object(space, w_obj, encoding, errors):
     return w_retval
 
 
+def _decode_utf8_object(s, ascii_only=False):
+    from pypy.objspace.std.utf8unicodeobject import W_UTF8UnicodeObject
+    return W_UTF8UnicodeObject.from_utf8(s, ascii_only)
+
+
 def unicode_from_encoded_object(space, w_obj, encoding, errors):
     # explicitly block bytearray on 2.7
     from .bytearrayobject import W_BytearrayObject
@@ -944,59 +977,62 @@ W_UnicodeObject.typedef = TypeDef(
                           doc=UnicodeDocstrings.__repr__.__doc__),
     __str__ = interp2app(W_UnicodeObject.descr_str,
                          doc=UnicodeDocstrings.__str__.__doc__),
-    __hash__ = interp2app(W_UnicodeObject.descr_hash,
-                          doc=UnicodeDocstrings.__hash__.__doc__),
-
-    __eq__ = interp2app(W_UnicodeObject.descr_eq,
-                        doc=UnicodeDocstrings.__eq__.__doc__),
-    __ne__ = interp2app(W_UnicodeObject.descr_ne,
-                        doc=UnicodeDocstrings.__ne__.__doc__),
-    __lt__ = interp2app(W_UnicodeObject.descr_lt,
-                        doc=UnicodeDocstrings.__lt__.__doc__),
-    __le__ = interp2app(W_UnicodeObject.descr_le,
-                        doc=UnicodeDocstrings.__le__.__doc__),
-    __gt__ = interp2app(W_UnicodeObject.descr_gt,
-                        doc=UnicodeDocstrings.__gt__.__doc__),
-    __ge__ = interp2app(W_UnicodeObject.descr_ge,
-                        doc=UnicodeDocstrings.__ge__.__doc__),
+    __hash__ = interpindirect2app(W_UnicodeObject.descr_hash,
+                                  doc=UnicodeDocstrings.__hash__.__doc__),
+
+    __eq__ = interpindirect2app(W_UnicodeObject.descr_eq,
+                                doc=UnicodeDocstrings.__eq__.__doc__),
+    __ne__ = interpindirect2app(W_UnicodeObject.descr_ne,
+                                doc=UnicodeDocstrings.__ne__.__doc__),
+    __lt__ = interpindirect2app(W_UnicodeObject.descr_lt,
+                                doc=UnicodeDocstrings.__lt__.__doc__),
+    __le__ = interpindirect2app(W_UnicodeObject.descr_le,
+                                doc=UnicodeDocstrings.__le__.__doc__),
+    __gt__ = interpindirect2app(W_UnicodeObject.descr_gt,
+                                doc=UnicodeDocstrings.__gt__.__doc__),
+    __ge__ = interpindirect2app(W_UnicodeObject.descr_ge,
+                                doc=UnicodeDocstrings.__ge__.__doc__),
 
     __len__ = interp2app(W_UnicodeObject.descr_len,
                          doc=UnicodeDocstrings.__len__.__doc__),
-    __contains__ = interp2app(W_UnicodeObject.descr_contains,
-                              doc=UnicodeDocstrings.__contains__.__doc__),
+    __contains__ = interpindirect2app(
+        W_UnicodeObject.descr_contains,
+        doc=UnicodeDocstrings.__contains__.__doc__),
 
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
+    __add__ = interpindirect2app(W_UnicodeObject.descr_add,
+                                 doc=UnicodeDocstrings.__add__.__doc__),
     __mul__ = interp2app(W_UnicodeObject.descr_mul,
                          doc=UnicodeDocstrings.__mul__.__doc__),
     __rmul__ = interp2app(W_UnicodeObject.descr_mul,
                           doc=UnicodeDocstrings.__rmul__.__doc__),
 
-    __getitem__ = interp2app(W_UnicodeObject.descr_getitem,
-                             doc=UnicodeDocstrings.__getitem__.__doc__),
-    __getslice__ = interp2app(W_UnicodeObject.descr_getslice,
-                              doc=UnicodeDocstrings.__getslice__.__doc__),
+    __getitem__ = interpindirect2app(
+        W_UnicodeObject.descr_getitem,
+        doc=UnicodeDocstrings.__getitem__.__doc__),
+    __getslice__ = interpindirect2app(
+        W_UnicodeObject.descr_getslice,
+        doc=UnicodeDocstrings.__getslice__.__doc__),
 
     capitalize = interp2app(W_UnicodeObject.descr_capitalize,
                             doc=UnicodeDocstrings.capitalize.__doc__),
     center = interp2app(W_UnicodeObject.descr_center,
                         doc=UnicodeDocstrings.center.__doc__),
-    count = interp2app(W_UnicodeObject.descr_count,
-                       doc=UnicodeDocstrings.count.__doc__),
+    count = interpindirect2app(W_UnicodeObject.descr_count,
+                               doc=UnicodeDocstrings.count.__doc__),
     decode = interp2app(W_UnicodeObject.descr_decode,
                         doc=UnicodeDocstrings.decode.__doc__),
     encode = interp2app(W_UnicodeObject.descr_encode,
                         doc=UnicodeDocstrings.encode.__doc__),
     expandtabs = interp2app(W_UnicodeObject.descr_expandtabs,
                             doc=UnicodeDocstrings.expandtabs.__doc__),
-    find = interp2app(W_UnicodeObject.descr_find,
-                      doc=UnicodeDocstrings.find.__doc__),
-    rfind = interp2app(W_UnicodeObject.descr_rfind,
-                       doc=UnicodeDocstrings.rfind.__doc__),
-    index = interp2app(W_UnicodeObject.descr_index,
-                       doc=UnicodeDocstrings.index.__doc__),
-    rindex = interp2app(W_UnicodeObject.descr_rindex,
-                        doc=UnicodeDocstrings.rindex.__doc__),
+    find = interpindirect2app(W_UnicodeObject.descr_find,
+                              doc=UnicodeDocstrings.find.__doc__),
+    rfind = interpindirect2app(W_UnicodeObject.descr_rfind,
+                               doc=UnicodeDocstrings.rfind.__doc__),
+    index = interpindirect2app(W_UnicodeObject.descr_index,
+                               doc=UnicodeDocstrings.index.__doc__),
+    rindex = interpindirect2app(W_UnicodeObject.descr_rindex,
+                                doc=UnicodeDocstrings.rindex.__doc__),
     isalnum = interp2app(W_UnicodeObject.descr_isalnum,
                          doc=UnicodeDocstrings.isalnum.__doc__),
     isalpha = interp2app(W_UnicodeObject.descr_isalpha,
@@ -1084,7 +1120,7 @@ W_UnicodeObject.EMPTY = W_UnicodeObject(u'')
 def unicode_to_decimal_w(space, w_unistr):
     if not isinstance(w_unistr, W_UnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
-    unistr = w_unistr._value
+    unistr = w_unistr._val(space)
     result = ['\0'] * len(unistr)
     digits = ['0', '1', '2', '3', '4',
               '5', '6', '7', '8', '9']
@@ -0,0 +1,356 @@
+"""Unicode objects stored in a compact UTF-8 form.
+
+Enabled by the 'withutf8unicode' option.  Decoding from ASCII or UTF-8
+returns a W_UTF8UnicodeObject that keeps a reference to the decoded
+bytes instead of a copy with one unichar per code point, and encoding
+such an object to UTF-8 returns these bytes again.  Indexing is O(1)
+for ASCII strings; for the others it goes through an index of the byte
+offset of every INDEX_STEP'th code point, built on demand.  Searching
+and comparing work on the UTF-8 bytes, which is valid because UTF-8
+sequences never match in the middle of another one and sort like the
+code points.  The other operations work on the unicode string, which is
+decoded each time and not kept: keeping it would need more memory than a
+plain unicode object.
+"""
+
+from rpython.rlib.objectmodel import compute_hash, compute_unique_id
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.runicode import (
+    MAXUNICODE, str_decode_utf_8, unicode_encode_utf_8)
+
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.sliceobject import (
+    W_SliceObject, normalize_simple_slice, unwrap_start_stop)
+from pypy.objspace.std.unicodeobject import (
+    W_UnicodeObject, _create_list_from_unicode)
+from pypy.objspace.std.util import IDTAG_UTF8
+
+INDEX_STEP = 64
+
+
+def check_utf8(s):
+    """Return the number of code points encoded in the string 's', or -1
+    if it is not valid UTF-8, or if it encodes surrogates or (on narrow
+    builds) characters outside the BMP.  Such strings would not be
+    encoded back to the same bytes, so they are not stored compactly.
+    """
+    pos = 0
+    end = len(s)
+    length = 0
+    while pos < end:
+        ch = ord(s[pos])
+        pos += 1
+        length += 1
+        if ch < 0x80:
+            continue
+        if ch < 0xC2:
+            return -1
+        if ch < 0xE0:
+            count = 1
+            minimum = 0x80
+            maximum = 0xBF
+        elif ch < 0xF0:
+            count = 2
+            minimum = 0xA0 if ch == 0xE0 else 0x80
+            maximum = 0x9F if ch == 0xED else 0xBF
+        elif ch < 0xF5 and MAXUNICODE > 0xFFFF:
+            count = 3
+            minimum = 0x90 if ch == 0xF0 else 0x80
+            maximum = 0x8F if ch == 0xF4 else 0xBF
+        else:
+            return -1
+        if pos + count > end:
+            return -1
+        ch = ord(s[pos])
+        if ch < minimum or ch > maximum:
+            return -1
+        for i in range(pos + 1, pos + count):
+            if ord(s[i]) & 0xC0 != 0x80:
+                return -1
+        pos += count
+    return length
+
+
+def utf8_char_size(ch):
+    """The length of the UTF-8 sequence starting with the byte 'ch'."""
+    if ch < 0x80:
+        return 1
+    elif ch < 0xE0:
+        return 2
+    elif ch < 0xF0:
+        return 3
+    return 4
+
+
+def _build_index(s):
+    index = []
+    pos = 0
+    i = 0
+    end = len(s)
+    while pos < end:
+        if i % INDEX_STEP == 0:
+            index.append(pos)
+        pos += utf8_char_size(ord(s[pos]))
+        i += 1
+    return index
+
+
+class W_UTF8UnicodeObject(W_UnicodeObject):
+    _immutable_fields_ = ['_utf8', '_length']
+    _index = None      # list of byte offsets, see _byte_offset()
+    _hash = -1         # cached hash of non-ASCII strings
+
+    def __init__(self, utf8, length):
+        self._utf8 = utf8
+        self._length = length
+
+    @staticmethod
+    def from_utf8(s, ascii_only=False):
+        """Return a W_UTF8UnicodeObject sharing the string 's', or None
+        if 's' cannot be stored in this form."""
+        length = check_utf8(s)
+        if length < 0 or (ascii_only and length != len(s)):
+            return None
+        return W_UTF8UnicodeObject(s, length)
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r)" % (self.__class__.__name__, self._utf8)
+
+    def force(self):
+        return str_decode_utf_8(self._utf8, len(self._utf8), 'strict',
+                                final=True)[0]
+
+    def is_ascii(self):
+        return self._length == len(self._utf8)
+
+    def unwrap(self, space):
+        # for testing
+        return self.force()
+
+    def create_if_subclassed(self):
+        return self
+
+    def is_w(self, space, w_other):
+        if not isinstance(w_other, W_UTF8UnicodeObject):
+            return False
+        return self is w_other or self._utf8 is w_other._utf8
+
+    def immutable_unique_id(self, space):
+        # tagged: the str object sharing '_utf8' has the untagged id
+        b = rbigint.fromint(compute_unique_id(self._utf8))
+        b = b.lshift(3).or_(rbigint.fromint(IDTAG_UTF8))
+        return space.newlong_from_rbigint(b)
+
+    def unicode_w(self, space):
+        return self.force()
+
+    _val = unicode_w
+
+    def listview_unicode(self):
+        return _create_list_from_unicode(self.force())
+
+    def _len(self):
+        return self._length
+
+    def _byte_offset(self, index):
+        if self.is_ascii():
+            return index
+        if index == self._length:
+            return len(self._utf8)
+        if self._index is None:
+            self._index = _build_index(self._utf8)
+        pos = self._index[index // INDEX_STEP]
+        for i in range(index % INDEX_STEP):
+            pos += utf8_char_size(ord(self._utf8[pos]))
+        return pos
+
+    def _char_index(self, pos):
+        """The inverse of _byte_offset()."""
+        if self.is_ascii():
+            return pos
+        if self._index is None:
+            self._index = _build_index(self._utf8)
+        index = self._index
+        lo = 0
+        hi = len(index)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if index[mid] <= pos:
+                lo = mid
+            else:
+                hi = mid
+        i = lo * INDEX_STEP
+        p = index[lo]
+        while p < pos:
+            p += utf8_char_size(ord(self._utf8[p]))
+            i += 1
+        return i
+
+    def _convert_byte_idx_params(self, space, w_start, w_end):
+        start, end = unwrap_start_stop(space, self._length, w_start, w_end)
+        return self._bound_offset(start), self._bound_offset(end)
+
+    def _bound_offset(self, index):
+        # the bounds of find() & co. may be past the end of the string
+        if index > self._length:
+            return len(self._utf8) + (index - self._length)
+        return self._byte_offset(index)
+
+    @staticmethod
+    def _utf8_op_val(w_other):
+        """The UTF-8 bytes of 'w_other', or None if it is not unicode or
+        could not be stored compactly, e.g. because it has surrogates."""
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return w_other._utf8
+        if not isinstance(w_other, W_UnicodeObject):
+            return None
+        u = w_other._value
+        s = unicode_encode_utf_8(u, len(u), 'strict', allow_surrogates=True)
+        if check_utf8(s) != len(u):
+            return None
+        return s
+
+    def _find(self, space, sub, w_start, w_end, forward):
+        start, end = self._convert_byte_idx_params(space, w_start, w_end)
+        if forward:
+            res = self._utf8.find(sub, start, end)
+        else:
+            res = self._utf8.rfind(sub, start, end)
+        if res < 0:
+            return res
+        return self._char_index(res)
+
+    def _slice(self, start, stop):
+        assert 0 <= start <= stop
+        bstart = self._byte_offset(start)
+        bstop = self._byte_offset(stop)
+        assert bstart >= 0 and bstop >= 0
+        return W_UTF8UnicodeObject(self._utf8[bstart:bstop], stop - start)
+
+    def _getitem_result(self, space, index):
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return self._slice(index, index + 1)
+
+    def descr_getitem(self, space, w_index):
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, self._length)
+            if sl == 0:
+                return self._empty()
+            elif step == 1:
+                return self._slice(start, stop)
+        return W_UnicodeObject.descr_getitem(self, space, w_index)
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._length, w_start,
+                                             w_stop)
+        if start == stop:
+            return self._empty()
+        return self._slice(start, stop)
+
+    def descr_hash(self, space):
+        # ASCII strings have the same hash as the unicode strings
+        if self.is_ascii():
+            x = compute_hash(self._utf8)
+        else:
+            x = self._hash
+            if x == -1:
+                x = compute_hash(self.force())
+                self._hash = x
+        return space.wrap(x)
+
+    def descr_eq(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 == w_other._utf8)
+        return W_UnicodeObject.descr_eq(self, space, w_other)
+
+    def descr_ne(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 != w_other._utf8)
+        return W_UnicodeObject.descr_ne(self, space, w_other)
+
+    def descr_lt(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 < w_other._utf8)
+        return W_UnicodeObject.descr_lt(self, space, w_other)
+
+    def descr_le(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 <= w_other._utf8)
+        return W_UnicodeObject.descr_le(self, space, w_other)
+
+    def descr_gt(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 > w_other._utf8)
+        return W_UnicodeObject.descr_gt(self, space, w_other)
+
+    def descr_ge(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return space.newbool(self._utf8 >= w_other._utf8)
+        return W_UnicodeObject.descr_ge(self, space, w_other)
+
+    def descr_contains(self, space, w_sub):
+        sub = self._utf8_op_val(w_sub)
+        if sub is None:
+            return W_UnicodeObject.descr_contains(self, space, w_sub)
+        return space.newbool(self._utf8.find(sub) >= 0)
+
+    def descr_count(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_op_val(w_sub)
+        # the empty string is counted once per code point, not per byte
+        if sub is None or not sub:
+            return W_UnicodeObject.descr_count(self, space, w_sub, w_start,
+                                               w_end)
+        start, end = self._convert_byte_idx_params(space, w_start, w_end)
+        return space.newint(self._utf8.count(sub, start, end))
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_op_val(w_sub)
+        if sub is None:
+            return W_UnicodeObject.descr_find(self, space, w_sub, w_start,
+                                              w_end)
+        return space.wrap(self._find(space, sub, w_start, w_end, True))
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_op_val(w_sub)
+        if sub is None:
+            return W_UnicodeObject.descr_rfind(self, space, w_sub, w_start,
+                                               w_end)
+        return space.wrap(self._find(space, sub, w_start, w_end, False))
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_op_val(w_sub)
+        if sub is None:
+            return W_UnicodeObject.descr_index(self, space, w_sub, w_start,
+                                               w_end)
+        res = self._find(space, sub, w_start, w_end, True)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.index")
+        return space.wrap(res)
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        sub = self._utf8_op_val(w_sub)
+        if sub is None:
+            return W_UnicodeObject.descr_rindex(self, space, w_sub, w_start,
+                                                w_end)
+        res = self._find(space, sub, w_start, w_end, False)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.rindex")
+        return space.wrap(res)
+
+    def descr_add(self, space, w_other):
+        if isinstance(w_other, W_UTF8UnicodeObject):
+            return W_UTF8UnicodeObject(self._utf8 + w_other._utf8,
+                                       self._length + w_other._length)
+        return W_UnicodeObject.descr_add(self, space, w_other)
+
+    def encode_fast(self, space, encoding):
+        """Return the encoded string without copying, or None."""
+        if encoding == 'utf-8' or (encoding == 'ascii' and self.is_ascii()):
+            return space.wrap(self._utf8)
+        return None
@@ -67,10 +67,10 @@ class Bytecode:
             return [repr(c) for c in co.co_consts]
 
         if space is None:
-            return [repr(c) for c in co.co_consts_w]
+            return [repr(c) for c in co.getconsts_w()]
         
         r = lambda x: space.str_w(space.repr(x))
-        return [r(c) for c in co.co_consts_w]
+        return [r(c) for c in co.getconsts_w()]
 
     def repr_with_space(self, space):
         return self.name + self.reprargstring(space)
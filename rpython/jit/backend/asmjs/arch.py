@@ -7,3 +7,14 @@ FRAME_FIXED_SIZE = 0
 JITFRAME_FIXED_SIZE = 0
 
 SANITYCHECK = True
+
+# Bridges are compiled into small separate "side functions" rather than being
+# relooped into the function that holds their loop, so that adding a bridge
+# does not require recompiling everything that came before it.  Once enough
+# side functions have accumulated they are consolidated back into the main
+# function in a single re-assembly.  The consolidation point grows with the
+# size of the main function, so total compilation cost stays linear in the
+# number of bridges.  Set the 'partition_bridges' attribute on the CPU to
+# False to reloop every bridge into the main function instead.
+PARTITION_BRIDGES = True
+CONSOLIDATE_THRESHOLD = 16
@@ -55,6 +55,33 @@ INVALIDATION = lltype.Struct(
 )
 INVALIDATION_PTR = lltype.Ptr(INVALIDATION)
 
+# A one-word slot in memory used to link separately-compiled functions.
+# Each guard gets one that holds the funcid of its side-compiled bridge,
+# and each function gets one through which its side functions can ask it
+# to re-enter at a particular block.  Like INVALIDATION, this lets us change
+# behaviour without re-compiling the code that checks the slot.
+FUNCSLOT = lltype.Struct(
+    "FUNCSLOT",
+    ("value", lltype.Signed)
+)
+FUNCSLOT_PTR = lltype.Ptr(FUNCSLOT)
+
+
+def allocate_funcslot():
+    funcslotptr = lltype.malloc(FUNCSLOT, flavor="raw")
+    funcslot = rffi.cast(FUNCSLOT_PTR, funcslotptr)
+    funcslot.value = 0
+    return funcslot
+
+
+def funcslot_addr(cpu, funcslot):
+    translate_support_code = cpu.translate_support_code
+    offset, size = symbolic.get_field_token(FUNCSLOT, "value",
+                                            translate_support_code)
+    assert size == js.Int32.size
+    addr = rffi.cast(lltype.Signed, funcslot)
+    return js.Plus(js.ConstInt(addr), js.ConstInt(offset))
+
 
 class AssemblerASMJS(object):
     """Class for assembling a Trace into a compiled ASMJS function."""
@@ -129,24 +156,41 @@ class AssemblerASMJS(object):
         """Assemble, compile and link a new bridge from the given trace."""
         #os.write(2, "ASSEMBLE BRIDGE START %f\n" % (time.time(),))
         assert isinstance(faildescr, AbstractFailDescr)
+        clt = original_loop_token.compiled_loop_token
+        func = clt.func
+        final_op = operations[-1]
+        target_block = None
+        if final_op.getopnum() == rop.JUMP:
+            descr = final_op.getdescr()
+            assert isinstance(descr, TargetToken)
+            target_block = descr._asmjs_block
+        # If the bridge stays within its own function, we can compile it
+        # into a separate side function without touching the existing code.
+        if self.cpu.partition_bridges:
+            if target_block is None or target_block.func is func:
+                side_func = CompiledSideFuncASMJS(self, func, faildescr)
+                self.setup(original_loop_token)
+                clt.add_code_to_loop(operations, inputargs, faildescr,
+                                     side_func)
+                self.teardown()
+                func.attach_side_func(side_func, target_block)
+                #os.write(2, "ASSEMBLE BRIDGE END %f\n" % (time.time(),))
+                return
+            # Otherwise fold everything back together before merging.
+            func.consolidate(reassemble=False)
+            target_block.func.consolidate(reassemble=False)
         # Merge the new operations into the existing loop.
         self.setup(original_loop_token)
-        clt = original_loop_token.compiled_loop_token
         clt.add_code_to_loop(operations, inputargs, faildescr)
         self.teardown()
         # If it jumps to a loop in a different func, merge with that func.
         # If not, recompile just the modified func.
-        final_op = operations[-1]
-        if final_op.getopnum() != rop.JUMP:
+        if target_block is None:
+            clt.func.reassemble()
+        elif target_block.clt.func is clt.func:
             clt.func.reassemble()
         else:
-            descr = final_op.getdescr()
-            assert isinstance(descr, TargetToken)
-            target_block = descr._asmjs_block
-            if target_block.clt.func is clt.func:
-                clt.func.reassemble()
-            else:
-                target_block.clt.func.merge_with(clt.func)
+            target_block.clt.func.merge_with(clt.func)
         #os.write(2, "ASSEMBLE BRIDGE END %f\n" % (time.time(),))
 
     def redirect_call_assembler(self, oldlooptoken, newlooptoken):
@@ -166,6 +210,10 @@ class AssemblerASMJS(object):
         func = compiled_loop_token.func
         func.remove_loop(compiled_loop_token)
 
+    def get_code_size(self, compiled_loop_token):
+        assert isinstance(compiled_loop_token, CompiledLoopTokenASMJS)
+        return compiled_loop_token.get_source_length()
+
     def invalidate_loop(self, looptoken):
         looptoken.compiled_loop_token.invalidate_loop()
 
@@ -189,12 +237,19 @@ class CompiledFuncASMJS(object):
         self.num_removed_loops = 0
         self.merged_from = None
         self.merged_into = None
+        self.side_funcs = []
+        self.num_side_blocks = 0
+        self.entry_blocks = []
+        self.reenter = allocate_funcslot()
         frame_info = lltype.malloc(jitframe.JITFRAMEINFO, flavor="raw")
         self.frame_info = rffi.cast(jitframe.JITFRAMEINFOPTR, frame_info)
         self.frame_info.clear()
         self.ensure_frame_depth(0)
 
     def free(self):
+        for side_func in self.side_funcs:
+            side_func.free()
+        lltype.free(self.reenter, flavor="raw")
         lltype.free(self.frame_info, flavor="raw")
         support.jitFree(self.compiled_funcid)
 
@@ -210,6 +265,10 @@ class CompiledFuncASMJS(object):
             assert self.merged_into is None
             assert other.merged_into is None
             assert other is not self
+        # Any side functions must be folded in before we renumber blocks,
+        # since their compiled code refers to blocks by entry label.
+        self.consolidate(reassemble=False)
+        other.consolidate(reassemble=False)
         # Merge into the one with the lowest funcid, as it's more likely
         # to have compiled jumps in it that we won't have to redirect.
         if self.compiled_funcid > other.compiled_funcid:
@@ -229,8 +288,13 @@ class CompiledFuncASMJS(object):
             clt.frame_info = res_func.frame_info
             res_func.compiled_loops.append(clt)
         for block in src_func.compiled_blocks:
-            block.compiled_blockid = len(res_func.compiled_blocks)
+            if block is not None:
+                block.compiled_blockid = len(res_func.compiled_blocks)
+                block.func = res_func
             res_func.compiled_blocks.append(block)
+        for block in src_func.entry_blocks:
+            res_func.entry_blocks.append(block)
+        src_func.entry_blocks = []
         res_func.reassemble()
         # Mark the source function as being merged.
         src_func.merged_into = res_func
@@ -238,6 +302,7 @@ class CompiledFuncASMJS(object):
         return res_func
 
     def remove_loop(self, clt):
+        self.consolidate(reassemble=False)
         if SANITYCHECK:
             assert self.compiled_loops[clt.compiled_loopid] is clt
             for block in clt.compiled_blocks:
@@ -254,6 +319,88 @@ class CompiledFuncASMJS(object):
             # Nothing is left referencing this function.
             self.free()
 
+    def attach_side_func(self, side_func, target_block=None):
+        """Link in a bridge that has been compiled as a side function.
+
+        The side function is compiled on its own and then stored into the
+        guard's slot, so the existing code for this function does not
+        need to be re-compiled.  The exception is when the bridge jumps to
+        a block that we cannot yet be re-entered at, which requires a
+        one-off re-assembly to add the new entry point.
+        """
+        if SANITYCHECK:
+            assert side_func.main_func is self
+            assert self.merged_into is None
+        if target_block is not None:
+            if self.add_entry_block(target_block):
+                self.reassemble()
+        side_func.reassemble()
+        faildescr = side_func.faildescr
+        faildescr._asmjs_sideslot.value = side_func.compiled_funcid
+        self.side_funcs.append(side_func)
+        self.num_side_blocks += len(side_func.compiled_blocks)
+        # Consolidate once the side functions are at least as big as the
+        # main function, which keeps total compilation work linear.
+        if self.num_side_blocks >= self.cpu.consolidate_threshold:
+            if self.num_side_blocks >= len(self.compiled_blocks):
+                self.consolidate()
+
+    def add_entry_block(self, block):
+        """Allow side functions to re-enter this function at given block.
+
+        Returns True if the block was not already an entry point, in which
+        case the function must be re-assembled before it can be used.
+        """
+        if SANITYCHECK:
+            assert block.func is self
+        for entry_block in self.entry_blocks:
+            if entry_block is block:
+                return False
+        self.entry_blocks.append(block)
+        return True
+
+    def get_entry_label(self, block):
+        for i in xrange(len(self.entry_blocks)):
+            if self.entry_blocks[i] is block:
+                return -1 - i
+        raise AssertionError("block is not an entry block")
+
+    def consolidate(self, reassemble=True):
+        """Fold all side functions back into this function.
+
+        Their blocks become ordinary blocks of this function, so that
+        guards and jumps between them turn into local control flow.
+        """
+        if not self.side_funcs:
+            return
+        for side_func in self.side_funcs:
+            for block in side_func.compiled_blocks:
+                block.compiled_blockid = len(self.compiled_blocks)
+                block.func = self
+                self.compiled_blocks.append(block)
+            side_func.faildescr._asmjs_sideslot.value = 0
+            side_func.free()
+        self.side_funcs = []
+        self.num_side_blocks = 0
+        if reassemble:
+            self.reassemble()
+
+    def emit_side_return(self, bldr):
+        """Emit code to handle return from a side function.
+
+        If the side function requested that we re-enter at one of our
+        entry blocks, then loop back to the start of the function.
+        Otherwise the frame is ready to be returned to our caller.
+        """
+        reenter = js.HeapData(js.Int32, funcslot_addr(self.cpu, self.reenter))
+        with ctx_temp_intvar(bldr, reenter) as reenter_label:
+            with bldr.emit_if_block(reenter_label):
+                bldr.emit_store(js.zero, funcslot_addr(self.cpu, self.reenter),
+                                js.Int32)
+                bldr.emit_assignment(js.label, reenter_label)
+                bldr.emit_continue("T")
+        bldr.emit_exit()
+
     def ensure_frame_depth(self, required_offset):
         if SANITYCHECK:
             assert required_offset >= 0
@@ -295,61 +442,13 @@ class CompiledFuncASMJS(object):
                                 call = js.CallFunc("jitInvoke", callargs)
                                 bldr.emit_assignment(js.frame, call)
                                 bldr.emit_exit()
+        elif self.cpu.partition_bridges:
+            # Side functions may ask us to re-enter at a different block,
+            # by returning to the top of this trampoline loop.
+            with bldr.emit_while_block(js.true, "T"):
+                self.emit_function_body(bldr)
         else:
-            # We check the depth of the frame at entry to the function.
-            # If it's too small then we rellocate it via a helper.
-            req_depth = js.ConstInt(self.frame_info.jfi_frame_depth)
-            cur_depth = js.HeapData(js.Int32, js.FrameSizeAddr())
-            frame_too_small = js.LessThan(cur_depth, req_depth)
-            bldr.emit_comment("CHECK FRAME DEPTH")
-            with bldr.emit_if_block(frame_too_small):
-                # We must store a gcmap to prevent input args from being gc'd.
-                # The layout of input args depends on the target loop.
-                with bldr.emit_switch_block(js.label):
-                    for clt in self.compiled_loops:
-                        loopid = js.ConstInt(clt.compiled_loopid)
-                        with bldr.emit_case_block(loopid):
-                            clt.emit_store_initial_gcmap(bldr)
-                # Now we can call the helper function.
-                # There might be an exception active, which must be preserved.
-                reallocfn = js.ConstInt(self.cpu.realloc_frame)
-                args = [js.frame, req_depth]
-                with ctx_preserve_exception(self, bldr):
-                    newframe = js.DynCallFunc("iii", reallocfn, args)
-                    bldr.emit_assignment(js.frame, newframe)
-            # Load input args for the loop being entered,
-            # and convert from loopid to blockid
-            bldr.emit_comment("LOAD INPUT ARGS")
-            if len(self.compiled_loops) == 1:
-                clt = self.compiled_loops[0]
-                assert clt is not None
-                clt.emit_load_arguments(bldr)
-                clt.emit_set_initial_blockid(bldr)
-            else:
-                with bldr.emit_switch_block(js.label):
-                    for clt in self.compiled_loops:
-                        if clt is not None:
-                            loopid = js.ConstInt(clt.compiled_loopid)
-                            with bldr.emit_case_block(loopid):
-                                clt.emit_load_arguments(bldr)
-                                clt.emit_set_initial_blockid(bldr)
-            # Generate the relooped body from all loop blocks.
-            # XXX TODO: find a way to avoid re-doing all this work
-            # each time we add a new block.
-            #os.write(2, "ASSEMBLER RELOOP START %f\n" % (time.time(),))
-            blocks = {}
-            entries = []
-            for clt in self.compiled_loops:
-                if clt is not None and clt.redirected_to is None:
-                    entries.append(clt.compiled_blocks[0].compiled_blockid)
-                    for block in clt.compiled_blocks:
-                        blocks[block.compiled_blockid] = block
-            self.reloop_state = []
-            self.emit_relooped_blocks(bldr, entries, blocks)
-            self.reloop_state = None
-            #os.write(2, "ASSEMBLER RELOOP END %f\n" % (time.time(),))
-            # Always exit by returning the frame.
-            bldr.emit_exit()
+            self.emit_function_body(bldr)
 
         # Compile the replacement source code for our function.
         jssrc = bldr.finish()
@@ -360,6 +459,79 @@ class CompiledFuncASMJS(object):
         support.jitRecompile(self.compiled_funcid, jssrc)
         #os.write(2, "ASSEMBLER COMPILE END %f\n" % (time.time(),))
 
+    def emit_function_body(self, bldr):
+        # We check the depth of the frame at entry to the function.
+        # If it's too small then we rellocate it via a helper.
+        req_depth = js.ConstInt(self.frame_info.jfi_frame_depth)
+        cur_depth = js.HeapData(js.Int32, js.FrameSizeAddr())
+        frame_too_small = js.LessThan(cur_depth, req_depth)
+        bldr.emit_comment("CHECK FRAME DEPTH")
+        with bldr.emit_if_block(frame_too_small):
+            # We must store a gcmap to prevent input args from being gc'd.
+            # The layout of input args depends on the target loop.
+            with bldr.emit_switch_block(js.label):
+                for clt in self.compiled_loops:
+                    loopid = js.ConstInt(clt.compiled_loopid)
+                    with bldr.emit_case_block(loopid):
+                        clt.emit_store_initial_gcmap(bldr)
+                for i in xrange(len(self.entry_blocks)):
+                    block = self.entry_blocks[i]
+                    with bldr.emit_case_block(js.ConstInt(-1 - i)):
+                        block.emit_store_gcmap(bldr, block.initial_gcmap,
+                                               writebarrier=False)
+            # Now we can call the helper function.
+            # There might be an exception active, which must be preserved.
+            reallocfn = js.ConstInt(self.cpu.realloc_frame)
+            args = [js.frame, req_depth]
+            with ctx_preserve_exception(self, bldr):
+                newframe = js.DynCallFunc("iii", reallocfn, args)
+                bldr.emit_assignment(js.frame, newframe)
+        # Load input args for the loop being entered,
+        # and convert from loopid to blockid
+        bldr.emit_comment("LOAD INPUT ARGS")
+        if len(self.compiled_loops) == 1 and not self.entry_blocks:
+            clt = self.compiled_loops[0]
+            assert clt is not None
+            clt.emit_load_arguments(bldr)
+            clt.emit_set_initial_blockid(bldr)
+        else:
+            with bldr.emit_switch_block(js.label):
+                for clt in self.compiled_loops:
+                    if clt is not None:
+                        loopid = js.ConstInt(clt.compiled_loopid)
+                        with bldr.emit_case_block(loopid):
+                            clt.emit_load_arguments(bldr)
+                            clt.emit_set_initial_blockid(bldr)
+                # Side functions may ask us to re-enter at other blocks.
+                for i in xrange(len(self.entry_blocks)):
+                    block = self.entry_blocks[i]
+                    with bldr.emit_case_block(js.ConstInt(-1 - i)):
+                        block.emit_load_arguments(bldr)
+                        blockid = js.ConstInt(block.compiled_blockid)
+                        bldr.emit_assignment(js.label, blockid)
+        # Generate the relooped body from all loop blocks.
+        # XXX TODO: find a way to avoid re-doing all this work
+        # each time we add a new block.
+        #os.write(2, "ASSEMBLER RELOOP START %f\n" % (time.time(),))
+        blocks = {}
+        entries = []
+        for clt in self.compiled_loops:
+            if clt is not None and clt.redirected_to is None:
+                entries.append(clt.compiled_blocks[0].compiled_blockid)
+                for block in clt.compiled_blocks:
+                    if block.func is self:
+                        blocks[block.compiled_blockid] = block
+        for block in self.entry_blocks:
+            if block.compiled_blockid in blocks:
+                if block.compiled_blockid not in entries:
+                    entries.append(block.compiled_blockid)
+        self.reloop_state = []
+        self.emit_relooped_blocks(bldr, entries, blocks)
+        self.reloop_state = None
+        #os.write(2, "ASSEMBLER RELOOP END %f\n" % (time.time(),))
+        # Always exit by returning the frame.
+        bldr.emit_exit()
+
     def emit_relooped_blocks(self, bldr, entries, blocks):
         if not entries:
             return
@@ -521,14 +693,87 @@ class CompiledFuncASMJS(object):
         return False
 
     def _block_successors(self, block):
+        # Blocks in other functions are reached via jitInvoke,
+        # so they do not take part in relooping of this function.
         outtoken = block.outtoken
         if outtoken is not None:
             assert isinstance(outtoken, TargetToken)
             if outtoken._asmjs_block is not None:
-                yield outtoken._asmjs_block
+                if outtoken._asmjs_block.func is self:
+                    yield outtoken._asmjs_block
         for guardtoken in block.guardtokens:
             if guardtoken._asmjs_block is not None:
-                yield guardtoken._asmjs_block
+                if guardtoken._asmjs_block.func is self:
+                    yield guardtoken._asmjs_block
+
+
+class CompiledSideFuncASMJS(CompiledFuncASMJS):
+    """A separately-compiled function holding a single bridge.
+
+    In partitioned mode each new bridge is compiled into one of these,
+    rather than being relooped into the function that holds its loop.
+    The guard's failure path invokes it via the funcid stored in the
+    guard's slot, and jumps back into the loop are made by asking the
+    main function to re-enter at the target block.  Side functions are
+    periodically folded back into the main function by consolidate().
+    """
+
+    def __init__(self, assembler, main_func, faildescr):
+        self.assembler = assembler
+        self.cpu = assembler.cpu
+        self.compiled_funcid = support.jitReserve()
+        self.compiled_loops = []
+        self.compiled_blocks = []
+        self.num_removed_loops = 0
+        self.merged_from = None
+        self.merged_into = None
+        self.side_funcs = []
+        self.num_side_blocks = 0
+        self.entry_blocks = []
+        self.main_func = main_func
+        self.faildescr = faildescr
+        # Share the frame info, since we run on the main function's frame.
+        self.frame_info = main_func.frame_info
+
+    def free(self):
+        support.jitFree(self.compiled_funcid)
+
+    def reassemble(self):
+        """Compile the jitted asmjs function for this side function.
+
+        The guard failure code will already have spilled the failargs
+        and stored the corresponding gcmap, so we need only check the
+        frame depth and load our input args from their fail locations.
+        """
+        bldr = ASMJSBuilder(self.cpu)
+        faildescr = self.faildescr
+        entry_block = self.compiled_blocks[0]
+        req_depth = js.ConstInt(self.frame_info.jfi_frame_depth)
+        cur_depth = js.HeapData(js.Int32, js.FrameSizeAddr())
+        frame_too_small = js.LessThan(cur_depth, req_depth)
+        bldr.emit_comment("CHECK FRAME DEPTH")
+        with bldr.emit_if_block(frame_too_small):
+            reallocfn = js.ConstInt(self.cpu.realloc_frame)
+            args = [js.frame, req_depth]
+            with ctx_preserve_exception(self, bldr):
+                newframe = js.DynCallFunc("iii", reallocfn, args)
+                bldr.emit_assignment(js.frame, newframe)
+        bldr.emit_comment("LOAD INPUT ARGS")
+        entry_block.emit_load_arguments(bldr, faildescr._asmjs_faillocs)
+        bldr.emit_assignment(js.label, js.ConstInt(0))
+        blocks = {}
+        for block in self.compiled_blocks:
+            blocks[block.compiled_blockid] = block
+        self.reloop_state = []
+        self.emit_relooped_blocks(bldr, [0], blocks)
+        self.reloop_state = None
+        bldr.emit_exit()
+        jssrc = bldr.finish()
+        support.jitRecompile(self.compiled_funcid, jssrc)
+
+    def emit_side_return(self, bldr):
+        # Any request to re-enter is handled by the main function.
+        bldr.emit_exit()
 
 
 class CompiledLoopTokenASMJS(CompiledLoopToken):
@@ -553,7 +798,12 @@ class CompiledLoopTokenASMJS(CompiledLoopToken):
         CompiledLoopToken.__del__(self)
         lltype.free(self.invalidation, flavor="raw")
 
-    def add_code_to_loop(self, operations, inputargs, intoken=None):
+    def add_code_to_loop(self, operations, inputargs, intoken=None,
+                         func=None):
+        # The new blocks normally go into our own function, but a bridge
+        # may instead be placed into a separately-compiled side function.
+        if func is None:
+            func = self.func
         # Re-write to use lower-level GC operations,
         # and record any inlined GC refs to the CLT.
         gcrefs = self.inlined_gcrefs
@@ -580,12 +830,12 @@ class CompiledLoopTokenASMJS(CompiledLoopToken):
                 # NB: if the first op is a label, this makes an empty block.
                 # That's OK for now; it might do some arg shuffling etc.
                 new_block = CompiledBlockASMJS(
-                    self, len(self.func.compiled_blocks),
+                    self, len(func.compiled_blocks),
                     operations[start_op:i], intoken, inputargs,
-                    guardtokens, labeldescr, op.getarglist(),
+                    guardtokens, labeldescr, op.getarglist(), func,
                 )
                 self.compiled_blocks.append(new_block)
-                self.func.compiled_blocks.append(new_block)
+                func.compiled_blocks.append(new_block)
                 # Start a new block from this label.
                 start_op = i
                 intoken = labeldescr
@@ -600,15 +850,28 @@ class CompiledLoopTokenASMJS(CompiledLoopToken):
                 outtoken = None
                 outputargs = []
             new_block = CompiledBlockASMJS(
-                self, len(self.func.compiled_blocks), operations[start_op:],
-                intoken, inputargs, guardtokens, outtoken, outputargs
+                self, len(func.compiled_blocks), operations[start_op:],
+                intoken, inputargs, guardtokens, outtoken, outputargs, func
             )
             self.compiled_blocks.append(new_block)
-            self.func.compiled_blocks.append(new_block)
+            func.compiled_blocks.append(new_block)
         # Generate the new code.
         for i in xrange(first_new_block, len(self.compiled_blocks)):
             self.compiled_blocks[i].generate_code()
 
+    def get_source_length(self):
+        """Total length of the asmjs source generated for this loop.
+
+        This counts the static fragments of all our blocks, including those
+        of bridges living in side functions, but not the per-reassembly
+        dispatch code that surrounds them.
+        """
+        size = 0
+        for block in self.compiled_blocks:
+            for fragment in block.compiled_fragments:
+                size += len(fragment.source)
+        return size
+
     def invalidate_loop(self):
         self.invalidation.counter += 1
 
@@ -640,9 +903,13 @@ class CompiledLoopTokenASMJS(CompiledLoopToken):
 class CompiledBlockASMJS(object):
 
     def __init__(self, clt, compiled_blockid, operations,
-                 intoken, inputargs, guardtokens, outtoken, outputargs):
+                 intoken, inputargs, guardtokens, outtoken, outputargs,
+                 func=None):
         self.clt = clt
         self.cpu = clt.cpu
+        if func is None:
+            func = clt.func
+        self.func = func
         self.compiled_blockid = compiled_blockid
         self.intoken = intoken
         self.guardtokens = guardtokens
@@ -715,6 +982,9 @@ class CompiledBlockASMJS(object):
         self.compiled_fragments = []
         self.compiled_descrs = []
 
+        # Slots allocated for linking guards to side-compiled bridges.
+        self.allocated_funcslots = []
+
         # Prepare the information we need for code generation.
         self.bldr = ASMJSBuilder(self.cpu)
         self.inputargs = inputargs
@@ -732,6 +1002,8 @@ class CompiledBlockASMJS(object):
     def free(self):
         for gcmap in self.allocated_gcmaps:
             lltype.free(gcmap, flavor="raw")
+        for funcslot in self.allocated_funcslots:
+            lltype.free(funcslot, flavor="raw")
 
     def allocate_gcmap(self, offset):
         length = offset // WORD
@@ -764,13 +1036,15 @@ class CompiledBlockASMJS(object):
     # These are called each time the loop is re-assembled, and must not
     # use any references to artifacts from the trace (e.g. boxes).
 
-    def emit_load_arguments(self, bldr):
+    def emit_load_arguments(self, bldr, inputlocs=None):
         bldr.emit_comment("LOAD INPUT ARGS FOR %d" % (self.compiled_blockid,))
+        if inputlocs is None:
+            inputlocs = self.inputlocs
         inputvars = self._get_inputvars_from_kinds(self.inputkinds, bldr)
         for i in xrange(len(self.inputkinds)):
             kind = self.inputkinds[i]
             if kind != HOLE:
-                pos = self.inputlocs[i]
+                pos = inputlocs[i]
                 typ = js.HeapType.from_kind(kind)
                 bldr.emit_load(inputvars[i], js.FrameSlotAddr(pos), typ)
                 # XXX TODO: this is a hack to trick tests into passing.
@@ -795,8 +1069,34 @@ class CompiledBlockASMJS(object):
         bldr.emit_fragment(self.compiled_fragments[-1])
 
     def emit_jump_body(self, bldr, descr):
-        assert descr._asmjs_block.clt.func is self.clt.func
-        self.clt.func.emit_jump(bldr, descr._asmjs_block.compiled_blockid)
+        target_block = descr._asmjs_block
+        if target_block.func is self.func:
+            self.func.emit_jump(bldr, target_block.compiled_blockid)
+        else:
+            self.emit_reenter_jump(bldr, target_block)
+
+    def emit_reenter_jump(self, bldr, target_block):
+        # Jump from a side function back into its main function.
+        # We can't call it directly without growing the stack on every
+        # iteration, so spill the args and ask it to re-enter for us.
+        main_func = target_block.func
+        if SANITYCHECK:
+            assert isinstance(self.func, CompiledSideFuncASMJS)
+            assert self.func.main_func is main_func
+        bldr.emit_comment("REENTER MAIN FUNCTION")
+        inputkinds = target_block.inputkinds
+        inputvars = self._get_inputvars_from_kinds(inputkinds, bldr)
+        for i in xrange(len(inputkinds)):
+            kind = inputkinds[i]
+            if kind != HOLE:
+                pos = target_block.inputlocs[i]
+                typ = js.HeapType.from_kind(kind)
+                bldr.emit_store(inputvars[i], js.FrameSlotAddr(pos), typ)
+        self.emit_store_gcmap(bldr, target_block.initial_gcmap)
+        entry_label = js.ConstInt(main_func.get_entry_label(target_block))
+        reenter_addr = funcslot_addr(self.cpu, main_func.reenter)
+        bldr.emit_store(entry_label, reenter_addr, js.Int32)
+        bldr.emit_exit()
 
     def emit_guard_body(self, bldr, faildescr):
         faillocs = faildescr._asmjs_faillocs
@@ -805,22 +1105,10 @@ class CompiledBlockASMJS(object):
         # If the guard has been compiled into a bridge, emit a local
         # jump to the appropriate label.  Otherwise, spill to frame.
         target_block = faildescr._asmjs_block
-        if target_block is not None:
+        if target_block is not None and target_block.func is self.func:
             bldr.emit_comment("JUMP TO BRIDGED GUARD")
-            self.clt.func.emit_jump(bldr, target_block.compiled_blockid)
+            self.func.emit_jump(bldr, target_block.compiled_blockid)
         else:
-            # If there might be an exception, capture it to the frame.
-            if faildescr._asmjs_hasexc:
-                bldr.emit_comment("PRESERVE EXCEPTION INFO")
-                pos_exctyp = js.ConstInt(self.cpu.pos_exception())
-                pos_excval = js.ConstInt(self.cpu.pos_exc_value())
-                exctyp = js.HeapData(js.Int32, pos_exctyp)
-                excval = js.HeapData(js.Int32, pos_excval)
-                with bldr.emit_if_block(exctyp):
-                    addr = js.FrameGuardExcAddr()
-                    bldr.emit_store(excval, addr, js.Int32)
-                    bldr.emit_store(js.zero, pos_exctyp, js.Int32)
-                    bldr.emit_store(js.zero, pos_excval, js.Int32)
             # Call guard failure helper, creating code for it if necessary.
             # The code is uniquely identified by failkinds.
             # XXX TODO: this whole "helper func" thing needs a good refactor.
@@ -867,6 +1155,31 @@ class CompiledBlockASMJS(object):
                     descr_var = hb.allocate_intvar(0)
                     hb.emit_store(descr_var, js.FrameDescrAddr(), js.Int32)
             bldr.emit_call_helper_func(helper_name, helper_args)
+            # If a bridge has been compiled into a side function, then
+            # its funcid will be in the guard's slot.  Invoke it to take
+            # over from the spilled failargs.
+            if self.cpu.partition_bridges:
+                slotaddr = funcslot_addr(self.cpu, faildescr._asmjs_sideslot)
+                sideid = js.HeapData(js.Int32, slotaddr)
+                with ctx_temp_intvar(bldr, sideid) as sideid:
+                    with bldr.emit_if_block(sideid):
+                        bldr.emit_comment("INVOKE SIDE-COMPILED BRIDGE")
+                        callargs = [sideid, js.frame, js.tladdr, js.zero]
+                        call = js.CallFunc("jitInvoke", callargs)
+                        bldr.emit_assignment(js.frame, call)
+                        self.func.emit_side_return(bldr)
+            # If there might be an exception, capture it to the frame.
+            if faildescr._asmjs_hasexc:
+                bldr.emit_comment("PRESERVE EXCEPTION INFO")
+                pos_exctyp = js.ConstInt(self.cpu.pos_exception())
+                pos_excval = js.ConstInt(self.cpu.pos_exc_value())
+                exctyp = js.HeapData(js.Int32, pos_exctyp)
+                excval = js.HeapData(js.Int32, pos_excval)
+                with bldr.emit_if_block(exctyp):
+                    addr = js.FrameGuardExcAddr()
+                    bldr.emit_store(excval, addr, js.Int32)
+                    bldr.emit_store(js.zero, pos_exctyp, js.Int32)
+                    bldr.emit_store(js.zero, pos_excval, js.Int32)
             # Bail back to the interpreter to deal with the failure.
             bldr.emit_exit()
 
@@ -2307,6 +2620,10 @@ class CompiledBlockASMJS(object):
         descr._asmjs_faillocs = faillocs
         descr._asmjs_hasexc = self._guard_might_have_exception(op)
         descr._asmjs_gcmap = gcmap
+        if self.cpu.partition_bridges:
+            funcslot = allocate_funcslot()
+            self.allocated_funcslots.append(funcslot)
+            descr._asmjs_sideslot = funcslot
         return descr
 
     def _guard_might_have_exception(self, op):
@@ -11,7 +11,9 @@ from rpython.jit.backend.asmjs.assembler import (AssemblerASMJS,
                                                  CompiledLoopTokenASMJS)
 from rpython.jit.backend.asmjs.arch import (WORD,
                                             SANITYCHECK,
-                                            JITFRAME_FIXED_SIZE)
+                                            JITFRAME_FIXED_SIZE,
+                                            PARTITION_BRIDGES,
+                                            CONSOLIDATE_THRESHOLD)
 
 
 class CPU_ASMJS(AbstractLLCPU):
@@ -31,6 +33,8 @@ class CPU_ASMJS(AbstractLLCPU):
     supports_longlong = False
     with_threads = False
     backend_name = "asmjs"
+    partition_bridges = PARTITION_BRIDGES
+    consolidate_threshold = CONSOLIDATE_THRESHOLD
 
     def __init__(self, rtyper, stats, opts=None, translate_support_code=False,
                  gcdescr=None):
@@ -129,6 +133,9 @@ class CPU_ASMJS(AbstractLLCPU):
         AbstractLLCPU.free_loop_and_bridges(self, compiled_loop_token)
         self.assembler.free_loop_and_bridges(compiled_loop_token)
 
+    def get_code_size(self, compiled_loop_token):
+        return self.assembler.get_code_size(compiled_loop_token)
+
     def cast_ptr_to_int(x):
         adr = llmemory.cast_ptr_to_adr(x)
         return CPU_ASMJS.cast_adr_to_int(adr)
@@ -291,3 +291,143 @@ class TestASMJSRunner(LLtypeBackendTest):
                         assert result == expected
                     else:
                         assert result != expected
+
+    def _compile_loop_for_bridge_chain(self):
+        # A loop counting up from its input, which exits at 10.
+        i0 = BoxInt()
+        i1 = BoxInt()
+        i2 = BoxInt()
+        faildescr = BasicFailDescr(1)
+        looptoken = JitCellToken()
+        targettoken = TargetToken()
+        operations = [
+            ResOperation(rop.LABEL, [i0], None, descr=targettoken),
+            ResOperation(rop.INT_ADD, [i0, ConstInt(1)], i1),
+            ResOperation(rop.INT_LE, [i1, ConstInt(9)], i2),
+            ResOperation(rop.GUARD_TRUE, [i2], None, descr=faildescr),
+            ResOperation(rop.JUMP, [i1], None, descr=targettoken),
+            ]
+        operations[3].setfailargs([i1])
+        self.cpu.compile_loop([i0], operations, looptoken)
+        return looptoken, targettoken, faildescr
+
+    def _compile_next_bridge_in_chain(self, looptoken, targettoken,
+                                      faildescr):
+        # Each bridge in the chain lets the loop run another ten
+        # iterations, and has its own guard for the next bridge.
+        n = faildescr.identifier
+        i1 = BoxInt()
+        i2 = BoxInt()
+        next_faildescr = BasicFailDescr(n + 1)
+        bridge = [
+            ResOperation(rop.INT_LE, [i1, ConstInt(10 * (n + 1) - 1)], i2),
+            ResOperation(rop.GUARD_TRUE, [i2], None, descr=next_faildescr),
+            ResOperation(rop.JUMP, [i1], None, descr=targettoken),
+        ]
+        bridge[1].setfailargs([i1])
+        self.cpu.compile_bridge(faildescr, [i1], bridge, looptoken)
+        return next_faildescr
+
+    def _check_bridge_chain(self, looptoken, num_bridges):
+        deadframe = self.cpu.execute_token(looptoken, 2)
+        fail = self.cpu.get_latest_descr(deadframe)
+        assert fail.identifier == num_bridges + 1
+        res = self.cpu.get_int_value(deadframe, 0)
+        assert res == 10 * (num_bridges + 1)
+
+    def test_compile_bridge_chain(self):
+        looptoken, targettoken, faildescr = \
+            self._compile_loop_for_bridge_chain()
+        for i in range(5):
+            faildescr = self._compile_next_bridge_in_chain(looptoken,
+                                                           targettoken,
+                                                           faildescr)
+            self._check_bridge_chain(looptoken, i + 1)
+        func = looptoken.compiled_loop_token.func
+        if not self.cpu.partition_bridges:
+            assert func.side_funcs == []
+            assert func.num_side_blocks == 0
+
+    def test_bridge_chain_uses_side_funcs(self):
+        looptoken, targettoken, faildescr = \
+            self._compile_loop_for_bridge_chain()
+        func = looptoken.compiled_loop_token.func
+        num_blocks = len(func.compiled_blocks)
+        for i in range(3):
+            faildescr = self._compile_next_bridge_in_chain(looptoken,
+                                                           targettoken,
+                                                           faildescr)
+        self._check_bridge_chain(looptoken, 3)
+        # The main function was not touched by the bridges.
+        assert len(func.compiled_blocks) == num_blocks
+        assert len(func.side_funcs) == 3
+        num_side_blocks = 0
+        for side_func in func.side_funcs:
+            assert side_func.main_func is func
+            assert side_func.faildescr._asmjs_sideslot.value != 0
+            num_side_blocks += len(side_func.compiled_blocks)
+        assert func.num_side_blocks == num_side_blocks
+
+    def test_bridge_chain_is_consolidated(self):
+        looptoken, targettoken, faildescr = \
+            self._compile_loop_for_bridge_chain()
+        func = looptoken.compiled_loop_token.func
+        num_blocks = len(func.compiled_blocks)
+        threshold = self.cpu.consolidate_threshold
+        num_bridges = 0
+        while func.side_funcs or num_bridges == 0:
+            assert func.num_side_blocks < threshold
+            assert num_bridges < threshold
+            faildescr = self._compile_next_bridge_in_chain(looptoken,
+                                                           targettoken,
+                                                           faildescr)
+            num_bridges += 1
+        # All the side functions have been folded into the main function.
+        assert func.num_side_blocks == 0
+        assert len(func.compiled_blocks) >= num_blocks + num_bridges
+        self._check_bridge_chain(looptoken, num_bridges)
+        # Further bridges go back into side functions.
+        faildescr = self._compile_next_bridge_in_chain(looptoken,
+                                                       targettoken,
+                                                       faildescr)
+        assert len(func.side_funcs) == 1
+        self._check_bridge_chain(looptoken, num_bridges + 1)
+
+    def test_consolidate_threshold(self):
+        self.cpu.consolidate_threshold = 2
+        looptoken, targettoken, faildescr = \
+            self._compile_loop_for_bridge_chain()
+        func = looptoken.compiled_loop_token.func
+        num_blocks = len(func.compiled_blocks)
+        faildescr = self._compile_next_bridge_in_chain(looptoken, targettoken,
+                                                       faildescr)
+        assert len(func.side_funcs) == 1
+        # Side functions are only consolidated once they are at least
+        # as big as the main function.
+        num_bridges = 1
+        while func.side_funcs:
+            assert num_bridges < num_blocks + 2
+            faildescr = self._compile_next_bridge_in_chain(looptoken,
+                                                           targettoken,
+                                                           faildescr)
+            num_bridges += 1
+        assert num_bridges >= 2
+        self._check_bridge_chain(looptoken, num_bridges)
+
+
+class TestASMJSRunnerUnpartitioned(TestASMJSRunner):
+    """Run the same tests with every bridge relooped into its loop."""
+
+    def get_cpu(self):
+        cpu = TestASMJSRunner.get_cpu(self)
+        cpu.partition_bridges = False
+        return cpu
+
+    def test_bridge_chain_uses_side_funcs(self):
+        py.test.skip("bridges are not partitioned")
+
+    def test_bridge_chain_is_consolidated(self):
+        py.test.skip("bridges are not partitioned")
+
+    def test_consolidate_threshold(self):
+        py.test.skip("bridges are not partitioned")
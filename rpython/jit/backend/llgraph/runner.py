@@ -232,6 +232,7 @@ class LLGraphCPU(model.AbstractCPU):
     supports_floats = True
     supports_longlong = r_uint is not r_ulonglong
     supports_singlefloats = True
+    vector_extension = True
     translate_support_code = False
     is_llgraph = True
 
@@ -291,6 +292,13 @@ class LLGraphCPU(model.AbstractCPU):
         compiled_loop_token._llgraph_loop = None
         model.AbstractCPU.free_loop_and_bridges(self, compiled_loop_token)
 
+    def get_code_size(self, compiled_loop_token):
+        # there is no machine code here, so count one byte per operation
+        size = 0
+        for trace in compiled_loop_token._llgraph_alltraces:
+            size += len(trace.operations)
+        return size
+
     def make_execute_token(self, *argtypes):
         return self._execute_token
 
@@ -854,6 +862,15 @@ class LLFrame(object):
         if self.lltrace.invalid:
             self.fail_guard(descr)
 
+    def execute_int_sub(self, _, x, y):
+        # raw addresses are symbolic here; the vectorizer subtracts two of
+        # them to check if the arrays overlap, which needs the real values
+        if isinstance(x, llmemory.AddressAsInt):
+            x = rffi.cast(lltype.Signed, rffi.cast(rffi.CCHARP, x))
+        if isinstance(y, llmemory.AddressAsInt):
+            y = rffi.cast(lltype.Signed, rffi.cast(rffi.CCHARP, y))
+        return x - y
+
     def execute_int_add_ovf(self, _, x, y):
         try:
             z = ovfcheck(x + y)
@@ -1041,6 +1058,42 @@ class LLFrame(object):
     def execute_keepalive(self, descr, x):
         pass
 
+    def _execute_vec_raw_float(self, descr, args, func):
+        # the vector operations are simulated one lane after the other:
+        # all lanes are loaded before any of them is stored
+        argboxes = self.current_op.getarglist()
+        operands = []
+        i = 2
+        while i < len(args):
+            if argboxes[i].type == FLOAT:
+                x = longlong.getrealfloat(args[i])
+                operands.append((x, x))
+                i += 1
+            else:
+                lanes = (self.cpu.bh_raw_load_f(args[i], args[i + 1], descr),
+                         self.cpu.bh_raw_load_f(args[i], args[i + 1] + 8,
+                                                descr))
+                operands.append((longlong.getrealfloat(lanes[0]),
+                                 longlong.getrealfloat(lanes[1])))
+                i += 2
+        assert len(operands) == 2
+        for lane in range(2):
+            res = func(operands[0][lane], operands[1][lane])
+            self.cpu.bh_raw_store_f(args[0], args[1] + 8 * lane,
+                                    longlong.getfloatstorage(res), descr)
+
+    def execute_vec_raw_float_add(self, descr, *args):
+        self._execute_vec_raw_float(descr, args, lambda x, y: x + y)
+
+    def execute_vec_raw_float_sub(self, descr, *args):
+        self._execute_vec_raw_float(descr, args, lambda x, y: x - y)
+
+    def execute_vec_raw_float_mul(self, descr, *args):
+        self._execute_vec_raw_float(descr, args, lambda x, y: x * y)
+
+    def execute_vec_raw_float_truediv(self, descr, *args):
+        self._execute_vec_raw_float(descr, args, lambda x, y: x / y)
+
 
 def _getdescr(op):
     d = op.getdescr()
@@ -213,6 +213,14 @@ class AbstractLLCPU(AbstractCPU):
                 self.gc_ll_descr.freeing_block(rawstart, rawstop)
                 self.asmmemmgr.free(rawstart, rawstop)
 
+    def get_code_size(self, compiled_loop_token):
+        blocks = compiled_loop_token.asmmemmgr_blocks
+        size = 0
+        if blocks is not None:
+            for rawstart, rawstop in blocks:
+                size += rawstop - rawstart
+        return size
+
     def force(self, addr_of_force_token):
         frame = rffi.cast(jitframe.JITFRAMEPTR, addr_of_force_token)
         frame = frame.resolve()
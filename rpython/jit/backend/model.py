@@ -7,6 +7,8 @@ class CPUTotalTracker(object):
     total_compiled_bridges = 0
     total_freed_loops = 0
     total_freed_bridges = 0
+    total_evicted_loops = 0
+    total_code_size = 0
 
     # for heaptracker
     # _all_size_descrs_with_vtable = None
@@ -19,6 +21,11 @@ class AbstractCPU(object):
     # longlongs are supported by the JIT, but stored as doubles.
     # Boxes and Consts are BoxFloats and ConstFloats.
     supports_singlefloats = False
+    vector_extension = False
+    # ^^^ True if the backend implements the VEC_RAW_FLOAT_xxx operations
+    # that the 'vec' optimization emits.
+    supports_loop_runs = False
+    # ^^^ True if get_all_loop_runs() is implemented.
 
     propagate_exception_descr = None
 
@@ -159,6 +166,14 @@ class AbstractCPU(object):
         """
         pass
 
+    def get_code_size(self, compiled_loop_token):
+        """Return the number of bytes of generated code currently held
+        by a loop and all bridges attached to it.  Used by the memory
+        manager to decide which loops to free when the total size goes
+        above the 'loop_memory_budget' parameter.
+        """
+        return 0
+
     def sizeof(self, S):
         raise NotImplementedError
 
@@ -287,6 +302,7 @@ class AbstractCPU(object):
 class CompiledLoopToken(object):
     asmmemmgr_blocks = None
     asmmemmgr_gcroots = 0
+    code_size = 0
 
     def __init__(self, cpu, number):
         cpu.tracker.total_compiled_loops += 1
@@ -308,6 +324,14 @@ class CompiledLoopToken(object):
         debug_print("allocating Bridge #", self.bridges_count, "of Loop #", self.number)
         debug_stop("jit-mem-looptoken-alloc")
 
+    def update_code_size(self):
+        """Ask the backend how much code this loop now holds, and update
+        the total on the tracker.  Called after the loop or one of its
+        bridges is compiled."""
+        size = self.cpu.get_code_size(self)
+        self.cpu.tracker.total_code_size += size - self.code_size
+        self.code_size = size
+
     def update_frame_info(self, oldlooptoken, baseofs):
         new_fi = self.frame_info
         new_loop_tokens = []
@@ -330,4 +354,5 @@ class CompiledLoopToken(object):
         self.cpu.free_loop_and_bridges(self)
         self.cpu.tracker.total_freed_loops += 1
         self.cpu.tracker.total_freed_bridges += self.bridges_count
+        self.cpu.tracker.total_code_size -= self.code_size
         #debug_stop("jit-mem-looptoken-free")
@@ -4533,6 +4533,42 @@ class LLtypeBackendTest(BaseBackendTest):
             assert result == rffi.cast(T, value)
             rawstorage.free_raw_storage(p)
 
+    def test_vec_raw_float_ops(self):
+        if not self.cpu.vector_extension:
+            py.test.skip("requires vector_extension")
+        from rpython.rlib import rawstorage
+        arraydescr = self.cpu.arraydescrof(rffi.CArray(rffi.DOUBLE))
+        for opname, func in [('add', lambda x, y: x + y),
+                             ('sub', lambda x, y: x - y),
+                             ('mul', lambda x, y: x * y),
+                             ('truediv', lambda x, y: x / y)]:
+            # the offsets are not 16-bytes aligned on purpose
+            ops = """
+            [i0, f1]
+            vec_raw_float_%s(i0, 56, i0, 8, i0, 24, descr=arraydescr)
+            vec_raw_float_%s(i0, 72, i0, 8, f1, descr=arraydescr)
+            vec_raw_float_%s(i0, 88, f1, i0, 24, descr=arraydescr)
+            finish()
+            """ % (opname, opname, opname)
+            p = rawstorage.alloc_raw_storage(104)
+            for i in range(13):
+                rawstorage.raw_storage_setitem(p, i * 8, i * 1.5 + 0.25)
+            loop = parse(ops, self.cpu, namespace=locals())
+            looptoken = JitCellToken()
+            self.cpu.compile_loop(loop.inputargs, loop.operations, looptoken)
+            self.cpu.execute_token(looptoken, rffi.cast(lltype.Signed, p),
+                                   longlong.getfloatstorage(-3.5))
+            for lane in range(2):
+                x = (1 + lane) * 1.5 + 0.25
+                y = (3 + lane) * 1.5 + 0.25
+                def get(i):
+                    return rawstorage.raw_storage_getitem(rffi.DOUBLE, p,
+                                                          i * 8)
+                assert get(7 + lane) == func(x, y)
+                assert get(9 + lane) == func(x, -3.5)
+                assert get(11 + lane) == func(-3.5, y)
+            rawstorage.free_raw_storage(p)
+
     def test_raw_store_singlefloat(self):
         if not self.cpu.supports_singlefloats:
             py.test.skip("requires singlefloats")
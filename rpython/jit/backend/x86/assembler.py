@@ -1530,6 +1530,36 @@ class Assembler386(BaseAssembler):
         dest_addr = AddressLoc(base_loc, ofs_loc, 0, baseofs.value)
         self.save_into_mem(dest_addr, value_loc, size_loc)
 
+    def _vec_raw_float_operand(self, op, arglocs, i, baseofs, targetloc):
+        # load into 'targetloc' the operand that starts at argument 'i',
+        # and return the index of the following argument
+        if op.getarg(i).type == FLOAT:
+            self.mc.MOVSD(targetloc, arglocs[i])
+            self.mc.UNPCKLPD(targetloc, targetloc)
+            return i + 1
+        src_addr = AddressLoc(arglocs[i], arglocs[i + 1], 0, baseofs)
+        self.mc.MOVUPD(targetloc, src_addr)
+        return i + 2
+
+    def _genop_vec_raw_float(asmop):
+        def genop_discard_vec(self, op, arglocs):
+            tmploc1, tmploc2, baseofs = arglocs[0], arglocs[1], arglocs[2]
+            assert isinstance(baseofs, ImmedLoc)
+            arglocs = arglocs[3:]
+            i = self._vec_raw_float_operand(op, arglocs, 2, baseofs.value,
+                                            tmploc1)
+            self._vec_raw_float_operand(op, arglocs, i, baseofs.value,
+                                        tmploc2)
+            getattr(self.mc, asmop)(tmploc1, tmploc2)
+            dest_addr = AddressLoc(arglocs[0], arglocs[1], 0, baseofs.value)
+            self.mc.MOVUPD(dest_addr, tmploc1)
+        return genop_discard_vec
+
+    genop_discard_vec_raw_float_add = _genop_vec_raw_float('ADDPD')
+    genop_discard_vec_raw_float_sub = _genop_vec_raw_float('SUBPD')
+    genop_discard_vec_raw_float_mul = _genop_vec_raw_float('MULPD')
+    genop_discard_vec_raw_float_truediv = _genop_vec_raw_float('DIVPD')
+
     def genop_discard_strsetitem(self, op, arglocs):
         base_loc, ofs_loc, val_loc = arglocs
         basesize, itemsize, ofs_length = symbolic.get_array_token(rstr.STR,
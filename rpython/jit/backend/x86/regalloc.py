@@ -1016,6 +1016,27 @@ class RegAlloc(BaseRegalloc):
     consider_setarrayitem_raw = consider_setarrayitem_gc
     consider_raw_store = consider_setarrayitem_gc
 
+    def consider_vec_raw_float_add(self, op):
+        _, ofs, _ = unpack_arraydescr(op.getdescr())
+        args = op.getarglist()
+        arglocs = []
+        for arg in args:
+            if arg.type == FLOAT:
+                arglocs.append(self.xrm.make_sure_var_in_reg(arg, args))
+            else:
+                arglocs.append(self.rm.make_sure_var_in_reg(arg, args))
+        tmpxvar1 = TempBox()
+        tmploc1 = self.xrm.force_allocate_reg(tmpxvar1, args)
+        tmpxvar2 = TempBox()
+        tmploc2 = self.xrm.force_allocate_reg(tmpxvar2, args + [tmpxvar1])
+        self.xrm.possibly_free_var(tmpxvar1)
+        self.xrm.possibly_free_var(tmpxvar2)
+        self.perform_discard(op, [tmploc1, tmploc2, imm(ofs)] + arglocs)
+
+    consider_vec_raw_float_sub = consider_vec_raw_float_add
+    consider_vec_raw_float_mul = consider_vec_raw_float_add
+    consider_vec_raw_float_truediv = consider_vec_raw_float_add
+
     def consider_getfield_gc(self, op):
         ofs, size, sign = unpack_fielddescr(op.getdescr())
         ofs_loc = imm(ofs)
@@ -656,8 +656,13 @@ class LocationCodeBuilder(object):
 
     MOVSD = _binaryop('MOVSD')
     MOVAPD = _binaryop('MOVAPD')
+    MOVUPD = _binaryop('MOVUPD')
     ADDSD = _binaryop('ADDSD')
     ADDPD = _binaryop('ADDPD')
+    SUBPD = _binaryop('SUBPD')
+    MULPD = _binaryop('MULPD')
+    DIVPD = _binaryop('DIVPD')
+    UNPCKLPD = _binaryop('UNPCKLPD')
     SUBSD = _binaryop('SUBSD')
     MULSD = _binaryop('MULSD')
     DIVSD = _binaryop('DIVSD')
@@ -19,6 +19,7 @@ class AbstractX86CPU(AbstractLLCPU):
     debug = True
     supports_floats = True
     supports_singlefloats = True
+    supports_loop_runs = True
 
     dont_keepalive_stuff = False # for tests
     with_threads = False
@@ -162,5 +163,6 @@ class CPU_X86_64(AbstractX86CPU):
     CALLEE_SAVE_REGISTERS = [regloc.ebx, regloc.r12, regloc.r13, regloc.r14, regloc.r15]
 
     IS_64_BIT = True
+    vector_extension = True
 
 CPU = CPU386
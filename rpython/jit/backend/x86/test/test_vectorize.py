@@ -0,0 +1,12 @@
+import py
+from rpython.jit.backend.x86.test.test_basic import Jit386Mixin
+from rpython.jit.metainterp.test.test_vectorize import VectorizeTests
+
+
+class TestVectorize(Jit386Mixin, VectorizeTests):
+    # for the individual tests see
+    # ====> ../../../metainterp/test/test_vectorize.py
+
+    def setup_class(cls):
+        if not cls.CPUClass.vector_extension:
+            py.test.skip("no vector_extension on this CPU")
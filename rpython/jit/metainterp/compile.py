@@ -1,4 +1,4 @@
-import weakref
+import weakref, time
 from rpython.rtyper.lltypesystem import lltype, llmemory
 from rpython.rtyper.annlowlevel import cast_instance_to_gcref
 from rpython.rlib.objectmodel import we_are_translated
@@ -42,9 +42,13 @@ def show_procedures(metainterp_sd, procedure=None, error=None):
                                  metainterp_sd=metainterp_sd)
 
 def create_empty_loop(metainterp, name_prefix=''):
-    name = metainterp.staticdata.stats.name_for_new_loop()
+    return _create_empty_loop(metainterp.staticdata,
+                              metainterp.call_pure_results, name_prefix)
+
+def _create_empty_loop(metainterp_sd, call_pure_results, name_prefix=''):
+    name = metainterp_sd.stats.name_for_new_loop()
     loop = TreeLoop(name_prefix + name)
-    loop.call_pure_results = metainterp.call_pure_results
+    loop.call_pure_results = call_pure_results
     return loop
 
 
@@ -110,12 +114,23 @@ def compile_loop(metainterp, greenkey, start,
     """Try to compile a new procedure by closing the current history back
     to the first operation.
     """
+    return compile_loop_from_trace(metainterp.staticdata,
+                                   metainterp.jitdriver_sd,
+                                   metainterp.history.operations,
+                                   metainterp.call_pure_results,
+                                   greenkey, start, inputargs, jumpargs,
+                                   try_disabling_unroll,
+                                   metainterp.get_tracing_time())
+
+def compile_loop_from_trace(metainterp_sd, jitdriver_sd, h_ops,
+                            call_pure_results, greenkey, start,
+                            inputargs, jumpargs, try_disabling_unroll=False,
+                            tracing_time=0.0):
+    """Like compile_loop(), but only needs the recorded operations instead
+    of a whole MetaInterp; used to compile PendingLoops.
+    """
     from rpython.jit.metainterp.optimizeopt import optimize_trace
 
-    metainterp_sd = metainterp.staticdata
-    jitdriver_sd = metainterp.jitdriver_sd
-    history = metainterp.history
-
     enable_opts = jitdriver_sd.warmstate.enable_opts
     if try_disabling_unroll:
         if 'unroll' not in enable_opts:
@@ -124,14 +139,14 @@ def compile_loop(metainterp, greenkey, start,
         del enable_opts['unroll']
 
     jitcell_token = make_jitcell_token(jitdriver_sd)
-    part = create_empty_loop(metainterp)
+    part = _create_empty_loop(metainterp_sd, call_pure_results)
     part.inputargs = inputargs[:]
-    h_ops = history.operations
     label = ResOperation(rop.LABEL, inputargs, None,
                          descr=TargetToken(jitcell_token))
     end_label = ResOperation(rop.LABEL, jumpargs, None, descr=jitcell_token)
     part.operations = [label] + h_ops[start:] + [end_label]
 
+    t0 = time.time()
     try:
         start_state = optimize_trace(metainterp_sd, jitdriver_sd, part,
                                      enable_opts, export_state=True)
@@ -141,7 +156,7 @@ def compile_loop(metainterp, greenkey, start,
     assert isinstance(target_token, TargetToken)
     all_target_tokens = [target_token]
 
-    loop = create_empty_loop(metainterp)
+    loop = _create_empty_loop(metainterp_sd, call_pure_results)
     loop.inputargs = part.inputargs
     loop.operations = part.operations
     loop.quasi_immutable_deps = {}
@@ -175,6 +190,8 @@ def compile_loop(metainterp, greenkey, start,
         loop.quasi_immutable_deps = None
     for box in loop.inputargs:
         assert isinstance(box, Box)
+    loop.tracing_time = tracing_time
+    loop.optimizing_time = time.time() - t0
 
     loop.original_jitcell_token = jitcell_token
     for label in all_target_tokens:
@@ -187,6 +204,29 @@ def compile_loop(metainterp, greenkey, start,
     record_loop_or_bridge(metainterp_sd, loop)
     return all_target_tokens[0]
 
+class PendingLoop(object):
+    """A loop that was traced, but whose optimization and assembly was
+    deferred (see the 'defer_compilation' parameter).  It keeps only what
+    compile_loop_from_trace() needs.
+    """
+    def __init__(self, metainterp, greenkey, start, inputargs, jumpargs):
+        self.tracing_time = metainterp.get_tracing_time()
+        self.jitdriver_sd = metainterp.jitdriver_sd
+        self.operations = metainterp.history.operations
+        self.call_pure_results = metainterp.call_pure_results
+        self.greenkey = greenkey
+        self.start = start
+        self.inputargs = inputargs
+        self.jumpargs = jumpargs
+
+    def compile(self, metainterp_sd):
+        return compile_loop_from_trace(metainterp_sd, self.jitdriver_sd,
+                                       self.operations,
+                                       self.call_pure_results,
+                                       self.greenkey, self.start,
+                                       self.inputargs, self.jumpargs,
+                                       tracing_time=self.tracing_time)
+
 def compile_retrace(metainterp, greenkey, start,
                     inputargs, jumpargs,
                     partial_trace, resumekey, start_state):
@@ -213,6 +253,8 @@ def compile_retrace(metainterp, greenkey, start,
     label = part.operations[0]
     orignial_label = label.clone()
     assert label.getopnum() == rop.LABEL
+    tracing_time = metainterp.get_tracing_time()
+    t0 = time.time()
     try:
         optimize_trace(metainterp_sd, jitdriver_sd, part,
                        jitdriver_sd.warmstate.enable_opts,
@@ -241,6 +283,8 @@ def compile_retrace(metainterp, greenkey, start,
 
     loop = partial_trace
     loop.operations = loop.operations[:-1] + part.operations
+    loop.tracing_time = tracing_time
+    loop.optimizing_time = time.time() - t0
 
     quasi_immutable_deps = {}
     if loop.quasi_immutable_deps:
@@ -338,7 +382,9 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type):
         hooks = metainterp_sd.warmrunnerdesc.hooks
         debug_info = JitDebugInfo(jitdriver_sd, metainterp_sd.logger_ops,
                                   original_jitcell_token, loop.operations,
-                                  type, greenkey)
+                                  type, greenkey,
+                                  tracing_time=loop.tracing_time,
+                                  optimizing_time=loop.optimizing_time)
         hooks.before_compile(debug_info)
     else:
         debug_info = None
@@ -346,6 +392,7 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type):
     operations = get_deep_immutable_oplist(loop.operations)
     metainterp_sd.profiler.start_backend()
     debug_start("jit-backend")
+    t0 = time.time()
     try:
         asminfo = do_compile_loop(metainterp_sd, loop.inputargs,
                                   operations, original_jitcell_token,
@@ -355,6 +402,7 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type):
     metainterp_sd.profiler.end_backend()
     if hooks is not None:
         debug_info.asminfo = asminfo
+        debug_info.backend_time = time.time() - t0
         hooks.after_compile(debug_info)
     metainterp_sd.stats.add_new_loop(loop)
     if not we_are_translated():
@@ -370,10 +418,13 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type):
                                       name=loopname)
     #
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(original_jitcell_token)
+        memmgr = metainterp_sd.warmrunnerdesc.memory_manager
+        memmgr.keep_loop_alive(original_jitcell_token)
+        memmgr.record_code_size(original_jitcell_token)
 
 def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
-                           operations, original_loop_token):
+                           operations, original_loop_token,
+                           tracing_time=0.0, optimizing_time=0.0):
     if not we_are_translated():
         show_procedures(metainterp_sd)
         seen = dict.fromkeys(inputargs)
@@ -382,7 +433,9 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
         hooks = metainterp_sd.warmrunnerdesc.hooks
         debug_info = JitDebugInfo(jitdriver_sd, metainterp_sd.logger_ops,
                                   original_loop_token, operations, 'bridge',
-                                  fail_descr=faildescr)
+                                  fail_descr=faildescr,
+                                  tracing_time=tracing_time,
+                                  optimizing_time=optimizing_time)
         hooks.before_compile_bridge(debug_info)
     else:
         hooks = None
@@ -390,6 +443,7 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     operations = get_deep_immutable_oplist(operations)
     metainterp_sd.profiler.start_backend()
     debug_start("jit-backend")
+    t0 = time.time()
     try:
         asminfo = do_compile_bridge(metainterp_sd, faildescr, inputargs,
                                     operations,
@@ -399,6 +453,7 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     metainterp_sd.profiler.end_backend()
     if hooks is not None:
         debug_info.asminfo = asminfo
+        debug_info.backend_time = time.time() - t0
         hooks.after_compile_bridge(debug_info)
     if not we_are_translated():
         metainterp_sd.stats.compiled()
@@ -414,6 +469,9 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     #if metainterp_sd.warmrunnerdesc is not None:    # for tests
     #    metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(
     #        original_loop_token)
+    if metainterp_sd.warmrunnerdesc is not None:    # for tests
+        metainterp_sd.warmrunnerdesc.memory_manager.record_code_size(
+            original_loop_token)
 
 # ____________________________________________________________
 
@@ -487,9 +545,60 @@ def make_done_loop_tokens():
 class ResumeDescr(AbstractFailDescr):
     _attrs_ = ()
 
+class GuardHistogram(object):
+    """A small table of the values (or classes) with which a guard_value
+    or guard_class failed, and how many times each.  When the table is
+    full, a new value replaces the least frequent one and inherits its
+    count, so that the frequent values stay in the table (the usual
+    "space-saving" approximation).
+    """
+    SIZE = 4
+
+    def __init__(self):
+        self.values = [0] * self.SIZE
+        self.counts = [0] * self.SIZE
+        self.num_values = 0
+        self.num_distinct = 0       # may be more than SIZE
+
+    def record(self, value):
+        """Count one failure with 'value'.  Return its count so far."""
+        for i in range(self.num_values):
+            if self.values[i] == value:
+                self.counts[i] += 1
+                return self.counts[i]
+        self.num_distinct += 1
+        if self.num_values < self.SIZE:
+            i = self.num_values
+            self.num_values = i + 1
+            self.values[i] = value
+            self.counts[i] = 1
+            return 1
+        i = 0
+        for j in range(1, self.SIZE):
+            if self.counts[j] < self.counts[i]:
+                i = j
+        self.values[i] = value
+        self.counts[i] += 1
+        return self.counts[i]
+
+    def is_polymorphic(self):
+        return self.num_distinct > 1
+
+    def get_hottest(self):
+        """Return the list of (value, count) by decreasing count."""
+        result = []
+        for i in range(self.num_values):
+            j = len(result)
+            while j > 0 and result[j - 1][1] < self.counts[i]:
+                j -= 1
+            result.insert(j, (self.values[i], self.counts[i]))
+        return result
+
+
 class ResumeGuardDescr(ResumeDescr):
     _attrs_ = ('rd_numb', 'rd_count', 'rd_consts', 'rd_virtuals',
-               'rd_frame_info_list', 'rd_pendingfields', 'status')
+               'rd_frame_info_list', 'rd_pendingfields', 'status',
+               'histogram')
     
     rd_numb = lltype.nullptr(NUMBERING)
     rd_count = 0
@@ -499,6 +608,7 @@ class ResumeGuardDescr(ResumeDescr):
     rd_pendingfields = lltype.nullptr(PENDINGFIELDSP.TO)
 
     status = r_uint(0)
+    histogram = None     # a GuardHistogram, for guard_value and guard_class
 
     def copy_all_attributes_from(self, other):
         assert isinstance(other, ResumeGuardDescr)
@@ -511,15 +621,17 @@ class ResumeGuardDescr(ResumeDescr):
         # we don't copy status
 
     ST_BUSY_FLAG    = 0x01     # if set, busy tracing from the guard
-    ST_TYPE_MASK    = 0x06     # mask for the type (TY_xxx)
-    ST_SHIFT        = 3        # in "status >> ST_SHIFT" is stored:
+    ST_TYPE_MASK    = 0x0E     # mask for the type (TY_xxx)
+    ST_SHIFT        = 4        # in "status >> ST_SHIFT" is stored:
                                # - if TY_NONE, the jitcounter hash directly
-                               # - otherwise, the guard_value failarg index
+                               # - otherwise, the guard_value or guard_class
+                               #   failarg index
     ST_SHIFT_MASK   = -(1 << ST_SHIFT)
     TY_NONE         = 0x00
     TY_INT          = 0x02
     TY_REF          = 0x04
     TY_FLOAT        = 0x06
+    TY_CLASS        = 0x08     # guard_class: the failarg is the instance
 
     def store_final_boxes(self, guard_op, boxes, metainterp_sd):
         guard_op.setfailargs(boxes)
@@ -531,6 +643,8 @@ class ResumeGuardDescr(ResumeDescr):
             self.status = hash & self.ST_SHIFT_MASK
 
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
+        if metainterp_sd.jitlog.enabled:
+            metainterp_sd.jitlog.guard_failed(self)
         if self.must_compile(deadframe, metainterp_sd, jitdriver_sd):
             self.start_compiling()
             try:
@@ -569,14 +683,23 @@ class ResumeGuardDescr(ResumeDescr):
         elif self.status & self.ST_BUSY_FLAG:
             return False
         #
-        else:    # we have a GUARD_VALUE that fails.
+        else:    # we have a GUARD_VALUE or GUARD_CLASS that fails.
             from rpython.rlib.objectmodel import current_object_addr_as_int
 
             index = intmask(self.status >> self.ST_SHIFT)
             typetag = intmask(self.status & self.ST_TYPE_MASK)
-
-            # fetch the actual value of the guard_value, possibly turning
-            # it to an integer
+            record = metainterp_sd.jitlog.enabled
+
+            if typetag == self.TY_CLASS and not record:
+                # all the classes share the counter of the guard, as for
+                # any guard: the class is only needed for the histogram
+                hash = r_uint(current_object_addr_as_int(self) * 777767777)
+                increment = jitdriver_sd.warmstate.increment_trace_eagerness
+                return jitcounter.tick(hash, increment)
+
+            # fetch the actual value of the guard_value, or the class of
+            # the instance of the guard_class, possibly turning it to an
+            # integer
             if typetag == self.TY_INT:
                 intval = metainterp_sd.cpu.get_int_value(deadframe, index)
             elif typetag == self.TY_REF:
@@ -585,6 +708,13 @@ class ResumeGuardDescr(ResumeDescr):
             elif typetag == self.TY_FLOAT:
                 floatval = metainterp_sd.cpu.get_float_value(deadframe, index)
                 intval = longlong.gethash_fast(floatval)
+            elif typetag == self.TY_CLASS:
+                refval = metainterp_sd.cpu.get_ref_value(deadframe, index)
+                if refval:
+                    clsbox = metainterp_sd.cpu.ts.cls_of_box(BoxPtr(refval))
+                    intval = clsbox.getint()
+                else:
+                    intval = 0     # guard_nonnull_class on a NULL
             else:
                 assert 0, typetag
 
@@ -593,17 +723,30 @@ class ResumeGuardDescr(ResumeDescr):
                     intval = llmemory.cast_adr_to_int(
                         llmemory.cast_int_to_adr(intval), "forced")
 
-            hash = r_uint(current_object_addr_as_int(self) * 777767777 +
-                          intval * 1442968193)
+            # the histogram is only read by the jitlog
+            if record:
+                if self.histogram is None:
+                    self.histogram = GuardHistogram()
+                self.histogram.record(intval)
+
+            if typetag == self.TY_CLASS:
+                hash = r_uint(current_object_addr_as_int(self) * 777767777)
+            else:
+                hash = r_uint(current_object_addr_as_int(self) * 777767777 +
+                              intval * 1442968193)
         #
         increment = jitdriver_sd.warmstate.increment_trace_eagerness
         return jitcounter.tick(hash, increment)
 
     def get_index_of_guard_value(self):
-        if (self.status & self.ST_TYPE_MASK) == 0:
+        typetag = self.status & self.ST_TYPE_MASK
+        if typetag == 0 or typetag == self.TY_CLASS:
             return -1
         return intmask(self.status >> self.ST_SHIFT)
 
+    def is_class_guard(self):
+        return (self.status & self.ST_TYPE_MASK) == self.TY_CLASS
+
     def start_compiling(self):
         # start tracing and compiling from this guard.
         self.status |= self.ST_BUSY_FLAG
@@ -626,7 +769,8 @@ class ResumeGuardDescr(ResumeDescr):
         propagate_original_jitcell_token(new_loop)
         send_bridge_to_backend(metainterp.jitdriver_sd, metainterp.staticdata,
                                self, inputargs, new_loop.operations,
-                               new_loop.original_jitcell_token)
+                               new_loop.original_jitcell_token,
+                               new_loop.tracing_time, new_loop.optimizing_time)
 
     def make_a_counter_per_value(self, guard_value_op):
         assert guard_value_op.getopnum() == rop.GUARD_VALUE
@@ -646,6 +790,16 @@ class ResumeGuardDescr(ResumeDescr):
                 assert 0, box.type
             self.status = ty | (r_uint(i) << self.ST_SHIFT)
 
+    def make_a_histogram_per_class(self, guard_class_op):
+        opnum = guard_class_op.getopnum()
+        assert opnum == rop.GUARD_CLASS or opnum == rop.GUARD_NONNULL_CLASS
+        box = guard_class_op.getarg(0)
+        try:
+            i = guard_class_op.getfailargs().index(box)
+        except ValueError:
+            return     # the instance is not needed to resume
+        self.status = self.TY_CLASS | (r_uint(i) << self.ST_SHIFT)
+
 class ResumeGuardNonnullDescr(ResumeGuardDescr):
     guard_opnum = rop.GUARD_NONNULL
 
@@ -845,6 +999,8 @@ def compile_trace(metainterp, resumekey):
         inline_short_preamble = False
     else:
         inline_short_preamble = True
+    new_trace.tracing_time = metainterp.get_tracing_time()
+    t0 = time.time()
     try:
         state = optimize_trace(metainterp_sd, jitdriver_sd, new_trace,
                                state.enable_opts,
@@ -855,6 +1011,7 @@ def compile_trace(metainterp, resumekey):
         # InvalidLoop
         debug_print('InvalidLoop in compile_new_bridge')
         return None
+    new_trace.optimizing_time = time.time() - t0
 
     if new_trace.operations[-1].getopnum() != rop.LABEL:
         # We managed to create a bridge.  Dispatch to resumekey to
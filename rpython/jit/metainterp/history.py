@@ -568,6 +568,7 @@ class JitCellToken(AbstractDescr):
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
+    invocations = 0     # aged counter of calls, see memmgr.py
     # one purpose of LoopToken is to keep alive the CompiledLoopToken
     # returned by the backend.  When the LoopToken goes away, the
     # CompiledLoopToken has its __del__ called, which frees the assembler
@@ -624,6 +625,8 @@ class TreeLoop(object):
     call_pure_results = None
     logops = None
     quasi_immutable_deps = None
+    tracing_time = 0.0        # seconds, for JitDebugInfo
+    optimizing_time = 0.0
 
     def _token(*args):
         raise Exception("TreeLoop.token is killed")
@@ -0,0 +1,257 @@
+"""Binary, streaming JIT log.
+
+Enabled by setting the environment variable JITLOG to a file name
+before the JIT starts.  Unlike PYPYLOG=jit-log-opt, the output is not
+meant to be read by humans: it is a sequence of compact records that
+can be aggregated quickly and in bounded memory by
+rpython/tool/jitlogparser/binlog.py.
+
+The file starts with MAGIC, VERSION and one byte giving the size of a
+machine word.  Every record then starts with one MARK_* byte.  Integers
+are encoded as 8 bytes, little endian; strings are an integer length
+followed by the bytes.
+
+    MARK_LOOP           number, type, name, trace
+    MARK_BRIDGE         guard id, trace
+    MARK_GUARD_FAILURE  guard id, count
+    MARK_ENTRY_COUNT    kind ('e', 'l' or 'b'), number, count
+    MARK_GUARD_HISTOGRAM  guard id, is_class, number of entries,
+                        and for each entry: value, count, name
+
+A trace is the list of input arguments (as strings) followed by the
+number of operations and, for each of them:
+
+    opnum, offset, opname, result, args (list of strings),
+    descr, failargs (list of strings)
+
+The guard id of a guard is the same number as the one shown in
+<Guard0x...> by the text logs (modulo the word size), and the bridges
+are attached to it.
+Guard failure counts are those of the guards without a bridge yet,
+collected until the end of the process; the entry counts are the ones
+of the backend (see jit-backend-counts), when it supports them.  When a
+bridge is attached to a guard_value or guard_class, it is preceded by
+the histogram of the values (or classes, whose name is then given too)
+with which the guard failed.
+"""
+
+import os
+
+from rpython.jit.codewriter import heaptracker
+from rpython.jit.metainterp.compile import ResumeGuardDescr
+from rpython.jit.metainterp.logger import LogOperations
+from rpython.jit.metainterp.resoperation import rop
+from rpython.rlib.objectmodel import compute_unique_id, we_are_translated
+from rpython.rlib.rarithmetic import r_uint, LONG_BIT
+from rpython.rlib.rstring import StringBuilder
+
+MAGIC = 'JITL'
+VERSION = '\x01'
+
+MARK_LOOP = '\x10'
+MARK_BRIDGE = '\x11'
+MARK_GUARD_FAILURE = '\x20'
+MARK_ENTRY_COUNT = '\x21'
+MARK_GUARD_HISTOGRAM = '\x22'
+
+BUFFER_SIZE = 64 * 1024
+WORD = LONG_BIT // 8
+
+
+def encode_int(b, value):
+    # sign-extended to 8 bytes, also on 32-bit machines
+    for i in range(8):
+        b.append(chr(value & 0xff))
+        value >>= 8
+
+def encode_str(b, s):
+    encode_int(b, len(s))
+    b.append(s)
+
+def encode_str_list(b, lst):
+    encode_int(b, len(lst))
+    for s in lst:
+        encode_str(b, s)
+
+def guard_id(descr):
+    # the same number as the one used by the backend for 'b' counters
+    return compute_unique_id(descr)
+
+
+class JitLogWriter(object):
+    def __init__(self, metainterp_sd):
+        self.metainterp_sd = metainterp_sd
+        self.enabled = False
+        self.fd = -1
+        self.chunks = []
+        self.size = 0
+        # guard id -> number of failures, for guards without a bridge
+        self.guard_failures = {}
+
+    def setup_once(self):
+        filename = os.environ.get('JITLOG')
+        if filename:
+            self.open(filename)
+
+    def open(self, filename):
+        try:
+            self.fd = os.open(filename,
+                              os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0644)
+        except OSError:
+            return
+        self.enabled = True
+        # ask the backend to count the entries of loops and bridges
+        self.metainterp_sd.cpu.set_debug(True)
+        self._write(MAGIC + VERSION + chr(WORD))
+
+    def _write(self, s):
+        self.chunks.append(s)
+        self.size += len(s)
+        if self.size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.size > 0:
+            data = ''.join(self.chunks)
+            self.chunks = []
+            self.size = 0
+            try:
+                while data:
+                    count = os.write(self.fd, data)
+                    data = data[count:]
+            except OSError:
+                self.close()
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.enabled = False
+
+    # ____________________________________________________________
+
+    def log_loop(self, inputargs, operations, number, type, ops_offset, name):
+        b = StringBuilder()
+        b.append(MARK_LOOP)
+        encode_int(b, number)
+        encode_str(b, type)
+        encode_str(b, name)
+        self._encode_trace(b, inputargs, operations, ops_offset)
+        self._write(b.build())
+
+    def log_bridge(self, inputargs, operations, descr, ops_offset):
+        if isinstance(descr, ResumeGuardDescr) and descr.histogram is not None:
+            self._write_histogram(descr)
+        b = StringBuilder()
+        b.append(MARK_BRIDGE)
+        encode_int(b, guard_id(descr))
+        self._encode_trace(b, inputargs, operations, ops_offset)
+        self._write(b.build())
+        # from now on, the failures go through the bridge
+        self.flush_guard_failures(descr)
+
+    def guard_failed(self, descr):
+        key = guard_id(descr)
+        self.guard_failures[key] = self.guard_failures.get(key, 0) + 1
+
+    def flush_guard_failures(self, descr):
+        key = guard_id(descr)
+        count = self.guard_failures.get(key, 0)
+        if count:
+            del self.guard_failures[key]
+            self._write_guard_failure(key, count)
+
+    def _write_guard_failure(self, key, count):
+        b = StringBuilder()
+        b.append(MARK_GUARD_FAILURE)
+        encode_int(b, key)
+        encode_int(b, count)
+        self._write(b.build())
+
+    def _write_histogram(self, descr):
+        is_class = descr.is_class_guard()
+        hottest = descr.histogram.get_hottest()
+        b = StringBuilder()
+        b.append(MARK_GUARD_HISTOGRAM)
+        encode_int(b, guard_id(descr))
+        encode_int(b, int(is_class))
+        encode_int(b, len(hottest))
+        for value, count in hottest:
+            encode_int(b, value)
+            encode_int(b, count)
+            name = ''
+            if is_class and value != 0 and we_are_translated():
+                # (untranslated, 'value' is a forced address)
+                name = self.metainterp_sd.get_name_from_address(
+                    heaptracker.int2adr(value))
+            encode_str(b, name)
+        self._write(b.build())
+
+    def finish(self):
+        if not self.enabled:
+            return
+        for key, count in self.guard_failures.items():
+            self._write_guard_failure(key, count)
+        self.guard_failures.clear()
+        cpu = self.metainterp_sd.cpu
+        if cpu.supports_loop_runs:
+            loop_runs = cpu.get_all_loop_runs()
+            for i in range(len(loop_runs)):
+                b = StringBuilder()
+                b.append(MARK_ENTRY_COUNT)
+                b.append(loop_runs[i].type)
+                encode_int(b, loop_runs[i].number)
+                encode_int(b, loop_runs[i].counter)
+                self._write(b.build())
+        self.flush()
+        self.close()
+
+    # ____________________________________________________________
+
+    def _encode_trace(self, b, inputargs, operations, ops_offset):
+        logops = LogOperations(self.metainterp_sd, True)
+        if inputargs is None:
+            inputargs = []
+        encode_str_list(b, [logops.repr_of_arg(arg) for arg in inputargs])
+        encode_int(b, len(operations))
+        for op in operations:
+            self._encode_op(b, logops, op, ops_offset)
+
+    def _encode_op(self, b, logops, op, ops_offset):
+        opnum = op.getopnum()
+        encode_int(b, opnum)
+        offset = -1
+        if ops_offset is not None:
+            offset = ops_offset.get(op, -1)
+        encode_int(b, offset)
+        encode_str(b, op.getopname())
+        if op.result is not None:
+            encode_str(b, logops.repr_of_arg(op.result))
+        else:
+            encode_str(b, '')
+        if opnum == rop.DEBUG_MERGE_POINT:
+            jd_sd = self.metainterp_sd.jitdrivers_sd[op.getarg(0).getint()]
+            loc = jd_sd.warmstate.get_location_str(op.getarglist()[3:])
+            args = [str(op.getarg(1).getint()), str(op.getarg(2).getint()),
+                    loc]
+        elif opnum == rop.JIT_DEBUG:
+            arglist = op.getarglist()
+            args = [arglist[0]._get_str()]
+            for box in arglist[1:]:
+                args.append(str(box.getint()))
+        else:
+            args = [logops.repr_of_arg(op.getarg(i))
+                    for i in range(op.numargs())]
+        encode_str_list(b, args)
+        descr = op.getdescr()
+        if descr is None:
+            encode_str(b, '')
+        elif op.is_guard():
+            encode_str(b, '<Guard0x%x>' % r_uint(compute_unique_id(descr)))
+        else:
+            encode_str(b, logops.repr_of_descr(descr))
+        failargs = op.getfailargs()
+        if op.is_guard() and failargs is not None:
+            encode_str_list(b, [logops.repr_of_arg(arg) for arg in failargs])
+        else:
+            encode_int(b, 0)
@@ -11,7 +11,7 @@ from rpython.rlib.jit import Counters
 
 JITPROF_LINES = Counters.ncounters + 1 + 1
 # one for TOTAL, 1 for calls, update if needed
-_CPU_LINES = 4       # the last 4 lines are stored on the cpu
+_CPU_LINES = 6       # the last 6 lines are stored on the cpu
 
 class BaseProfiler(object):
     pass
@@ -107,6 +107,10 @@ class Profiler(BaseProfiler):
             return self.cpu.tracker.total_freed_loops
         elif num == Counters.TOTAL_FREED_BRIDGES:
             return self.cpu.tracker.total_freed_bridges
+        elif num == Counters.TOTAL_EVICTED_LOOPS:
+            return self.cpu.tracker.total_evicted_loops
+        elif num == Counters.TOTAL_CODE_SIZE:
+            return self.cpu.tracker.total_code_size
         return self.counters[num]
 
     def count_ops(self, opnum, kind=Counters.OPS):
@@ -158,6 +162,10 @@ class Profiler(BaseProfiler):
                                 cpu.tracker.total_freed_loops)
             self._print_intline("Freed # of bridges",
                                 cpu.tracker.total_freed_bridges)
+            self._print_intline("Evicted # of loops",
+                                cpu.tracker.total_evicted_loops)
+            self._print_intline("Code size",
+                                cpu.tracker.total_code_size)
 
     def _print_line_time(self, string, i, tim):
         final = "%s:%s\t%d\t%f" % (string, " " * max(0, 13-len(string)), i, tim)
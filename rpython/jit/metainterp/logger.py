@@ -9,9 +9,10 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, rffi
 
 
 class Logger(object):
-    def __init__(self, metainterp_sd, guard_number=False):
+    def __init__(self, metainterp_sd, guard_number=False, jitlog=None):
         self.metainterp_sd = metainterp_sd
         self.guard_number = guard_number
+        self.jitlog = jitlog
 
     def log_loop(self, inputargs, operations, number=0, type=None, ops_offset=None, name=''):
         if type is None:
@@ -36,6 +37,9 @@ class Logger(object):
                         "with", len(operations), "ops")
             logops = self._log_operations(inputargs, operations, ops_offset)
             debug_stop("jit-log-opt-loop")
+            if self.jitlog is not None and self.jitlog.enabled:
+                self.jitlog.log_loop(inputargs, operations, number, type,
+                                     ops_offset, name)
         return logops
 
     def log_bridge(self, inputargs, operations, extra=None,
@@ -65,6 +69,9 @@ class Logger(object):
                         "with", len(operations), "ops")
             logops = self._log_operations(inputargs, operations, ops_offset)
             debug_stop("jit-log-opt-bridge")
+            if self.jitlog is not None and self.jitlog.enabled:
+                self.jitlog.log_bridge(inputargs, operations, descr,
+                                       ops_offset)
         return logops
 
     def log_short_preamble(self, inputargs, operations):
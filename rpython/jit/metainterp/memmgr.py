@@ -19,6 +19,17 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Optionally, the total size of the code held by the loops in 'alive_loops'
+# can be capped with a memory budget (the 'loop_memory_budget' parameter).
+# The backend reports the size of each loop after it or one of its bridges
+# is compiled.  When the total goes over the budget, loops are evicted with
+# a clock-like sweep: every loop token counts how often it was entered,
+# the sweep removes the tokens whose count is zero and halves the others,
+# and it goes on until the total fits again.  Frequently entered loops thus
+# survive several sweeps, while dead ones go away on the first one.
+# Invalidated loops are always evicted first, and the loops used in the
+# current generation are never evicted.
+#
 
 class MemoryManager(object):
 
@@ -38,6 +49,8 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.memory_budget = 0
+        self.alive_code_size = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,6 +62,12 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_memory_budget(self, budget):
+        if budget <= 0:
+            self.memory_budget = 0
+        else:
+            self.memory_budget = budget
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
@@ -56,9 +75,62 @@ class MemoryManager(object):
             self.next_check = self.current_generation + self.check_frequency
 
     def keep_loop_alive(self, looptoken):
+        looptoken.invocations += 1
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                self.alive_code_size += _get_code_size(looptoken)
+                self.alive_loops[looptoken] = None
+
+    def record_code_size(self, looptoken):
+        """Called after the loop or one of its bridges was compiled."""
+        clt = looptoken.compiled_loop_token
+        if clt is None:
+            return
+        oldsize = clt.code_size
+        clt.update_code_size()
+        if looptoken in self.alive_loops:
+            self.alive_code_size += clt.code_size - oldsize
+        if 0 < self.memory_budget < self.alive_code_size:
+            self._evict_loops_now(looptoken)
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.alive_code_size -= _get_code_size(looptoken)
+
+    def _evict_loops_now(self, keep_looptoken=None):
+        debug_start("jit-mem-evict")
+        oldtotal = len(self.alive_loops)
+        debug_print("Code size before:", self.alive_code_size)
+        debug_print("Loop tokens before:", oldtotal)
+        budget = self.memory_budget
+        for looptoken in self.alive_loops.keys():
+            if looptoken.invalidated:
+                self._forget_loop(looptoken)
+        while self.alive_code_size > budget:
+            progress = False
+            for looptoken in self.alive_loops.keys():
+                if self.alive_code_size <= budget:
+                    break
+                if (looptoken is keep_looptoken or
+                        looptoken.generation == self.current_generation):
+                    continue
+                progress = True
+                if looptoken.invocations == 0:
+                    self._forget_loop(looptoken)
+                    _count_evicted_loop(looptoken)
+                else:
+                    looptoken.invocations >>= 1
+            if not progress:
+                break     # only recently used loops are left
+        newtotal = len(self.alive_loops)
+        debug_print("Loop tokens evicted:", oldtotal - newtotal)
+        debug_print("Code size after:", self.alive_code_size)
+        if not we_are_translated() and oldtotal != newtotal:
+            looptoken = None
+            from rpython.rlib import rgc
+            rgc.collect(); rgc.collect(); rgc.collect()
+        debug_stop("jit-mem-evict")
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +142,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -81,3 +153,14 @@ class MemoryManager(object):
             # a single one is not enough for all tests :-(
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
+
+def _get_code_size(looptoken):
+    clt = looptoken.compiled_loop_token
+    if clt is None:
+        return 0
+    return clt.code_size
+
+def _count_evicted_loop(looptoken):
+    clt = looptoken.compiled_loop_token
+    if clt is not None:
+        clt.cpu.tracker.total_evicted_loops += 1
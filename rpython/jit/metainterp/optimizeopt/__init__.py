@@ -8,6 +8,7 @@ from rpython.jit.metainterp.optimizeopt.unroll import optimize_unroll
 from rpython.jit.metainterp.optimizeopt.simplify import OptSimplify
 from rpython.jit.metainterp.optimizeopt.pure import OptPure
 from rpython.jit.metainterp.optimizeopt.earlyforce import OptEarlyForce
+from rpython.jit.metainterp.optimizeopt.vectorize import optimize_vector
 from rpython.rlib.jit import PARAMETERS, ENABLE_ALL_OPTS
 from rpython.rlib.unroll import unrolling_iterable
 from rpython.rlib.debug import debug_start, debug_stop, debug_print
@@ -31,6 +32,10 @@ ALL_OPTS_NAMES = ':'.join([name for name, _ in ALL_OPTS])
 assert ENABLE_ALL_OPTS == ALL_OPTS_NAMES, (
     'please fix rlib/jit.py to say ENABLE_ALL_OPTS = %r' % (ALL_OPTS_NAMES,))
 
+# optimizations that are not part of 'all': they must be explicitly
+# listed in enable_opts, e.g. 'all:vec'
+OPTIONAL_OPTS_DICT = dict.fromkeys(['vec'])
+
 def build_opt_chain(metainterp_sd, enable_opts):
     optimizations = []
     unroll = 'unroll' in enable_opts    # 'enable_opts' is normally a dict
@@ -59,10 +64,14 @@ def optimize_trace(metainterp_sd, jitdriver_sd, loop, enable_opts,
                                                           loop.operations)
         optimizations, unroll = build_opt_chain(metainterp_sd, enable_opts)
         if unroll:
-            return optimize_unroll(metainterp_sd, jitdriver_sd, loop,
-                                   optimizations,
-                                   inline_short_preamble, start_state,
-                                   export_state)
+            state = optimize_unroll(metainterp_sd, jitdriver_sd, loop,
+                                    optimizations,
+                                    inline_short_preamble, start_state,
+                                    export_state)
+            if ('vec' in enable_opts and start_state is not None and
+                    metainterp_sd.cpu.vector_extension):
+                optimize_vector(metainterp_sd, jitdriver_sd, loop)
+            return state
         else:
             optimizer = Optimizer(metainterp_sd, jitdriver_sd, loop,
                                   optimizations)
@@ -831,6 +831,10 @@ class Optimizer(Optimization):
             else:
                 # a real GUARD_VALUE.  Make it use one counter per value.
                 descr.make_a_counter_per_value(op)
+        elif (op.getopnum() == rop.GUARD_CLASS or
+              op.getopnum() == rop.GUARD_NONNULL_CLASS):
+            # record the failing classes in a histogram, for the jitlog
+            descr.make_a_histogram_per_class(op)
         return op
 
     def make_args_key(self, op):
@@ -0,0 +1,515 @@
+"""Vectorize simple loops over raw float arrays.
+
+This runs after unrolling, on the peeled loop, when 'vec' is part of
+enable_opts and the backend sets 'vector_extension'.  It only handles
+loops of the shape produced by element-wise array code (e.g. micronumpy's
+call1/call2), in which every raw_store stores the result of one float
+operation whose arguments are raw_loads or loop invariants:
+
+    label(...)
+    f1 = raw_load(a, i0, descr=floatarraydescr)
+    f2 = raw_load(b, i0, descr=floatarraydescr)
+    f3 = float_add(f1, f2)
+    raw_store(c, i0, f3, descr=floatarraydescr)
+    i1 = int_add(i0, 8)
+    i2 = int_lt(i1, i9)
+    guard_true(i2) [...]
+    jump(..., i1, ...)
+
+The body is unrolled once more, and the two copies of each store are
+fused into a single VEC_RAW_FLOAT_xxx operation that processes two
+consecutive floats.  Everything that the two iterations would check on
+the way (the guards, but also that the accesses are really consecutive
+and that fusing them does not reorder overlapping loads and stores) is
+checked once at the top of the loop.  If the check fails we leave the
+loop by resuming after the last guard of the previous iteration, i.e.
+the remaining iterations run through a bridge that is compiled from the
+scalar code as usual.
+
+The rest of the loop body may only contain operations that can be
+moved to the top of the loop as well: integer operations, reads from GC
+objects (the loop writes only to raw memory), calls to elidable
+functions that cannot raise, and guards that do not depend on float
+values, like the guard_class and guard_not_invalidated that micronumpy
+traces typically contain.  These guards are kept in order with the
+operations around them, and they resume at the same point as the
+combined check.
+
+Anything else (GC writes, other calls, reductions, overflow checks, ...)
+makes the pass give up and leave the loop unchanged.
+"""
+
+from rpython.jit.metainterp import compile
+from rpython.jit.metainterp.history import Const, ConstInt, BoxInt
+from rpython.jit.metainterp.history import INT, FLOAT
+from rpython.jit.metainterp.resoperation import rop, ResOperation
+from rpython.rlib.debug import debug_print
+
+# the operations on integers that we can freely recompute at the start
+# of the loop: they cannot raise and have no side-effect
+INT_OPS = {}
+for _name in ['INT_ADD', 'INT_SUB', 'INT_MUL', 'INT_AND', 'INT_OR',
+              'INT_XOR', 'INT_LSHIFT', 'INT_RSHIFT', 'UINT_RSHIFT',
+              'INT_LT', 'INT_LE', 'INT_EQ', 'INT_NE', 'INT_GT', 'INT_GE',
+              'UINT_LT', 'UINT_LE', 'UINT_GT', 'UINT_GE',
+              'INT_IS_ZERO', 'INT_IS_TRUE', 'INT_NEG', 'INT_INVERT',
+              'SAME_AS']:
+    INT_OPS[getattr(rop, _name)] = None
+
+# the reads from GC objects that we can move to the start of the loop too:
+# the loops that we vectorize do not write to GC objects at all
+GC_READ_OPS = {}
+for _name in ['GETFIELD_GC', 'GETFIELD_GC_PURE', 'ARRAYLEN_GC',
+              'STRLEN', 'UNICODELEN']:
+    GC_READ_OPS[getattr(rop, _name)] = None
+
+# the guards that are checked at the start of the loop as they are, for
+# both iterations; guard_not_invalidated needs to be checked only once
+HOISTED_GUARDS = {}
+for _name in ['GUARD_NONNULL', 'GUARD_ISNULL', 'GUARD_CLASS',
+              'GUARD_NONNULL_CLASS', 'GUARD_VALUE', 'GUARD_NOT_INVALIDATED']:
+    HOISTED_GUARDS[getattr(rop, _name)] = None
+
+VEC_OPS = {rop.FLOAT_ADD: rop.VEC_RAW_FLOAT_ADD,
+           rop.FLOAT_SUB: rop.VEC_RAW_FLOAT_SUB,
+           rop.FLOAT_MUL: rop.VEC_RAW_FLOAT_MUL,
+           rop.FLOAT_TRUEDIV: rop.VEC_RAW_FLOAT_TRUEDIV}
+
+LANE_SIZE = 8            # sizeof(double)
+MAX_ALIAS_CHECKS = 16    # give up on loops needing more runtime checks
+
+
+class NotVectorizable(Exception):
+    pass
+
+
+def optimize_vector(metainterp_sd, jitdriver_sd, loop):
+    try:
+        opt = VectorizingOptimizer(metainterp_sd, loop)
+        opt.propagate_all_forward()
+    except NotVectorizable:
+        debug_print("vectorize: loop left unchanged")
+
+
+class MemoryAccess(object):
+    """A raw_load or raw_store of one of the two unrolled iterations."""
+
+    def __init__(self, op, orig_pos, vec_pos, other_lane=None):
+        self.op = op
+        self.orig_pos = orig_pos    # position in the unrolled loop
+        self.vec_pos = vec_pos      # position in the vectorized loop
+        self.other_lane = other_lane
+
+    def is_write(self):
+        return self.op.getopnum() == rop.RAW_STORE
+
+    def getbase(self):
+        return self.op.getarg(0)
+
+    def getofs(self):
+        return self.op.getarg(1)
+
+
+class VectorizingOptimizer(object):
+
+    def __init__(self, metainterp_sd, loop):
+        self.metainterp_sd = metainterp_sd
+        self.loop = loop
+        self.producers = {}     # int box -> operation computing it
+        self.checkops = []
+        self.bad_box = None
+
+    def propagate_all_forward(self):
+        operations = self.loop.operations
+        if len(operations) < 3:
+            raise NotVectorizable
+        self.label = operations[0]
+        self.jump = operations[-1]
+        if (self.label.getopnum() != rop.LABEL or
+                self.jump.getopnum() != rop.JUMP or
+                self.jump.getdescr() is not self.label.getdescr()):
+            raise NotVectorizable
+        self.body = operations[1:-1]
+        self.classify_operations()
+        self.unroll()
+        self.find_packs()
+        self.compute_residual_ops()
+        self.check_memory_accesses()
+        guardop = self.make_guard()
+        #
+        newoperations = [self.label]
+        newoperations.extend(self.debug_ops)
+        newoperations.extend(self.setup_ops)
+        newoperations.extend(self.setup_ops_b)
+        newoperations.extend(self.checkops)
+        newoperations.append(guardop)
+        newoperations.extend(self.residual)
+        for storeop, arithop in self.packs:
+            newoperations.append(self.make_vector_op(storeop, arithop))
+        newoperations.append(ResOperation(rop.JUMP, self.jumpargs_b, None,
+                                          descr=self.jump.getdescr()))
+        self.loop.operations = newoperations
+        debug_print("vectorize: %d operations fused" % len(self.packs))
+
+    # ----------
+
+    def classify_operations(self):
+        self.debug_ops = []
+        self.setup_ops = []     # operations and guards moved to the top
+        self.setup = {}         # and the same as a set
+        self.guards = []
+        self.loads = {}         # result box -> raw_load
+        self.arith = {}         # result box -> float operation
+        self.stores = []
+        self.last_store = -1
+        for i in range(len(self.body)):
+            op = self.body[i]
+            opnum = op.getopnum()
+            if opnum == rop.DEBUG_MERGE_POINT:
+                self.debug_ops.append(op)
+            elif opnum in INT_OPS:
+                if op.result.type != INT:
+                    raise NotVectorizable
+                self.add_setup_op(op)
+            elif opnum in GC_READ_OPS or opnum == rop.CALL:
+                if op.result is None or op.result.type == FLOAT:
+                    raise NotVectorizable
+                if opnum == rop.CALL and not self.is_pure_call(op):
+                    raise NotVectorizable
+                self.add_setup_op(op)
+            elif opnum in HOISTED_GUARDS:
+                self.add_setup_op(op)
+            elif opnum == rop.RAW_LOAD:
+                if (op.result.type != FLOAT or
+                        not op.getdescr().is_array_of_floats()):
+                    raise NotVectorizable
+                self.loads[op.result] = op
+            elif opnum in VEC_OPS:
+                self.arith[op.result] = op
+            elif opnum == rop.RAW_STORE:
+                if (op.getarg(2).type != FLOAT or
+                        not op.getdescr().is_array_of_floats()):
+                    raise NotVectorizable
+                self.stores.append(op)
+                self.last_store = i
+            elif opnum == rop.GUARD_TRUE or opnum == rop.GUARD_FALSE:
+                self.guards.append(op)
+            else:
+                raise NotVectorizable
+        if not self.stores or not self.guards:
+            raise NotVectorizable
+
+    def add_setup_op(self, op):
+        # float values are only available after the loads, so operations
+        # using them cannot be moved to the top of the loop
+        for arg in op.getarglist():
+            if arg.type == FLOAT:
+                raise NotVectorizable
+        self.setup_ops.append(op)
+        self.setup[op] = None
+        if op.result is not None:
+            self.producers[op.result] = op
+
+    def is_pure_call(self, op):
+        effectinfo = op.getdescr().get_extra_info()
+        return (effectinfo is not None and effectinfo.check_is_elidable() and
+                not effectinfo.check_can_raise())
+
+    def unroll(self):
+        # make the second copy of the loop body, renaming the label
+        # arguments to the arguments of the jump
+        self.mapping = {}
+        labelargs = self.label.getarglist()
+        jumpargs = self.jump.getarglist()
+        self.invariants = {}
+        for i in range(len(labelargs)):
+            self.mapping[labelargs[i]] = jumpargs[i]
+            if jumpargs[i] is labelargs[i]:
+                self.invariants[labelargs[i]] = None
+        self.setup_ops_b = []
+        self.ops_b = {}         # operation -> its copy in the second iteration
+        self.ops_a = {}         # and back
+        for op in self.body:
+            opnum = op.getopnum()
+            if opnum == rop.DEBUG_MERGE_POINT:
+                continue
+            if op.is_guard():
+                if (op not in self.setup or
+                        opnum == rop.GUARD_NOT_INVALIDATED):
+                    continue
+            args = [self.get_b(arg) for arg in op.getarglist()]
+            result = None
+            if op.result is not None:
+                result = op.result.clonebox()
+                self.mapping[op.result] = result
+            newop = ResOperation(opnum, args, result, op.getdescr())
+            self.ops_b[op] = newop
+            self.ops_a[newop] = op
+            if op in self.setup:
+                self.setup_ops_b.append(newop)
+                if result is not None:
+                    self.producers[result] = newop
+        self.jumpargs_b = [self.get_b(arg) for arg in jumpargs]
+
+    def get_b(self, box):
+        if isinstance(box, Const):
+            return box
+        newbox = self.mapping.get(box, None)
+        if newbox is None:
+            raise NotVectorizable
+        return newbox
+
+    def find_packs(self):
+        uses = {}
+        for op in self.body:
+            if op.is_guard():
+                continue
+            for arg in op.getarglist():
+                uses[arg] = uses.get(arg, 0) + 1
+        self.packs = []
+        packed = {}
+        for storeop in self.stores:
+            arithop = self.arith.get(storeop.getarg(2), None)
+            if arithop is None or uses[arithop.result] != 1:
+                raise NotVectorizable
+            for arg in arithop.getarglist():
+                if arg in self.loads:
+                    continue
+                if not isinstance(arg, Const) and arg not in self.invariants:
+                    raise NotVectorizable
+            self.check_invariant_base(storeop)
+            self.packs.append((storeop, arithop))
+            packed[arithop] = None
+        # the loaded values must only be used by the fused operations
+        for op in self.arith.values():
+            if op not in packed:
+                for arg in op.getarglist():
+                    if arg in self.loads:
+                        raise NotVectorizable
+        for loadop in self.loads.values():
+            self.check_invariant_base(loadop)
+
+    def check_invariant_base(self, op):
+        base = op.getarg(0)
+        if not isinstance(base, Const) and base not in self.invariants:
+            raise NotVectorizable
+
+    def compute_residual_ops(self):
+        # the float values passed to the next iteration are computed by
+        # scalar operations of the second iteration, before the stores
+        needed = {}
+        for box in self.jumpargs_b:
+            needed[box] = None
+        self.residual = []
+        for i in range(len(self.body) - 1, -1, -1):
+            op = self.body[i]
+            if op.result is None or op.result.type != FLOAT:
+                continue
+            newop = self.ops_b[op]
+            if newop.result in needed:
+                self.residual.append(newop)
+                for arg in newop.getarglist():
+                    needed[arg] = None
+        self.residual.reverse()
+        # the float operations of the first iteration are not emitted
+        for box in needed:
+            if box in self.loads or box in self.arith:
+                raise NotVectorizable
+
+    # ----------
+
+    def check_memory_accesses(self):
+        n = len(self.body)
+        positions = {}
+        for i in range(n):
+            positions[self.body[i]] = i
+        accesses = []
+        for j in range(len(self.packs)):
+            storeop, arithop = self.packs[j]
+            for arg in arithop.getarglist():
+                if arg in self.loads:
+                    loadop = self.loads[arg]
+                    self.add_lanes(accesses, loadop, positions[loadop], n,
+                                   2 * j + 1)
+            self.add_lanes(accesses, storeop, positions[storeop], n,
+                           2 * j + 2)
+        for op in self.residual:
+            if op.getopnum() == rop.RAW_LOAD:
+                pos = positions[self.ops_a[op]]
+                accesses.append(MemoryAccess(op, n + pos, 0))
+        # both lanes of every fused access must be consecutive in memory
+        seen = {}
+        for access in accesses:
+            other = access.other_lane
+            if other is not None and access.op not in seen:
+                seen[access.op] = None
+                if not self.is_next_lane(access.getofs(), other.getofs()):
+                    diff = self.emit_int(rop.INT_SUB,
+                                         [other.getofs(), access.getofs()])
+                    self.emit_check(rop.INT_NE,
+                                    [diff, ConstInt(LANE_SIZE)])
+        # any pair of accesses, one of them a store, that is executed in
+        # a different order than in the unrolled loop must not overlap
+        checks = 0
+        for x in accesses:
+            for y in accesses:
+                if x.orig_pos >= y.orig_pos or x.vec_pos <= y.vec_pos:
+                    continue
+                if not x.is_write() and not y.is_write():
+                    continue
+                if self.same_address(x, y):
+                    raise NotVectorizable
+                if self.distinct_addresses(x, y):
+                    continue
+                checks += 1
+                if checks > MAX_ALIAS_CHECKS:
+                    raise NotVectorizable
+                self.emit_overlap_check(x, y)
+
+    def add_lanes(self, accesses, op, pos, n, vec_pos):
+        opb = self.ops_b[op]
+        access = MemoryAccess(op, pos, vec_pos)
+        access.other_lane = MemoryAccess(opb, n + pos, vec_pos)
+        accesses.append(access)
+        accesses.append(access.other_lane)
+
+    def is_next_lane(self, ofs1, ofs2):
+        # is 'ofs2' statically known to be 'ofs1 + LANE_SIZE'?
+        op = self.producers.get(ofs2, None)
+        if op is None or op.getopnum() != rop.INT_ADD:
+            return False
+        arg0 = op.getarg(0)
+        arg1 = op.getarg(1)
+        if isinstance(arg0, ConstInt):
+            arg0, arg1 = arg1, arg0
+        return (arg0 is ofs1 and isinstance(arg1, ConstInt) and
+                arg1.getint() == LANE_SIZE)
+
+    def same_address(self, x, y):
+        return (x.getbase().same_box(y.getbase()) and
+                x.getofs().same_box(y.getofs()))
+
+    def distinct_addresses(self, x, y):
+        if not x.getbase().same_box(y.getbase()):
+            return False
+        return (self.is_next_lane(x.getofs(), y.getofs()) or
+                self.is_next_lane(y.getofs(), x.getofs()))
+
+    def emit_overlap_check(self, x, y):
+        # the two 8-byte accesses overlap if -8 < addr(x) - addr(y) < 8
+        if x.getbase().same_box(y.getbase()):
+            diff = self.emit_int(rop.INT_SUB, [x.getofs(), y.getofs()])
+        else:
+            addrx = self.emit_int(rop.INT_ADD, [x.getbase(), x.getofs()])
+            addry = self.emit_int(rop.INT_ADD, [y.getbase(), y.getofs()])
+            diff = self.emit_int(rop.INT_SUB, [addrx, addry])
+        diff = self.emit_int(rop.INT_ADD, [diff, ConstInt(LANE_SIZE - 1)])
+        self.emit_check(rop.UINT_LT, [diff, ConstInt(2 * LANE_SIZE - 1)])
+
+    def emit_int(self, opnum, args):
+        box = BoxInt()
+        self.checkops.append(ResOperation(opnum, args, box))
+        return box
+
+    def emit_check(self, opnum, args):
+        # 'args' are the arguments of a condition that is true if we
+        # cannot run the vectorized loop
+        box = self.emit_int(opnum, args)
+        if self.bad_box is None:
+            self.bad_box = box
+        else:
+            self.bad_box = self.emit_int(rop.INT_OR, [self.bad_box, box])
+
+    # ----------
+
+    def make_guard(self):
+        """Make the guard that checks, at the start of the loop, everything
+        that must hold to run the two iterations vectorized.
+
+        On failure we resume as if the last guard of the previous
+        iteration had just passed.  We can only do that from a guard_true
+        or guard_false recorded by a goto_if_not: its resume data points
+        just after the goto_if_not, and the class of the descr tells if
+        we continue there (ResumeGuardFalseDescr) or follow the jump
+        (ResumeGuardTrueDescr).  We pick the class that does what the
+        goto_if_not did when the guard passed.  The guards moved to the
+        top of the loop resume at the same point.
+        """
+        lastguard = self.guards[-1]
+        descr = lastguard.getdescr()
+        if (not isinstance(descr, compile.ResumeGuardTrueDescr) and
+                not isinstance(descr, compile.ResumeGuardFalseDescr)):
+            raise NotVectorizable
+        if descr.rd_pendingfields:
+            raise NotVectorizable
+        index = -1
+        for i in range(len(self.body)):
+            if self.body[i] is lastguard:
+                index = i
+        if index < self.last_store:
+            raise NotVectorizable
+        #
+        for guard in self.guards:
+            for cond in [guard.getarg(0), self.get_b(guard.getarg(0))]:
+                if guard.getopnum() == rop.GUARD_TRUE:
+                    self.emit_check(rop.INT_IS_ZERO, [cond])
+                else:
+                    self.emit_check(rop.INT_IS_TRUE, [cond])
+        #
+        # the values live after the last guard, seen from the next
+        # iteration, are the arguments of the label
+        labelargs = self.label.getarglist()
+        jumpargs = self.jump.getarglist()
+        jumped = lastguard.getopnum() == rop.GUARD_FALSE
+        failargs = []
+        for box in lastguard.getfailargs():
+            if box is None:
+                failargs.append(None)
+                continue
+            for i in range(len(jumpargs)):
+                if jumpargs[i] is box:
+                    failargs.append(labelargs[i])
+                    break
+            else:
+                if box is not lastguard.getarg(0):
+                    raise NotVectorizable
+                op = self.producers.get(box, None)
+                if op is None or not op.returns_bool_result():
+                    raise NotVectorizable
+                # the value of the condition when the guard passed; the
+                # guards moved to the top need this box too
+                if jumped:
+                    passing = ConstInt(0)
+                else:
+                    passing = ConstInt(1)
+                result = BoxInt()
+                self.setup_ops.insert(0, ResOperation(rop.SAME_AS, [passing],
+                                                      result))
+                failargs.append(result)
+        for guard in self.setup_ops + self.setup_ops_b:
+            if guard.is_guard():
+                self.set_resume_descr(guard, descr, jumped, failargs)
+        guardop = ResOperation(rop.GUARD_FALSE, [self.bad_box], None)
+        self.set_resume_descr(guardop, descr, jumped, failargs)
+        return guardop
+
+    def set_resume_descr(self, guard, descr, jumped, failargs):
+        if jumped:
+            newdescr = compile.ResumeGuardTrueDescr()
+        else:
+            newdescr = compile.ResumeGuardFalseDescr()
+        newdescr.copy_all_attributes_from(descr)
+        guard.setdescr(newdescr)
+        newdescr.store_final_boxes(guard, failargs[:], self.metainterp_sd)
+
+    def make_vector_op(self, storeop, arithop):
+        args = [storeop.getarg(0), storeop.getarg(1)]
+        for arg in arithop.getarglist():
+            if arg in self.loads:
+                loadop = self.loads[arg]
+                args.append(loadop.getarg(0))
+                args.append(loadop.getarg(1))
+            else:
+                args.append(arg)
+        return ResOperation(VEC_OPS[arithop.getopnum()], args, None,
+                            descr=storeop.getdescr())
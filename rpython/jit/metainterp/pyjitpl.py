@@ -1,4 +1,5 @@
 import sys
+import time
 
 import py
 
@@ -11,6 +12,7 @@ from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, Box, TargetToken)
 from rpython.jit.metainterp.jitprof import EmptyProfiler
 from rpython.jit.metainterp.logger import Logger
+from rpython.jit.metainterp.jitlog import JitLogWriter
 from rpython.jit.metainterp.optimizeopt.util import args_dict
 from rpython.jit.metainterp.resoperation import rop, GuardResOp
 from rpython.rlib import nonconst, rstack
@@ -1563,8 +1565,9 @@ class MetaInterpStaticData(object):
         self.cpu = cpu
         self.stats = self.cpu.stats
         self.options = options
+        self.jitlog = JitLogWriter(self)
         self.logger_noopt = Logger(self)
-        self.logger_ops = Logger(self, guard_number=True)
+        self.logger_ops = Logger(self, guard_number=True, jitlog=self.jitlog)
 
         self.profiler = ProfilerClass()
         self.profiler.cpu = cpu
@@ -1649,11 +1652,64 @@ class MetaInterpStaticData(object):
         if not self.globaldata.initialized:
             debug_print(self.jit_starting_line)
             self.cpu.setup_once()
+            self.jitlog.setup_once()
             if not self.profiler.initialized:
                 self.profiler.start()
                 self.profiler.initialized = True
             self.globaldata.initialized = True
 
+    def compile_pending_loops(self, max_loops):
+        """Optimize and assemble up to 'max_loops' of the loops whose
+        compilation was deferred (all of them if 'max_loops' is negative),
+        and attach them to their JitCells.  Returns the number of loops
+        taken from the queue.
+        """
+        globaldata = self.globaldata
+        if globaldata.compiling_pending_loops:
+            return 0    # called recursively, e.g. from a residual call
+        globaldata.compiling_pending_loops = True
+        count = 0
+        try:
+            while globaldata.pending_loops and count != max_loops:
+                pending = globaldata.pending_loops.pop(0)
+                count += 1
+                self._compile_pending_loop(pending)
+        finally:
+            globaldata.compiling_pending_loops = False
+        return count
+
+    def compile_pending_loop(self, pending):
+        """Optimize and assemble only 'pending', which got hot again.
+        The other deferred loops stay in the queue.
+        """
+        globaldata = self.globaldata
+        if globaldata.compiling_pending_loops:
+            return      # called recursively, e.g. from a residual call
+        globaldata.compiling_pending_loops = True
+        try:
+            globaldata.pending_loops.remove(pending)
+            self._compile_pending_loop(pending)
+        finally:
+            globaldata.compiling_pending_loops = False
+
+    def _compile_pending_loop(self, pending):
+        jitdriver_sd = pending.jitdriver_sd
+        warmstate = jitdriver_sd.warmstate
+        debug_start('jit-compile-pending')
+        try:
+            target_token = pending.compile(self)
+        except SwitchToBlackhole, stb:
+            self.profiler.count(stb.reason)
+            target_token = None
+        debug_stop('jit-compile-pending')
+        warmstate.set_compile_pending(pending.greenkey, None)
+        if target_token is not None:
+            assert isinstance(target_token, TargetToken)
+            jitcell_token = target_token.targeting_jitcell_token
+            warmstate.attach_procedure_to_interp(pending.greenkey,
+                                                 jitcell_token)
+            self.stats.add_jitcell_token(jitcell_token)
+
     def get_name_from_address(self, addr):
         # for debugging only
         if we_are_translated():
@@ -1731,6 +1787,8 @@ class MetaInterpGlobalData(object):
         self.indirectcall_dict = None
         self.addr2name = None
         self.loopnumbering = 0
+        self.pending_loops = []        # list of compile.PendingLoop
+        self.compiling_pending_loops = False
 
 # ____________________________________________________________
 
@@ -1738,6 +1796,7 @@ class MetaInterp(object):
     portal_call_depth = 0
     cancel_count = 0
     exported_state = None
+    tracing_start = 0.0
 
     def __init__(self, staticdata, jitdriver_sd):
         self.staticdata = staticdata
@@ -2116,6 +2175,7 @@ class MetaInterp(object):
         debug_start('jit-tracing')
         self.staticdata._setup_once()
         self.staticdata.profiler.start_tracing()
+        self.tracing_start = time.time()
         assert jitdriver_sd is self.jitdriver_sd
         self.staticdata.try_to_free_some_loops()
         self.create_empty_history()
@@ -2143,6 +2203,7 @@ class MetaInterp(object):
     def handle_guard_failure(self, key, deadframe):
         debug_start('jit-tracing')
         self.staticdata.profiler.start_tracing()
+        self.tracing_start = time.time()
         assert isinstance(key, compile.ResumeGuardDescr)
         # store the resumekey.wref_original_loop_token() on 'self' to make
         # sure that it stays alive as long as this MetaInterp
@@ -2178,7 +2239,8 @@ class MetaInterp(object):
         # a stack of blackhole interpreters filled with the same values, and
         # run it.
         from rpython.jit.metainterp.blackhole import convert_and_run_from_pyjitpl
-        self.aborted_tracing(stb.reason)
+        if stb.reason != COMPILATION_DEFERRED:
+            self.aborted_tracing(stb.reason)
         convert_and_run_from_pyjitpl(self, stb.raising_exception)
         assert False    # ^^^ must raise
 
@@ -2361,6 +2423,10 @@ class MetaInterp(object):
                 return None
         return token
 
+    def get_tracing_time(self):
+        """Seconds since tracing started, for JitDebugInfo."""
+        return time.time() - self.tracing_start
+
     def compile_loop(self, original_boxes, live_arg_boxes, start,
                      try_disabling_unroll=False, exported_state=None):
         num_green_args = self.jitdriver_sd.num_green_args
@@ -2379,6 +2445,12 @@ class MetaInterp(object):
                                                    self.resumekey,
                                                    exported_state)
         else:
+            if (self.jitdriver_sd.warmstate.defer_compilation and
+                    not try_disabling_unroll and
+                    isinstance(self.resumekey, compile.ResumeFromInterpDescr)):
+                self.defer_compile_loop(greenkey, start,
+                                        original_boxes[num_green_args:],
+                                        live_arg_boxes[num_green_args:])
             target_token = compile.compile_loop(self, greenkey, start,
                                                 original_boxes[num_green_args:],
                                                 live_arg_boxes[num_green_args:],
@@ -2394,6 +2466,17 @@ class MetaInterp(object):
             jitcell_token = target_token.targeting_jitcell_token
             self.raise_continue_running_normally(live_arg_boxes, jitcell_token)
 
+    def defer_compile_loop(self, greenkey, start, inputargs, jumpargs):
+        """Queue the trace for compile_pending_loops() instead of
+        compiling it now, and continue in the blackhole interpreter.
+        """
+        pending = compile.PendingLoop(self, greenkey, start,
+                                      inputargs, jumpargs)
+        self.staticdata.globaldata.pending_loops.append(pending)
+        self.jitdriver_sd.warmstate.set_compile_pending(greenkey, pending)
+        self.staticdata.log('compilation deferred')
+        raise SwitchToBlackhole(COMPILATION_DEFERRED)
+
     def compile_loop_or_abort(self, original_boxes, live_arg_boxes,
                               start):
         """Called after we aborted more than 'max_unroll_loops' times.
@@ -2927,6 +3010,9 @@ class ChangeFrame(jitexc.JitException):
     """Raised after we mutated metainterp.framestack, in order to force
     it to reload the current top-of-stack frame that gets interpreted."""
 
+# not a real abort: the trace was queued by defer_compile_loop()
+COMPILATION_DEFERRED = -1
+
 class SwitchToBlackhole(jitexc.JitException):
     def __init__(self, reason, raising_exception=False):
         self.reason = reason
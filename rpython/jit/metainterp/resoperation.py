@@ -511,6 +511,14 @@ _oplist = [
     'SETINTERIORFIELD_GC/3d',
     'SETINTERIORFIELD_RAW/3d',    # right now, only used by tests
     'RAW_STORE/3d',
+    # two-lane float vector operations on raw memory, only emitted by
+    # optimizeopt/vectorize.py: [dstbase, dstofs, operand1, operand2],
+    # where each operand is either a float (broadcast to both lanes) or
+    # a pair (base, ofs) naming two consecutive floats in raw memory
+    'VEC_RAW_FLOAT_ADD/*d',
+    'VEC_RAW_FLOAT_SUB/*d',
+    'VEC_RAW_FLOAT_MUL/*d',
+    'VEC_RAW_FLOAT_TRUEDIV/*d',
     'SETFIELD_GC/2d',
     'ZERO_PTR_FIELD/2', # only emitted by the rewrite, clears a pointer field
                         # at a given constant offset, no descr
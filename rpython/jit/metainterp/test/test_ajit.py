@@ -1727,6 +1727,67 @@ class BasicTests:
         # this checks that the logic triggered by make_a_counter_per_value()
         # works and prevents generating tons of bridges
 
+    def test_guard_class_histogram(self):
+        myjitdriver = JitDriver(greens = [], reds = ['x', 'res'])
+        class A(object):
+            def g(self):
+                return 1
+        class B(A):
+            def g(self):
+                return 2
+        class C(A):
+            def g(self):
+                return 3
+        class D(A):
+            def g(self):
+                return 4
+        # the rare classes fail the guard_class once each
+        l = [A()] * 20 + [B(), C(), D()] + [A()] * 20
+        def f(x):
+            res = 0
+            while x > 0:
+                myjitdriver.can_enter_jit(x=x, res=res)
+                myjitdriver.jit_merge_point(x=x, res=res)
+                x -= 1
+                res += l[x].g()
+            return res
+        res = self.meta_interp(f, [len(l)])
+        assert res == f(len(l))
+        self.check_trace_count(1)
+        if self.basic:
+            # the histograms are only recorded for the jitlog, which is
+            # disabled here (see test_jitlog.py)
+            [loop] = get_stats().get_all_loops()
+            for op in loop.get_operations():
+                if op.getopname() == 'guard_class':
+                    assert op.getdescr().histogram is None
+
+    def test_guard_class_shared_counter(self):
+        myjitdriver = JitDriver(greens = [], reds = ['x', 'res'])
+        class A(object):
+            def g(self):
+                return 1
+        class B(A):
+            def g(self):
+                return 2
+        class C(A):
+            def g(self):
+                return 3
+        # B and C fail the same guard_class of the loop once each.  They
+        # share the counter of the guard, so together they make a bridge
+        l = [A()] * 20 + [B(), A(), A(), C()] + [A()] * 20
+        def f(x):
+            res = 0
+            while x > 0:
+                myjitdriver.can_enter_jit(x=x, res=res)
+                myjitdriver.jit_merge_point(x=x, res=res)
+                x -= 1
+                res += l[x].g()
+            return res
+        res = self.meta_interp(f, [len(l)])
+        assert res == f(len(l))
+        self.check_trace_count(2)
+
     def test_swap_values(self):
         def f(x, y):
             if x > 5:
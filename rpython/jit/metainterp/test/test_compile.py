@@ -62,6 +62,9 @@ class FakeMetaInterp:
         warmstate = FakeState()
         virtualizable_info = None
 
+    def get_tracing_time(self):
+        return 0.0
+
 def test_compile_loop():
     cpu = FakeCPU()
     staticdata = FakeMetaInterpStaticData()
@@ -158,3 +161,27 @@ def test_compile_tmp_callback():
         assert lltype.cast_opaque_ptr(lltype.Ptr(EXC), e.value) == llexc
     else:
         assert 0, "should have raised"
+
+def test_guard_histogram():
+    h = compile.GuardHistogram()
+    assert not h.is_polymorphic()
+    assert h.record(100) == 1
+    assert h.record(100) == 2
+    assert not h.is_polymorphic()
+    assert h.record(200) == 1
+    assert h.is_polymorphic()
+    assert h.get_hottest() == [(100, 2), (200, 1)]
+
+def test_guard_histogram_full():
+    h = compile.GuardHistogram()
+    for i in range(h.SIZE):
+        for j in range(i + 1):
+            h.record(i)
+    # the least frequent value is replaced and its count inherited
+    assert h.record(42) == 2
+    assert h.num_distinct == h.SIZE + 1
+    hottest = h.get_hottest()
+    assert len(hottest) == h.SIZE
+    assert hottest[0] == (h.SIZE - 1, h.SIZE)
+    assert (42, 2) in hottest
+    assert 0 not in [value for value, count in hottest]
@@ -0,0 +1,144 @@
+from rpython.rlib.jit import JitDriver, set_param, Counters
+from rpython.rlib import jit_hooks
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp.jitprof import Profiler
+
+
+class TestDeferredCompile(LLJitMixin):
+
+    def test_loop_is_compiled_later(self):
+        driver = JitDriver(greens = [], reds = ['n', 'total'])
+
+        def loop(n):
+            total = 0
+            while n > 0:
+                driver.jit_merge_point(n=n, total=total)
+                total += n
+                n -= 1
+            return total
+
+        def main(n):
+            set_param(driver, 'defer_compilation', 1)
+            res = loop(n)
+            # traced, but not compiled yet
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 0
+            assert jit_hooks.stats_compile_pending(None, -1) == 1
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 1
+            assert jit_hooks.stats_compile_pending(None, -1) == 0
+            res += loop(n)
+            # the loop was traced only once, and not aborted
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TRACING) == 1
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.ABORT_BAD_LOOP) == 0
+            return res
+
+        # short enough that the loop does not get hot again before it ends
+        res = self.meta_interp(main, [5], ProfilerClass=Profiler)
+        assert res == 2 * (5 * 6 / 2)
+        self.check_jitcell_token_count(1)
+        self.check_aborted_count(0)
+
+    def test_loop_is_compiled_when_hot_again(self):
+        driver = JitDriver(greens = [], reds = ['n', 'total'])
+
+        def loop(n):
+            total = 0
+            while n > 0:
+                driver.jit_merge_point(n=n, total=total)
+                total += n
+                n -= 1
+            return total
+
+        def main(n):
+            set_param(driver, 'defer_compilation', 1)
+            res = loop(n)
+            # compiled without any call to compile_pending()
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 1
+            assert jit_hooks.stats_compile_pending(None, -1) == 0
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TRACING) == 1
+            return res
+
+        res = self.meta_interp(main, [30], ProfilerClass=Profiler)
+        assert res == 30 * 31 / 2
+        self.check_jitcell_token_count(1)
+        self.check_aborted_count(0)
+        self.check_trace_count(1)
+
+    def test_only_the_hot_loop_is_compiled(self):
+        driver1 = JitDriver(greens = [], reds = ['n'])
+        driver2 = JitDriver(greens = [], reds = ['n'])
+
+        def loop1(n):
+            while n > 0:
+                driver1.jit_merge_point(n=n)
+                n -= 1
+
+        def loop2(n):
+            while n > 0:
+                driver2.jit_merge_point(n=n)
+                n -= 2
+
+        def main(n):
+            set_param(None, 'defer_compilation', 1)
+            loop2(2 * n)
+            loop1(n)
+            # loop1 gets hot again: it is compiled, but not loop2
+            loop1(30)
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 1
+            assert jit_hooks.stats_compile_pending(None, -1) == 1
+            return 42
+
+        res = self.meta_interp(main, [4], ProfilerClass=Profiler)
+        assert res == 42
+
+    def test_max_loops(self):
+        driver1 = JitDriver(greens = [], reds = ['n'])
+        driver2 = JitDriver(greens = [], reds = ['n'])
+
+        def loop1(n):
+            while n > 0:
+                driver1.jit_merge_point(n=n)
+                n -= 1
+
+        def loop2(n):
+            while n > 0:
+                driver2.jit_merge_point(n=n)
+                n -= 2
+
+        def main(n):
+            set_param(None, 'defer_compilation', 1)
+            loop1(n)
+            loop2(2 * n)
+            assert jit_hooks.stats_compile_pending(None, 1) == 1
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 1
+            assert jit_hooks.stats_compile_pending(None, 5) == 1
+            assert jit_hooks.stats_get_counter_value(None,
+                                        Counters.TOTAL_COMPILED_LOOPS) == 2
+            return 42
+
+        # short enough that the loops do not get hot again before they end
+        res = self.meta_interp(main, [4], ProfilerClass=Profiler)
+        assert res == 42
+
+    def test_not_deferred_by_default(self):
+        driver = JitDriver(greens = [], reds = ['n'])
+
+        def loop(n):
+            while n > 0:
+                driver.jit_merge_point(n=n)
+                n -= 1
+
+        def main(n):
+            loop(n)
+            return jit_hooks.stats_compile_pending(None, -1)
+
+        res = self.meta_interp(main, [30])
+        assert res == 0
+        self.check_jitcell_token_count(1)
@@ -116,6 +116,36 @@ class JitHookInterfaceTests(object):
         self.meta_interp(loop, [1, 10], policy=JitPolicy(MyJitIface()))
         assert called == ["compile", "before_compile_bridge", "compile_bridge"]
 
+    def test_on_compile_times(self):
+        infos = []
+
+        class MyJitIface(JitHookInterface):
+            def after_compile(self, di):
+                infos.append((di.type, di.tracing_time, di.optimizing_time,
+                              di.backend_time, di.num_guards))
+
+            def after_compile_bridge(self, di):
+                infos.append((di.type, di.tracing_time, di.optimizing_time,
+                              di.backend_time, di.num_guards))
+
+        driver = JitDriver(greens = [], reds = ['i', 'n'])
+
+        def loop(i, n):
+            while i < n:
+                driver.can_enter_jit(n=n, i=i)
+                driver.jit_merge_point(n=n, i=i)
+                if i >= 20:
+                    i += 2
+                i += 1
+
+        self.meta_interp(loop, [0, 40], policy=JitPolicy(MyJitIface()))
+        assert [info[0] for info in infos] == ["loop", "bridge"]
+        for type, tracing, optimizing, backend, num_guards in infos:
+            assert tracing > 0.0
+            assert optimizing > 0.0
+            assert backend > 0.0
+            assert num_guards >= 1
+
     def test_resop_interface(self):
         driver = JitDriver(greens = [], reds = ['i'])
 
@@ -178,6 +208,33 @@ class JitHookInterfaceTests(object):
 
         self.meta_interp(main, [], ProfilerClass=Profiler)
 
+    def test_trace_next_iteration(self):
+        driver = JitDriver(greens = ['k'], reds = ['i', 's'],
+                           name='testdriver')
+
+        def loop(k, i):
+            s = 0
+            while i > 0:
+                driver.can_enter_jit(k=k, i=i, s=s)
+                driver.jit_merge_point(k=k, i=i, s=s)
+                s += k
+                i -= 1
+            return s
+
+        def main(boost):
+            if boost:
+                jit_hooks.trace_next_iteration('testdriver', 5)
+            return loop(5, 2) + loop(6, 2)
+
+        # not enough iterations to reach the threshold...
+        res = self.meta_interp(main, [0])
+        assert res == 22
+        self.check_trace_count(0)
+        # ...unless the green key was marked as hot beforehand
+        res = self.meta_interp(main, [1])
+        assert res == 22
+        self.check_trace_count(1)
+
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
     
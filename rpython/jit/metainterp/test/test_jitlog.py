@@ -0,0 +1,115 @@
+import os
+import py
+from rpython.rlib.jit import JitDriver
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp import jitlog
+from rpython.rlib.rstring import StringBuilder
+from rpython.tool.jitlogparser import binlog
+
+
+def test_encode_int():
+    b = StringBuilder()
+    jitlog.encode_int(b, 0x0102)
+    jitlog.encode_int(b, -2)
+    assert b.build() == '\x02\x01' + '\x00' * 6 + '\xfe' + '\xff' * 7
+
+
+class TestJitLog(LLJitMixin):
+
+    def meta_interp_with_jitlog(self, *args, **kwds):
+        filename = str(py.test.ensuretemp('jitlog').join('log'))
+        os.environ['JITLOG'] = filename
+        try:
+            self.meta_interp(*args, **kwds)
+        finally:
+            del os.environ['JITLOG']
+        return list(binlog.iter_records(filename))
+
+    def test_loop_and_bridge(self):
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'res'])
+        def f(n):
+            res = 0
+            while n > 0:
+                myjitdriver.can_enter_jit(n=n, res=res)
+                myjitdriver.jit_merge_point(n=n, res=res)
+                if n < 10:
+                    res += 2
+                else:
+                    res += 1
+                n -= 1
+            return res
+        records = self.meta_interp_with_jitlog(f, [20])
+        loops = [r for r in records if isinstance(r, binlog.Trace)
+                 and r.kind == 'loop']
+        bridges = [r for r in records if isinstance(r, binlog.Trace)
+                   and r.kind == 'bridge']
+        failures = [r for r in records if isinstance(r, binlog.GuardFailure)]
+        assert len(loops) == 1
+        assert loops[0].type == 'loop'
+        assert loops[0].inputargs == ['i0', 'i1']
+        opnames = [op.name for op in loops[0].operations]
+        assert opnames[0] == 'label'
+        assert opnames[-1] == 'jump'
+        assert 'int_lt' in opnames
+        guards = [op for op in loops[0].operations if op.is_guard()]
+        assert guards
+        assert guards[0].failargs
+        #
+        # the bridge is attached to a guard of the loop, which has failed
+        # before the bridge was compiled
+        assert len(bridges) == 1
+        assert bridges[0].number in [op.guard_id() for op in guards]
+        counts = dict([(r.guard, r.count) for r in failures])
+        assert counts[bridges[0].number] == 2
+        # the exits of the loop and of the bridge failed once, without
+        # getting a bridge
+        del counts[bridges[0].number]
+        assert counts.values() == [1, 1]
+        #
+        summary = binlog.Summary()
+        for record in records:
+            summary.add(record)
+        assert summary.loops[loops[0].number].guard_failures >= 2
+        assert summary.loops[loops[0].number].bridges == 1
+
+    def test_guard_class_histogram(self):
+        myjitdriver = JitDriver(greens = [], reds = ['x', 'res'])
+        class A(object):
+            def g(self):
+                return 1
+        class B(A):
+            def g(self):
+                return 2
+        l = [A()] * 10 + [B()] * 10
+        def f(x):
+            res = 0
+            while x > 0:
+                myjitdriver.can_enter_jit(x=x, res=res)
+                myjitdriver.jit_merge_point(x=x, res=res)
+                x -= 1
+                res += l[x].g()
+            return res
+        records = self.meta_interp_with_jitlog(f, [len(l)])
+        histograms = [r for r in records
+                      if isinstance(r, binlog.GuardHistogram)]
+        assert histograms
+        index = records.index(histograms[0])
+        bridge = records[index + 1]
+        assert isinstance(bridge, binlog.Trace)
+        assert bridge.kind == 'bridge'
+        assert bridge.number == histograms[0].guard
+        assert histograms[0].is_class
+        [(value, count, name)] = histograms[0].entries
+        assert count == 2      # trace_eagerness
+        assert name == ''      # only known after translation
+
+    def test_disabled(self):
+        myjitdriver = JitDriver(greens = [], reds = ['n'])
+        def f(n):
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n)
+                n -= 1
+            return n
+        from rpython.jit.metainterp import pyjitpl
+        self.meta_interp(f, [10])
+        assert not pyjitpl._warmrunnerdesc.metainterp_sd.jitlog.enabled
@@ -15,12 +15,42 @@ from rpython.jit.metainterp.memmgr import MemoryManager
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.rlib.jit import JitDriver, dont_look_inside
 from rpython.jit.metainterp.warmspot import get_stats
+from rpython.jit.metainterp import pyjitpl
 from rpython.jit.metainterp.warmstate import BaseJitCell
 from rpython.rlib import rgc
 
 class FakeLoopToken:
     generation = 0
+    invocations = 0
     invalidated = False
+    compiled_loop_token = None
+
+class FakeTracker:
+    total_code_size = 0
+    total_evicted_loops = 0
+
+class FakeCPU:
+    def __init__(self):
+        self.tracker = FakeTracker()
+
+class FakeCompiledLoopToken:
+    code_size = 0
+
+    def __init__(self, cpu, size):
+        self.cpu = cpu
+        self.size = size
+
+    def update_code_size(self):
+        self.cpu.tracker.total_code_size += self.size - self.code_size
+        self.code_size = self.size
+
+def compile_fake_loop(memmgr, cpu, size):
+    token = FakeLoopToken()
+    token.compiled_loop_token = FakeCompiledLoopToken(cpu, size)
+    memmgr.keep_loop_alive(token)
+    memmgr.record_code_size(token)
+    memmgr.next_generation()
+    return token
 
 
 class _TestMemoryManager:
@@ -78,6 +108,83 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_memory_budget_disabled(self):
+        memmgr = MemoryManager()
+        cpu = FakeCPU()
+        tokens = [compile_fake_loop(memmgr, cpu, 100) for i in range(10)]
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        assert memmgr.alive_code_size == 1000
+        assert cpu.tracker.total_code_size == 1000
+
+    def test_memory_budget_basic(self):
+        memmgr = MemoryManager()
+        memmgr.set_memory_budget(250)
+        cpu = FakeCPU()
+        token0 = compile_fake_loop(memmgr, cpu, 100)
+        token1 = compile_fake_loop(memmgr, cpu, 100)
+        for i in range(10):
+            memmgr.keep_loop_alive(token0)
+        memmgr.next_generation()
+        token2 = compile_fake_loop(memmgr, cpu, 100)
+        # token1 was never entered again, so it goes away first
+        assert memmgr.alive_loops == dict.fromkeys([token0, token2])
+        assert memmgr.alive_code_size == 200
+        assert cpu.tracker.total_evicted_loops == 1
+        # the counter of token0 was aged but it is still non-zero
+        assert 0 < token0.invocations < 11
+
+    def test_memory_budget_aging(self):
+        memmgr = MemoryManager()
+        memmgr.set_memory_budget(150)
+        cpu = FakeCPU()
+        token0 = compile_fake_loop(memmgr, cpu, 100)
+        for i in range(1000):
+            memmgr.keep_loop_alive(token0)
+        memmgr.next_generation()
+        # a loop that was hot a long time ago is still evicted eventually,
+        # but not the one that was just compiled
+        token1 = compile_fake_loop(memmgr, cpu, 100)
+        assert memmgr.alive_loops == {token1: None}
+        assert memmgr.alive_code_size == 100
+        assert cpu.tracker.total_evicted_loops == 1
+
+    def test_memory_budget_invalidated_first(self):
+        memmgr = MemoryManager()
+        memmgr.set_memory_budget(250)
+        cpu = FakeCPU()
+        token0 = compile_fake_loop(memmgr, cpu, 100)
+        token1 = compile_fake_loop(memmgr, cpu, 100)
+        for i in range(10):
+            memmgr.keep_loop_alive(token1)
+        memmgr.next_generation()
+        token1.invalidated = True
+        token2 = compile_fake_loop(memmgr, cpu, 100)
+        assert memmgr.alive_loops == dict.fromkeys([token0, token2])
+        assert cpu.tracker.total_evicted_loops == 0
+
+    def test_memory_budget_bridge(self):
+        memmgr = MemoryManager()
+        memmgr.set_memory_budget(250)
+        cpu = FakeCPU()
+        token0 = compile_fake_loop(memmgr, cpu, 100)
+        token1 = compile_fake_loop(memmgr, cpu, 100)
+        memmgr.next_generation()
+        # attaching a bridge to token0 makes it bigger, but it is the
+        # other loop that is evicted
+        token0.compiled_loop_token.size = 200
+        memmgr.record_code_size(token0)
+        assert memmgr.alive_loops == {token0: None}
+        assert memmgr.alive_code_size == 200
+        assert cpu.tracker.total_code_size == 300
+
+    def test_kill_old_loops_updates_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(4, 1)
+        cpu = FakeCPU()
+        tokens = [compile_fake_loop(memmgr, cpu, 100) for i in range(10)]
+        assert memmgr.alive_loops == dict.fromkeys(tokens[7:])
+        assert memmgr.alive_code_size == 300
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
@@ -185,6 +292,33 @@ class _TestIntegration(LLJitMixin):
         assert res == 42
         self.check_enter_count(2 + 10*4)
 
+    def test_memory_budget(self):
+        myjitdriver = JitDriver(greens=['m'], reds=['n'])
+        def g(m):
+            n = 10
+            while n > 0:
+                myjitdriver.can_enter_jit(n=n, m=m)
+                myjitdriver.jit_merge_point(n=n, m=m)
+                n = n - 1
+            return 21
+        def f():
+            for i in range(10):
+                g(1)   # g(1) is entered very often and stays alive
+                g(1)
+                g(1)
+                g(1)
+                g(i + 2)   # the other loops are thrown away
+            return 42
+
+        # with the llgraph backend, the code size is the number of operations
+        res = self.meta_interp(f, [], loop_memory_budget=100)
+        assert res == 42
+        tracker = pyjitpl._warmrunnerdesc.cpu.tracker
+        assert tracker.total_evicted_loops > 0
+        tokens = [t() for t in get_stats().jitcell_token_wrefs]
+        assert None in tokens
+        assert tokens[0] is not None
+
     def test_call_assembler_keep_alive(self):
         myjitdriver1 = JitDriver(greens=['m'], reds=['n'])
         myjitdriver2 = JitDriver(greens=['m'], reds=['n', 'rec'])
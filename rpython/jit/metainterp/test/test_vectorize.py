@@ -0,0 +1,104 @@
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.rlib.jit import JitDriver
+from rpython.rlib.rawstorage import (alloc_raw_storage, raw_storage_setitem,
+                                     free_raw_storage, raw_storage_getitem)
+from rpython.rtyper.lltypesystem import lltype
+
+
+class VectorizeTests:
+    # most arrays below are parts of a single storage, so that the tests
+    # can choose how they overlap
+
+    def make_add_loop(self):
+        myjitdriver = JitDriver(greens=[], reds=['i', 'n', 'src', 'dst', 'p'])
+        def f(n, src, dst):
+            p = alloc_raw_storage(3 * n * 8 + 8)
+            for i in range(3 * n + 1):
+                raw_storage_setitem(p, i * 8, float(i % 7))
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point(i=i, n=n, p=p, src=src, dst=dst)
+                x = raw_storage_getitem(lltype.Float, p, (src + i) * 8)
+                y = raw_storage_getitem(lltype.Float, p, (n + i) * 8)
+                raw_storage_setitem(p, (dst + i) * 8, x + y)
+                i += 1
+            res = 0.0
+            for i in range(3 * n + 1):
+                res = res * 0.5 + raw_storage_getitem(lltype.Float, p, i * 8)
+            free_raw_storage(p)
+            return res
+        return f
+
+    def test_add_arrays(self):
+        f = self.make_add_loop()
+        for n in [20, 21]:
+            res = self.meta_interp(f, [n, 0, 2 * n], enable_opts='all:vec')
+            assert res == f(n, 0, 2 * n)
+        self.check_resops(vec_raw_float_add=1, float_add=1)
+
+    def test_not_enabled(self):
+        f = self.make_add_loop()
+        res = self.meta_interp(f, [20, 0, 40])
+        assert res == f(20, 0, 40)
+        self.check_resops(vec_raw_float_add=0)
+
+    def test_overlapping_arrays(self):
+        # dst[i] depends on the value stored at dst[i - 1] by the previous
+        # iteration: the check at the start of the vectorized loop fails
+        # every time and we have to run the scalar code
+        f = self.make_add_loop()
+        for n in [20, 21]:
+            res = self.meta_interp(f, [n, 2 * n, 2 * n + 1],
+                                   enable_opts='all:vec')
+            assert res == f(n, 2 * n, 2 * n + 1)
+
+    def test_separate_arrays(self):
+        myjitdriver = JitDriver(greens=[], reds=['i', 'n', 'a', 'b', 'c'])
+        def f(n):
+            a = alloc_raw_storage(n * 8)
+            b = alloc_raw_storage(n * 8)
+            c = alloc_raw_storage(n * 8)
+            for i in range(n):
+                raw_storage_setitem(a, i * 8, float(i))
+                raw_storage_setitem(b, i * 8, float(i % 5))
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point(i=i, n=n, a=a, b=b, c=c)
+                x = raw_storage_getitem(lltype.Float, a, i * 8)
+                y = raw_storage_getitem(lltype.Float, b, i * 8)
+                raw_storage_setitem(c, i * 8, x * y)
+                i += 1
+            res = 0.0
+            for i in range(n):
+                res = res * 0.5 + raw_storage_getitem(lltype.Float, c, i * 8)
+            free_raw_storage(a)
+            free_raw_storage(b)
+            free_raw_storage(c)
+            return res
+        for n in [20, 21]:
+            res = self.meta_interp(f, [n], enable_opts='all:vec')
+            assert res == f(n)
+        self.check_resops(vec_raw_float_mul=1, float_mul=1)
+
+    def test_reduction_not_vectorized(self):
+        myjitdriver = JitDriver(greens=[], reds=['i', 'n', 'p', 's'])
+        def f(n):
+            p = alloc_raw_storage(n * 8)
+            for i in range(n):
+                raw_storage_setitem(p, i * 8, float(i))
+            i = 0
+            s = 0.0
+            while i < n:
+                myjitdriver.jit_merge_point(i=i, n=n, p=p, s=s)
+                s += raw_storage_getitem(lltype.Float, p, i * 8)
+                raw_storage_setitem(p, i * 8, s)
+                i += 1
+            free_raw_storage(p)
+            return s
+        res = self.meta_interp(f, [20], enable_opts='all:vec')
+        assert res == f(20)
+        self.check_resops(vec_raw_float_add=0)
+
+
+class TestLLtype(VectorizeTests, LLJitMixin):
+    pass
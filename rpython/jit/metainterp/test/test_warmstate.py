@@ -3,10 +3,11 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, rstr, rffi
 from rpython.rtyper.annlowlevel import llhelper
 from rpython.jit.metainterp.warmstate import wrap, unwrap, specialize_value
 from rpython.jit.metainterp.warmstate import equal_whatever, hash_whatever
-from rpython.jit.metainterp.warmstate import WarmEnterState
+from rpython.jit.metainterp.warmstate import WarmEnterState, JC_TRACE_SOON
 from rpython.jit.metainterp.history import BoxInt, BoxFloat, BoxPtr
 from rpython.jit.metainterp.history import ConstInt, ConstFloat, ConstPtr
 from rpython.jit.metainterp.counter import DeterministicJitCounter
+from rpython.jit.metainterp.counter import JitCounter
 from rpython.jit.codewriter import longlong
 from rpython.rlib.rarithmetic import r_singlefloat
 
@@ -187,3 +188,31 @@ def test_make_jitdriver_callbacks_5():
     state.make_jitdriver_callbacks()
     res = state.can_never_inline(5, 42.5)
     assert res is True
+
+def test_trace_next_iteration_at_sets_a_flag():
+    class FakeWarmRunnerDesc:
+        cpu = None
+        memory_manager = None
+        jitcounter = JitCounter(size=4)
+    class FakeJitDriverSD:
+        jitdriver = None
+        _green_args_spec = [lltype.Signed]
+        _get_printable_location_ptr = None
+        _confirm_enter_jit_ptr = None
+        _can_never_inline_ptr = None
+        _should_unroll_one_iteration_ptr = None
+        red_args_types = []
+    state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
+    JitCell = state.make_jitcell_subclass()
+    jc = FakeWarmRunnerDesc.jitcounter
+    JitCell.trace_next_iteration_at(5)
+    cell = JitCell.get_jitcell(5)
+    assert cell.flags == JC_TRACE_SOON
+    # the counter itself is not touched, so it cannot decay...
+    incr = jc.compute_threshold(4)
+    assert not jc.tick(JitCell.get_uhash(5), incr)
+    # ...and the mark survives other cells installed in the same slot
+    for i in range(6, 50):
+        jc.install_new_cell(JitCell.get_uhash(i), JitCell(i))
+    assert JitCell.get_jitcell(5) is cell
+    assert cell.flags == JC_TRACE_SOON
@@ -67,8 +67,8 @@ def ll_meta_interp(function, args, backendopt=False, type_system='lltype',
 
 def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
                     backendopt=False, trace_limit=sys.maxint,
-                    inline=False, loop_longevity=0, retrace_limit=5,
-                    function_threshold=4,
+                    inline=False, loop_longevity=0, loop_memory_budget=0,
+                    retrace_limit=5, function_threshold=4,
                     enable_opts=ALL_OPTS_NAMES, max_retrace_guards=15, 
                     max_unroll_recursion=7, **kwds):
     from rpython.config.config import ConfigError
@@ -89,6 +89,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_trace_limit(trace_limit)
         jd.warmstate.set_param_inlining(inline)
         jd.warmstate.set_param_loop_longevity(loop_longevity)
+        jd.warmstate.set_param_loop_memory_budget(loop_memory_budget)
         jd.warmstate.set_param_retrace_limit(retrace_limit)
         jd.warmstate.set_param_max_retrace_guards(max_retrace_guards)
         jd.warmstate.set_param_enable_opts(enable_opts)
@@ -99,6 +100,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
     res = interp.eval_graph(graph, args)
     if not kwds.get('translate_support_code', False):
         warmrunnerdesc.metainterp_sd.profiler.finish()
+        warmrunnerdesc.metainterp_sd.jitlog.finish()
         warmrunnerdesc.metainterp_sd.cpu.finish_once()
     print '~~~ return value:', repr(res)
     while repeat > 1:
@@ -144,6 +146,9 @@ def find_jit_merge_points(graphs):
 def find_access_helpers(graphs):
     return _find_jit_marker(graphs, 'access_helper', False)
 
+def find_trace_next_iteration(graphs):
+    return _find_jit_marker(graphs, 'trace_next_iteration', False)
+
 def locate_jit_merge_point(graph):
     [(graph, block, pos)] = find_jit_merge_points([graph])
     return block, pos, block.operations[pos]
@@ -173,6 +178,11 @@ def reset_jit():
     pyjitpl._warmrunnerdesc.memory_manager.alive_loops.clear()
     pyjitpl._warmrunnerdesc.jitcounter._clear_all()
 
+def set_enable_opts(enable_opts):
+    """Helper for some tests (see micronumpy/test/test_zjit.py)"""
+    for jd in pyjitpl._warmrunnerdesc.jitdrivers_sd:
+        jd.warmstate.set_param_enable_opts(enable_opts)
+
 def get_translator():
     return pyjitpl._warmrunnerdesc.translator
 
@@ -228,6 +238,7 @@ class WarmRunnerDesc(object):
 
         verbose = False # not self.cpu.translate_support_code
         self.rewrite_access_helpers()
+        self.rewrite_trace_next_iteration()
         self.codewriter.make_jitcodes(verbose=verbose)
         self.rewrite_can_enter_jits()
         self.rewrite_set_param_and_get_stats()
@@ -697,6 +708,29 @@ class WarmRunnerDesc(object):
         op.opname = 'direct_call'
         op.args = [Constant(ptr, FUNCPTR)] + op.args[2:]
 
+    def rewrite_trace_next_iteration(self):
+        closures = {}
+        for graph, block, index in find_trace_next_iteration(
+                self.translator.graphs):
+            op = block.operations[index]
+            jitdriver_name = op.args[1].value
+            for jd in self.jitdrivers_sd:
+                if jd.jitdriver.name == jitdriver_name:
+                    break
+            else:
+                raise Exception("trace_next_iteration(): no JitDriver "
+                                "called %r" % (jitdriver_name,))
+            ARGS = [v.concretetype for v in op.args[2:]]
+            FUNCPTR = lltype.Ptr(lltype.FuncType(ARGS, lltype.Void))
+            key = jd, FUNCPTR
+            if key not in closures:
+                JitCell = jd.warmstate.make_jitcell_subclass()
+                func = JitCell.trace_next_iteration_at
+                closures[key] = Constant(self.helper_func(FUNCPTR, func),
+                                         FUNCPTR)
+            op.opname = 'direct_call'
+            op.args = [closures[key]] + op.args[2:]
+
     def rewrite_jit_merge_points(self, policy):
         for jd in self.jitdrivers_sd:
             self.rewrite_jit_merge_point(jd, policy)
@@ -919,6 +953,7 @@ class WarmRunnerDesc(object):
         def finish():
             if self.metainterp_sd.profiler.initialized:
                 self.metainterp_sd.profiler.finish()
+            self.metainterp_sd.jitlog.finish()
             self.metainterp_sd.cpu.finish_once()
 
         if self.cpu.translate_support_code:
@@ -128,6 +128,8 @@ JC_TRACING         = 0x01
 JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
+JC_COMPILE_PENDING = 0x10
+JC_TRACE_SOON      = 0x20
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -174,9 +176,21 @@ class BaseJitCell(object):
         this particular function.  (We only set this flag when aborting
         due to a trace too long, so we use the same flag as a hint to
         also mean "please trace from here as soon as possible".)
+
+        JC_COMPILE_PENDING: a loop starting here was traced, but its
+        compilation was deferred (see the 'defer_compilation' parameter).
+        Don't trace it again until it is compiled.  The compile.PendingLoop
+        is in 'pending_loop'.
+
+        JC_TRACE_SOON: set by jit_hooks.trace_next_iteration().  The
+        next time this greenkey is reached, its counter starts close to
+        the threshold, so that it is traced after a few iterations.  It
+        is a flag rather than a counter value because the hook is often
+        called long before the loop runs, and counters decay.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
+    pending_loop = None
     next = None
 
     def get_procedure_token(self):
@@ -203,7 +217,7 @@ class BaseJitCell(object):
     def should_remove_jitcell(self):
         if self.get_procedure_token() is not None:
             return False    # don't remove JitCells with a procedure_token
-        if self.flags & JC_TRACING:
+        if self.flags & (JC_TRACING | JC_COMPILE_PENDING | JC_TRACE_SOON):
             return False    # don't remove JitCells that are being traced
         if self.flags & JC_DONT_TRACE_HERE:
             # if we have this flag, and we *had* a procedure_token but
@@ -257,6 +271,7 @@ class WarmEnterState(object):
 
     def set_param_enable_opts(self, value):
         from rpython.jit.metainterp.optimizeopt import ALL_OPTS_DICT, ALL_OPTS_NAMES
+        from rpython.jit.metainterp.optimizeopt import OPTIONAL_OPTS_DICT
 
         d = {}
         if NonConstant(False):
@@ -264,8 +279,11 @@ class WarmEnterState(object):
         if value is None or value == 'all':
             value = ALL_OPTS_NAMES
         for name in value.split(":"):
-            if name:
-                if name not in ALL_OPTS_DICT:
+            if name == 'all':
+                for name1 in ALL_OPTS_NAMES.split(":"):
+                    d[name1] = None
+            elif name:
+                if name not in ALL_OPTS_DICT and name not in OPTIONAL_OPTS_DICT:
                     raise ValueError('Unknown optimization ' + name)
                 d[name] = None
         self.enable_opts = d
@@ -276,6 +294,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_loop_memory_budget(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_memory_budget(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -296,6 +320,9 @@ class WarmEnterState(object):
             if self.warmrunnerdesc.memory_manager:
                 self.warmrunnerdesc.memory_manager.max_unroll_recursion = value
 
+    def set_param_defer_compilation(self, value):
+        self.defer_compilation = value
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -304,6 +331,16 @@ class WarmEnterState(object):
         debug_print("disabled inlining", loc)
         debug_stop("jit-disableinlining")
 
+    def set_compile_pending(self, greenkey, pending):
+        """Record the PendingLoop traced from 'greenkey', or clear it if
+        'pending' is None."""
+        cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
+        cell.pending_loop = pending
+        if pending is not None:
+            cell.flags |= JC_COMPILE_PENDING
+        else:
+            cell.flags &= ~JC_COMPILE_PENDING
+
     def attach_procedure_to_interp(self, greenkey, procedure_token):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         old_token = cell.get_procedure_token()
@@ -412,15 +449,36 @@ class WarmEnterState(object):
 
             # Here, we have found 'cell'.
             #
-            if cell.flags & (JC_TRACING | JC_TEMPORARY):
+            if cell.flags & JC_TRACE_SOON:
+                # first time we reach a greenkey marked by
+                # trace_next_iteration_at(): start counting from close to
+                # the threshold.  Drop the cell unless it holds other flags.
+                cell.flags &= ~JC_TRACE_SOON
+                if cell.flags == 0 and not cell.has_seen_a_procedure_token():
+                    jitcounter.install_new_cell(hash, None)
+                    jitcounter.change_current_fraction(hash, 0.98)
+                    if jitcounter.tick(hash, increment_threshold):
+                        bound_reached(hash, None, *args)
+                    return
+            if cell.flags & (JC_TRACING | JC_TEMPORARY | JC_COMPILE_PENDING):
                 if cell.flags & JC_TRACING:
                     # tracing already happening in some outer invocation of
                     # this function. don't trace a second time.
                     return
-                # attached by compile_tmp_callback().  count normally
-                if jitcounter.tick(hash, increment_threshold):
-                    bound_reached(hash, cell, *args)
-                return
+                if not (cell.flags & JC_COMPILE_PENDING):
+                    # attached by compile_tmp_callback().  count normally
+                    if jitcounter.tick(hash, increment_threshold):
+                        bound_reached(hash, cell, *args)
+                    return
+                # the loop traced from here waits to be compiled: don't
+                # trace it again.  If it gets hot again, we are outside
+                # the metainterp, so compile it now and run it; the other
+                # pending loops stay queued
+                if not jitcounter.tick(hash, increment_threshold):
+                    return
+                metainterp_sd.compile_pending_loop(cell.pending_loop)
+                if cell.flags & JC_COMPILE_PENDING:
+                    return    # we are inside compile_pending_loops()
             # machine code was already compiled for these greenargs
             procedure_token = cell.get_procedure_token()
             if procedure_token is None:
@@ -543,9 +601,21 @@ class WarmEnterState(object):
                 hash = JitCell.get_uhash(*greenargs)
                 jitcounter.change_current_fraction(hash, 0.98)
 
+            @staticmethod
+            def trace_next_iteration_at(*greenargs):
+                # unlike trace_next_iteration(), this is called from
+                # jit_hooks, possibly long before the greenkey is reached
+                cell = JitCell.ensure_jit_cell_at(*greenargs)
+                if cell.get_procedure_token() is None:
+                    cell.flags |= JC_TRACE_SOON
+
             @staticmethod
             def ensure_jit_cell_at_key(greenkey):
                 greenargs = unwrap_greenkey(greenkey)
+                return JitCell.ensure_jit_cell_at(*greenargs)
+
+            @staticmethod
+            def ensure_jit_cell_at(*greenargs):
                 hash = JitCell.get_uhash(*greenargs)
                 cell = jitcounter.lookup_chain(hash)
                 while cell is not None:
@@ -84,6 +84,13 @@ class SubBuffer(Buffer):
 
     def __init__(self, buffer, offset, size):
         self.readonly = buffer.readonly
+        if (isinstance(buffer, SubBuffer) and size >= 0 and
+                offset + size <= buffer.getlength()):
+            # a slice of a slice is made directly on the underlying
+            # buffer, so that slicing repeatedly doesn't build chains
+            # of SubBuffers
+            offset += buffer.offset
+            buffer = buffer.buffer
         self.buffer = buffer
         self.offset = offset
         self.size = size
@@ -458,12 +458,19 @@ PARAMETER_DOCS = {
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'loop_memory_budget': 'the number of bytes of compiled code kept alive before the least recently used loops are freed (0 = no limit)',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
     'max_unroll_loops': 'number of extra unrollings a loop can cause',
     'enable_opts': 'INTERNAL USE ONLY (MAY NOT WORK OR LEAD TO CRASHES): '
-                   'optimizations to enable, or all = %s' % ENABLE_ALL_OPTS,
-    'max_unroll_recursion': 'how many levels deep to unroll a recursive function'
+                   'optimizations to enable, or all = %s; the optional '
+                   '"vec" (vectorize raw float array loops) is never part of '
+                   'all and must be listed explicitly, as in "all:vec"'
+                   % ENABLE_ALL_OPTS,
+    'max_unroll_recursion': 'how many levels deep to unroll a recursive function',
+    'defer_compilation': 'if 1, new loops are only traced, and optimized and '
+                         'assembled later, when they get hot again or by '
+                         'compile_pending() (0 = compile them immediately)',
     }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -473,11 +480,13 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_limit': 6000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'loop_memory_budget': 0,
               'retrace_limit': 5,
               'max_retrace_guards': 15,
               'max_unroll_loops': 0,
               'enable_opts': 'all',
               'max_unroll_recursion': 7,
+              'defer_compilation': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -913,11 +922,17 @@ class JitDebugInfo(object):
     looptoken - description of a loop
     fail_descr - fail descr or None
     asminfo - extra assembler information
+    tracing_time - seconds spent tracing, before optimizing
+    optimizing_time - seconds spent in the optimizer
+    backend_time - seconds spent in the backend (only known after compiling)
+    num_guards - number of guards in the optimized operations
     """
 
     asminfo = None
+    backend_time = 0.0
     def __init__(self, jitdriver_sd, logger, looptoken, operations, type,
-                 greenkey=None, fail_descr=None):
+                 greenkey=None, fail_descr=None, tracing_time=0.0,
+                 optimizing_time=0.0):
         self.jitdriver_sd = jitdriver_sd
         self.logger = logger
         self.looptoken = looptoken
@@ -929,6 +944,13 @@ class JitDebugInfo(object):
             assert greenkey is not None
         self.greenkey = greenkey
         self.fail_descr = fail_descr
+        self.tracing_time = tracing_time
+        self.optimizing_time = optimizing_time
+        num_guards = 0
+        for op in operations:
+            if op.is_guard():
+                num_guards += 1
+        self.num_guards = num_guards
 
     def get_jitdriver(self):
         """ Return where the jitdriver on which the jitting started
@@ -1064,6 +1086,8 @@ class Counters(object):
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
     TOTAL_FREED_BRIDGES
+    TOTAL_EVICTED_LOOPS
+    TOTAL_CODE_SIZE
     """
 
     counter_names = []
@@ -1,4 +1,5 @@
 from rpython.annotator import model as annmodel
+from rpython.flowspace.model import Constant
 from rpython.rtyper.llannotation import SomePtr, lltype_to_annotation
 from rpython.rlib.objectmodel import specialize
 from rpython.rtyper.annlowlevel import (cast_instance_to_base_ptr,
@@ -132,6 +133,10 @@ def stats_get_counter_value(warmrunnerdesc, no):
 def stats_get_times_value(warmrunnerdesc, no):
     return warmrunnerdesc.metainterp_sd.profiler.times[no]
 
+@register_helper(annmodel.SomeInteger())
+def stats_compile_pending(warmrunnerdesc, max_loops):
+    return warmrunnerdesc.metainterp_sd.compile_pending_loops(max_loops)
+
 LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
                                                   ('type', lltype.Char),
                                                   ('number', lltype.Signed),
@@ -140,3 +145,33 @@ LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
 @register_helper(lltype.Ptr(LOOP_RUN_CONTAINER))
 def stats_get_loop_run_times(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.get_all_loop_runs()
+
+# ------------------------- warmup interface --------------------------
+
+def _new_hook(name, s_result):
+    def hook(jitdriver_name, *greenargs):
+        pass     # no effect when not jitted
+    hook.func_name = name
+
+    class Entry(ExtRegistryEntry):
+        _about_ = hook
+
+        def compute_result_annotation(self, s_jitdriver_name, *args_s):
+            assert s_jitdriver_name.is_constant()
+            return s_result
+
+        def specialize_call(self, hop):
+            c_name = hop.inputconst(lltype.Void, name)
+            c_jitdriver_name = Constant(hop.args_s[0].const,
+                                        concretetype=lltype.Void)
+            args_v = [hop.inputarg(arg, arg=i + 1)
+                      for i, arg in enumerate(hop.args_r[1:])]
+            hop.exception_cannot_occur()
+            return hop.genop('jit_marker', [c_name, c_jitdriver_name] + args_v,
+                             resulttype=hop.r_result)
+    return hook
+
+# trace_next_iteration('name', *greenargs): make the JitDriver called 'name'
+# start tracing soon the next time it reaches the given green key, as if
+# it had already been seen close to 'threshold' times.
+trace_next_iteration = _new_hook('trace_next_iteration', annmodel.s_None)
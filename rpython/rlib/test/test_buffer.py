@@ -32,3 +32,21 @@ def test_len_nonneg():
     a = RPythonAnnotator()
     s = a.build_types(func, [int])
     assert s == SomeInteger(nonneg=True)
+
+
+def test_sub_buffer():
+    buf = SubBuffer(StringBuffer('hello world'), 2, 7)
+    assert buf.getlength() == 7
+    assert buf.as_str() == 'llo wor'
+    sub = SubBuffer(buf, 1, 4)
+    assert sub.buffer is buf.buffer
+    assert sub.offset == 3
+    assert sub.as_str() == 'lo w'
+    assert sub.getitem(3) == 'w'
+    # not entirely inside 'buf': keeps the limits of 'buf'
+    sub = SubBuffer(buf, 4, 10)
+    assert sub.buffer is buf
+    assert sub.as_str() == 'wor'
+    sub = SubBuffer(buf, 4, -1)
+    assert sub.buffer is buf
+    assert sub.as_str() == 'wor'
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+""" Streaming reader for the binary jitlog (see rpython/jit/metainterp/jitlog.py)
+Usage:
+
+binlog.py [--top=N] <jitlog>
+
+Prints a summary of the loops, bridges and guards found in the log.  The
+records are decoded one at a time, and the summary only keeps a few
+counters per loop and per guard, so that even huge logs can be
+aggregated in bounded memory.
+"""
+
+import sys
+import struct
+
+MAGIC = 'JITL'
+VERSION = '\x01'
+
+MARK_LOOP = '\x10'
+MARK_BRIDGE = '\x11'
+MARK_GUARD_FAILURE = '\x20'
+MARK_ENTRY_COUNT = '\x21'
+MARK_GUARD_HISTOGRAM = '\x22'
+
+
+class JitLogError(Exception):
+    pass
+
+
+class Op(object):
+    def __init__(self, opnum, offset, name, result, args, descr, failargs):
+        self.opnum = opnum
+        self.offset = offset
+        self.name = name
+        self.result = result
+        self.args = args
+        self.descr = descr
+        self.failargs = failargs
+
+    def is_guard(self):
+        return self.descr.startswith('<Guard0x')
+
+    def guard_id(self):
+        assert self.is_guard()
+        return int(self.descr[len('<Guard0x'):-1], 16)
+
+    def __str__(self):
+        # the same format as jit-log-opt
+        if self.name == 'debug_merge_point':
+            return "debug_merge_point(%s, %s, '%s')" % (
+                self.args[0], self.args[1], self.args[2].replace(',', '.'))
+        if self.name == 'jit_debug':
+            return "jit_debug('%s'%s)" % (
+                self.args[0].replace(',', '.'),
+                ''.join([', ' + arg for arg in self.args[1:]]))
+        s = ''
+        if self.offset != -1:
+            s += '+%d: ' % self.offset
+        if self.result:
+            s += self.result + ' = '
+        args = list(self.args)
+        if self.descr:
+            args.append('descr=' + self.descr)
+        s += '%s(%s)' % (self.name, ', '.join(args))
+        if self.is_guard():
+            s += ' [' + ', '.join(self.failargs) + ']'
+        return s
+
+
+class Trace(object):
+    """ A loop (kind == 'loop') or a bridge (kind == 'bridge').  For a
+    bridge, 'number' is the guard id it is attached to.
+    """
+    def __init__(self, kind, number, type, name, inputargs, operations):
+        self.kind = kind
+        self.number = number
+        self.type = type
+        self.name = name
+        self.inputargs = inputargs
+        self.operations = operations
+
+
+class GuardFailure(object):
+    def __init__(self, guard, count):
+        self.guard = guard
+        self.count = count
+
+
+class GuardHistogram(object):
+    """ The values with which a guard_value failed, or the classes with
+    which a guard_class failed, before getting a bridge: 'entries' is a
+    list of (value, count, name), the most frequent first.
+    """
+    def __init__(self, guard, is_class, entries):
+        self.guard = guard
+        self.is_class = is_class
+        self.entries = entries
+
+
+class EntryCount(object):
+    """ 'kind' is 'e' (loop entry), 'l' (label, 'number' is the unique
+    id of the TargetToken) or 'b' (bridge, 'number' is the guard id).
+    """
+    def __init__(self, kind, number, count):
+        self.kind = kind
+        self.number = number
+        self.count = count
+
+
+class Reader(object):
+    def __init__(self, f):
+        self.f = f
+        header = self._read(len(MAGIC) + len(VERSION) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise JitLogError("not a binary jitlog")
+        if header[len(MAGIC):-1] != VERSION:
+            raise JitLogError("unsupported jitlog version %r" %
+                              (header[len(MAGIC):-1],))
+        self.word_mask = (1 << (8 * ord(header[-1]))) - 1
+
+    def _read(self, size):
+        data = self.f.read(size)
+        if len(data) != size:
+            raise JitLogError("truncated jitlog")
+        return data
+
+    def read_int(self):
+        return struct.unpack('<q', self._read(8))[0]
+
+    def read_guard_id(self):
+        # as printed in <Guard0x...>
+        return self.read_int() & self.word_mask
+
+    def read_str(self):
+        return self._read(self.read_int())
+
+    def read_str_list(self):
+        return [self.read_str() for i in range(self.read_int())]
+
+    def read_trace(self, kind, number, type, name):
+        inputargs = self.read_str_list()
+        operations = []
+        for i in range(self.read_int()):
+            opnum = self.read_int()
+            offset = self.read_int()
+            opname = self.read_str()
+            result = self.read_str()
+            args = self.read_str_list()
+            descr = self.read_str()
+            failargs = self.read_str_list()
+            operations.append(Op(opnum, offset, opname, result, args, descr,
+                                 failargs))
+        return Trace(kind, number, type, name, inputargs, operations)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        mark = self.f.read(1)
+        if not mark:
+            raise StopIteration
+        if mark == MARK_LOOP:
+            number = self.read_int()
+            type = self.read_str()
+            name = self.read_str()
+            return self.read_trace('loop', number, type, name)
+        elif mark == MARK_BRIDGE:
+            return self.read_trace('bridge', self.read_guard_id(),
+                                   'bridge', '')
+        elif mark == MARK_GUARD_FAILURE:
+            guard = self.read_guard_id()
+            return GuardFailure(guard, self.read_int())
+        elif mark == MARK_GUARD_HISTOGRAM:
+            guard = self.read_guard_id()
+            is_class = bool(self.read_int())
+            entries = []
+            for i in range(self.read_int()):
+                value = self.read_int()
+                count = self.read_int()
+                entries.append((value, count, self.read_str()))
+            return GuardHistogram(guard, is_class, entries)
+        elif mark == MARK_ENTRY_COUNT:
+            kind = self._read(1)
+            number = self.read_int()
+            if kind != 'l':
+                number &= self.word_mask
+            return EntryCount(kind, number, self.read_int())
+        else:
+            raise JitLogError("unknown record %r at offset %d" %
+                              (mark, self.f.tell() - 1))
+
+
+def iter_records(filename):
+    """ Yield the records of the given jitlog one by one.
+    """
+    f = open(filename, 'rb')
+    try:
+        for record in Reader(f):
+            yield record
+    finally:
+        f.close()
+
+# ____________________________________________________________
+
+class TraceSummary(object):
+    def __init__(self, trace):
+        self.kind = trace.kind
+        self.number = trace.number
+        self.type = trace.type
+        self.name = trace.name
+        self.num_ops = len(trace.operations)
+        self.num_guards = 0
+        self.entries = 0         # 'e' or 'b' counters
+        self.iterations = 0      # 'l' counters
+        self.guard_failures = 0  # of the guards without a bridge
+        self.bridges = 0
+
+
+class Summary(object):
+    """ Aggregates the records of a jitlog, keeping only a few counters
+    per loop and per guard.
+    """
+    def __init__(self):
+        self.loops = {}          # loop number -> TraceSummary
+        self.bridges = {}        # guard id -> TraceSummary
+        self.guard_owner = {}    # guard id -> TraceSummary
+        self.label_owner = {}    # TargetToken id -> TraceSummary
+        self.guard_failures = {} # guard id -> count
+        self.histograms = {}     # guard id -> GuardHistogram
+        self.opnames = {}        # opname -> number of occurrences
+        self.total_ops = 0
+
+    def add(self, record):
+        if isinstance(record, Trace):
+            self._add_trace(record)
+        elif isinstance(record, GuardFailure):
+            self.guard_failures[record.guard] = (
+                self.guard_failures.get(record.guard, 0) + record.count)
+            owner = self.guard_owner.get(record.guard)
+            if owner is not None:
+                owner.guard_failures += record.count
+        elif isinstance(record, GuardHistogram):
+            self.histograms[record.guard] = record
+        elif isinstance(record, EntryCount):
+            if record.kind == 'l':
+                owner = self.label_owner.get(record.number)
+                if owner is not None:
+                    owner.iterations += record.count
+            else:
+                if record.kind == 'b':
+                    owner = self.bridges.get(record.number)
+                else:
+                    owner = self.loops.get(record.number)
+                if owner is not None:
+                    owner.entries += record.count
+
+    def _add_trace(self, trace):
+        summary = TraceSummary(trace)
+        if trace.kind == 'loop':
+            self.loops[trace.number] = summary
+        else:
+            self.bridges[trace.number] = summary
+            owner = self.guard_owner.get(trace.number)
+            if owner is not None:
+                owner.bridges += 1
+        for op in trace.operations:
+            self.opnames[op.name] = self.opnames.get(op.name, 0) + 1
+            if op.is_guard():
+                summary.num_guards += 1
+                self.guard_owner[op.guard_id()] = summary
+            elif op.name == 'label' and op.descr.startswith('TargetToken('):
+                token = int(op.descr[len('TargetToken('):-1])
+                self.label_owner[token] = summary
+        self.total_ops += summary.num_ops
+
+    def hottest(self, n=None):
+        """ The loops and bridges, sorted by decreasing number of runs.
+        """
+        traces = self.loops.values() + self.bridges.values()
+        traces.sort(key=lambda t: (t.entries + t.iterations), reverse=True)
+        if n is not None:
+            traces = traces[:n]
+        return traces
+
+    def format(self, top=20):
+        lines = []
+        lines.append('%d loops, %d bridges, %d operations' % (
+            len(self.loops), len(self.bridges), self.total_ops))
+        lines.append('%d guard failures' % sum(self.guard_failures.values()))
+        polymorphic = [h for h in self.histograms.values()
+                       if len(h.entries) > 1]
+        if polymorphic:
+            lines.append('%d polymorphic guards' % len(polymorphic))
+        lines.append('')
+        lines.append('%-12s %12s %12s %8s %8s %10s  %s' % (
+            'trace', 'entries', 'iterations', 'ops', 'guards', 'failures',
+            'name'))
+        for t in self.hottest(top):
+            if t.kind == 'loop':
+                ident = 'loop %d' % t.number
+            else:
+                ident = 'bridge 0x%x' % t.number
+            lines.append('%-12s %12d %12d %8d %8d %10d  %s' % (
+                ident, t.entries, t.iterations, t.num_ops, t.num_guards,
+                t.guard_failures, t.name))
+        return '\n'.join(lines)
+
+
+def summarize(filename):
+    summary = Summary()
+    for record in iter_records(filename):
+        summary.add(record)
+    return summary
+
+
+def main(argv):
+    top = 20
+    args = []
+    for arg in argv:
+        if arg.startswith('--top='):
+            top = int(arg[len('--top='):])
+        else:
+            args.append(arg)
+    if len(args) != 1:
+        print __doc__
+        sys.exit(1)
+    print summarize(args[0]).format(top)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+import py
+from rpython.rlib.rstring import StringBuilder
+from rpython.jit.metainterp import jitlog
+from rpython.jit.metainterp.jitlog import encode_int, encode_str, encode_str_list
+from rpython.tool.jitlogparser.binlog import (iter_records, Summary, Trace,
+    GuardFailure, EntryCount, JitLogError, summarize)
+
+
+def encode_op(b, opnum, name, result, args, descr='', failargs=[],
+              offset=-1):
+    encode_int(b, opnum)
+    encode_int(b, offset)
+    encode_str(b, name)
+    encode_str(b, result)
+    encode_str_list(b, args)
+    encode_str(b, descr)
+    encode_str_list(b, failargs)
+
+def make_log(records, word=8):
+    b = StringBuilder()
+    b.append(jitlog.MAGIC + jitlog.VERSION + chr(word))
+    for record in records:
+        b.append(record)
+    tmpdir = py.test.ensuretemp('binlog')
+    f = tmpdir.join('log%d' % len(tmpdir.listdir()))
+    f.write(b.build(), mode='wb')
+    return str(f)
+
+def loop_record(number, name='x', guard=0x1234, token=42):
+    b = StringBuilder()
+    b.append(jitlog.MARK_LOOP)
+    encode_int(b, number)
+    encode_str(b, 'loop')
+    encode_str(b, name)
+    encode_str_list(b, ['i0', 'p1'])
+    encode_int(b, 4)
+    encode_op(b, 1, 'label', '', ['i0', 'p1'], 'TargetToken(%d)' % token)
+    encode_op(b, 2, 'debug_merge_point', '', ['0', '0', 'f, line 3'])
+    encode_op(b, 3, 'int_add', 'i2', ['i0', '1'], offset=12)
+    encode_op(b, 4, 'guard_true', '', ['i2'], '<Guard0x%x>' % guard,
+              ['i2', 'p1'])
+    return b.build()
+
+def bridge_record(guard):
+    b = StringBuilder()
+    b.append(jitlog.MARK_BRIDGE)
+    encode_int(b, guard)
+    encode_str_list(b, ['i0'])
+    encode_int(b, 1)
+    encode_op(b, 5, 'finish', '', ['i0'], '<FinalDescr>')
+    return b.build()
+
+def int_record(mark, *values):
+    b = StringBuilder()
+    b.append(mark)
+    for value in values:
+        encode_int(b, value)
+    return b.build()
+
+def entry_record(kind, number, count):
+    return (jitlog.MARK_ENTRY_COUNT + kind +
+            int_record('', number, count))
+
+
+def test_read_trace():
+    fname = make_log([loop_record(3, 'foo')])
+    records = list(iter_records(fname))
+    assert len(records) == 1
+    trace = records[0]
+    assert isinstance(trace, Trace)
+    assert trace.kind == 'loop'
+    assert trace.number == 3
+    assert trace.name == 'foo'
+    assert trace.inputargs == ['i0', 'p1']
+    assert [str(op) for op in trace.operations] == [
+        'label(i0, p1, descr=TargetToken(42))',
+        "debug_merge_point(0, 0, 'f. line 3')",
+        '+12: i2 = int_add(i0, 1)',
+        'guard_true(i2, descr=<Guard0x1234>) [i2, p1]']
+    assert trace.operations[3].guard_id() == 0x1234
+
+def test_guard_ids_are_unsigned():
+    fname = make_log([bridge_record(-16),
+                      int_record(jitlog.MARK_GUARD_FAILURE, -16, 5),
+                      entry_record('b', -16, 7)], word=4)
+    bridge, failure, entry = list(iter_records(fname))
+    assert bridge.kind == 'bridge'
+    assert bridge.number == 0xfffffff0
+    assert isinstance(failure, GuardFailure)
+    assert (failure.guard, failure.count) == (0xfffffff0, 5)
+    assert isinstance(entry, EntryCount)
+    assert (entry.kind, entry.number, entry.count) == ('b', 0xfffffff0, 7)
+
+def test_summary():
+    fname = make_log([loop_record(0, 'a', guard=0x10, token=-5),
+                      loop_record(1, 'b', guard=0x20, token=6),
+                      int_record(jitlog.MARK_GUARD_FAILURE, 0x10, 3),
+                      bridge_record(0x10),
+                      int_record(jitlog.MARK_GUARD_FAILURE, 0x20, 4),
+                      entry_record('e', 0, 1),
+                      entry_record('l', -5, 100),
+                      entry_record('e', 1, 2),
+                      entry_record('l', 6, 1000),
+                      entry_record('b', 0x10, 50)])
+    summary = summarize(fname)
+    assert len(summary.loops) == 2
+    assert len(summary.bridges) == 1
+    assert summary.total_ops == 9
+    assert summary.opnames['guard_true'] == 2
+    a = summary.loops[0]
+    assert (a.entries, a.iterations, a.guard_failures, a.bridges) == (
+        1, 100, 3, 1)
+    b = summary.loops[1]
+    assert (b.entries, b.iterations, b.guard_failures, b.bridges) == (
+        2, 1000, 4, 0)
+    bridge = summary.bridges[0x10]
+    assert bridge.entries == 50
+    assert summary.hottest(2) == [b, a]
+    text = summary.format()
+    assert '2 loops, 1 bridges, 9 operations' in text
+    assert '7 guard failures' in text
+
+def test_errors():
+    fname = make_log([loop_record(0)[:-3]])
+    py.test.raises(JitLogError, list, iter_records(fname))
+    fname = make_log(['\x99'])
+    py.test.raises(JitLogError, list, iter_records(fname))
+    tmpfile = py.test.ensuretemp('binlog').join('notalog')
+    tmpfile.write('# Loop 0 : loop with 3 ops\n')
+    py.test.raises(JitLogError, list, iter_records(str(tmpfile)))